@@ -0,0 +1,250 @@
+"""
+Transcription Accuracy Metrics for the Benchmark Suite
+WER/CER against reference transcripts, timestamp drift between runs, and the
+regression gate used by benchmark.py --accuracy
+
+Pure functions only; storage lives in benchmark.BenchmarkDatabase.
+"""
+
+import json
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# Default regression tolerances (overridable from the benchmark CLI)
+SPEED_TOLERANCE = 0.10       # max relative real-time factor drop
+WER_TOLERANCE = 0.02         # max absolute WER increase
+CER_TOLERANCE = 0.01         # max absolute CER increase
+DRIFT_TOLERANCE_MS = 100.0   # max mean word start drift vs baseline
+
+# accuracy-results/result_<cuda>_<clip>_<YYYYmmdd>_<HHMMSS>.json
+RESULT_FILE_PATTERN = re.compile(r"^result_(?P<cuda>[\d.]+)_(?P<clip>.+)_(?P<run>\d{8}_\d{6})\.json$")
+
+_NON_WORD = re.compile(r"[^\w\s']+")
+
+
+def normalize_words(text: str) -> List[str]:
+    """Lowercase and strip punctuation (hyphens split words), as in LibriSpeech references"""
+    return _NON_WORD.sub(" ", text.lower()).split()
+
+
+def align(ref: Sequence[str], hyp: Sequence[str]) -> List[Tuple[str, Optional[str], Optional[str]]]:
+    """
+    Levenshtein alignment of two token sequences.
+
+    Returns (op, ref_token, hyp_token) tuples with op one of
+    "equal", "sub", "del" (missing from hyp) and "ins" (extra in hyp).
+    """
+    rows, cols = len(ref) + 1, len(hyp) + 1
+    dist = [[0] * cols for _ in range(rows)]
+    for i in range(rows):
+        dist[i][0] = i
+    for j in range(cols):
+        dist[0][j] = j
+    for i in range(1, rows):
+        for j in range(1, cols):
+            cost = 0 if ref[i - 1] == hyp[j - 1] else 1
+            dist[i][j] = min(dist[i - 1][j] + 1, dist[i][j - 1] + 1, dist[i - 1][j - 1] + cost)
+
+    ops = []
+    i, j = len(ref), len(hyp)
+    while i > 0 or j > 0:
+        if i > 0 and j > 0 and dist[i][j] == dist[i - 1][j - 1] + (ref[i - 1] != hyp[j - 1]):
+            ops.append(("equal" if ref[i - 1] == hyp[j - 1] else "sub", ref[i - 1], hyp[j - 1]))
+            i, j = i - 1, j - 1
+        elif i > 0 and dist[i][j] == dist[i - 1][j] + 1:
+            ops.append(("del", ref[i - 1], None))
+            i -= 1
+        else:
+            ops.append(("ins", None, hyp[j - 1]))
+            j -= 1
+    ops.reverse()
+    return ops
+
+
+def edit_count(ref: Sequence[str], hyp: Sequence[str]) -> int:
+    return sum(1 for op, _, _ in align(ref, hyp) if op != "equal")
+
+
+def wer(reference: str, hypothesis: str) -> float:
+    ref = normalize_words(reference)
+    return edit_count(ref, normalize_words(hypothesis)) / max(len(ref), 1)
+
+
+def cer(reference: str, hypothesis: str) -> float:
+    ref = " ".join(normalize_words(reference))
+    return edit_count(ref, " ".join(normalize_words(hypothesis))) / max(len(ref), 1)
+
+
+def format_diff(reference: str, hypothesis: str) -> str:
+    """Inline word diff: [ref->hyp] substitution, [-ref] deletion, [+hyp] insertion"""
+    parts = []
+    for op, ref_word, hyp_word in align(normalize_words(reference), normalize_words(hypothesis)):
+        if op == "equal":
+            parts.append(ref_word)
+        elif op == "sub":
+            parts.append(f"[{ref_word}->{hyp_word}]")
+        elif op == "del":
+            parts.append(f"[-{ref_word}]")
+        else:
+            parts.append(f"[+{hyp_word}]")
+    return " ".join(parts)
+
+
+def timestamp_drift(baseline_words: List[Dict], current_words: List[Dict]) -> Optional[Dict]:
+    """
+    Word start-time drift between two runs of the same clip.
+
+    Words are matched through the alignment of their normalized text; only
+    words present in both runs with a start time count. Returns mean/max
+    absolute drift in milliseconds, or None when no words match.
+    """
+    def timed_tokens(words):
+        tokens = []
+        for w in words:
+            if w.get("start") is None:
+                continue
+            for token in normalize_words(w.get("word", "")):
+                tokens.append((token, w["start"]))
+        return tokens
+
+    base = timed_tokens(baseline_words)
+    cur = timed_tokens(current_words)
+    base_iter, cur_iter = iter(base), iter(cur)
+    drifts = []
+    for op, _, _ in align([t for t, _ in base], [t for t, _ in cur]):
+        base_start = next(base_iter)[1] if op != "ins" else None
+        cur_start = next(cur_iter)[1] if op != "del" else None
+        if op == "equal":
+            drifts.append(abs(cur_start - base_start) * 1000)
+
+    if not drifts:
+        return None
+    return {"mean_ms": sum(drifts) / len(drifts), "max_ms": max(drifts), "matched_words": len(drifts)}
+
+
+def load_reference_transcripts(path: Path) -> Dict[str, str]:
+    """LibriSpeech transcript file: one '<utterance-id> <TEXT>' per line"""
+    references = {}
+    if not path.exists():
+        return references
+    for line in path.read_text().splitlines():
+        utterance, _, text = line.partition(" ")
+        if text:
+            references[utterance] = text
+    return references
+
+
+def extract_transcript(result: Dict) -> Tuple[str, List[Dict]]:
+    """(text, words) from a /transcribe response or speed probe clip result"""
+    segments = result.get("segments", [])
+    text = " ".join(seg.get("text", "").strip() for seg in segments)
+    words = [
+        {"word": w.get("word", ""), "start": w.get("start"), "end": w.get("end")}
+        for seg in segments
+        for w in seg.get("words", [])
+    ]
+    return text, words
+
+
+def load_result_file(path: Path) -> Optional[Dict]:
+    """
+    Parse a stored accuracy-results JSON file.
+
+    Returns {cuda_version, clip, run, text, words, error}; error is the API
+    error detail for failed runs. None when the name does not match.
+    """
+    match = RESULT_FILE_PATTERN.match(path.name)
+    if not match:
+        return None
+    with open(path) as f:
+        data = json.load(f)
+    text, words = extract_transcript(data)
+    return {
+        "cuda_version": match.group("cuda"),
+        "clip": match.group("clip"),
+        "run": match.group("run"),
+        "text": text,
+        "words": words,
+        "error": data.get("detail")
+    }
+
+
+def corpus_error_rates(rows: List[Dict]) -> Tuple[Optional[float], Optional[float]]:
+    """Corpus-level WER/CER (total edits over total reference length) for rows with a reference"""
+    scored = [r for r in rows if r.get("reference")]
+    if not scored:
+        return None, None
+    word_edits = word_total = char_edits = char_total = 0
+    for row in scored:
+        ref_words = normalize_words(row["reference"])
+        hyp_words = normalize_words(row["hypothesis"])
+        word_edits += edit_count(ref_words, hyp_words)
+        word_total += len(ref_words)
+        ref_chars, hyp_chars = " ".join(ref_words), " ".join(hyp_words)
+        char_edits += edit_count(ref_chars, hyp_chars)
+        char_total += len(ref_chars)
+    return word_edits / max(word_total, 1), char_edits / max(char_total, 1)
+
+
+@dataclass
+class GateCheck:
+    """One metric compared between a baseline run and the current run"""
+    metric: str
+    baseline: Optional[float]
+    current: Optional[float]
+    limit: float
+    passed: bool
+
+    def describe(self) -> str:
+        def fmt(value):
+            if value is None:
+                return "N/A"
+            if self.metric == "realtime_factor":
+                return f"{value:.2f}x"
+            if self.metric == "timestamp_drift_ms":
+                return f"{value:.0f}ms"
+            return f"{value * 100:.2f}%"
+
+        if self.metric == "realtime_factor":
+            limit = f"-{self.limit * 100:.0f}%"
+        elif self.metric == "timestamp_drift_ms":
+            limit = f"<{self.limit:.0f}ms"
+        else:
+            limit = f"+{self.limit * 100:.1f}pp"
+        status = "ok" if self.passed else "REGRESSED"
+        return f"  {self.metric:<20}{fmt(self.baseline):>12}{fmt(self.current):>12}{limit:>10}  {status}"
+
+
+def check_regression(
+    baseline: Dict,
+    current: Dict,
+    speed_tolerance: float = SPEED_TOLERANCE,
+    wer_tolerance: float = WER_TOLERANCE,
+    cer_tolerance: float = CER_TOLERANCE,
+    drift_tolerance_ms: float = DRIFT_TOLERANCE_MS
+) -> List[GateCheck]:
+    """
+    Compare run summaries {realtime_factor, wer, cer, timestamp_drift_ms}.
+
+    Metrics missing on either side are skipped; drift is already relative
+    to the baseline so only the current value is checked.
+    """
+    checks = []
+
+    if baseline.get("realtime_factor") and current.get("realtime_factor") is not None:
+        drop = 1 - current["realtime_factor"] / baseline["realtime_factor"]
+        checks.append(GateCheck("realtime_factor", baseline["realtime_factor"], current["realtime_factor"],
+                                speed_tolerance, drop <= speed_tolerance))
+
+    for metric, tolerance in (("wer", wer_tolerance), ("cer", cer_tolerance)):
+        if baseline.get(metric) is not None and current.get(metric) is not None:
+            checks.append(GateCheck(metric, baseline[metric], current[metric], tolerance,
+                                    current[metric] - baseline[metric] <= tolerance))
+
+    if current.get("timestamp_drift_ms") is not None:
+        checks.append(GateCheck("timestamp_drift_ms", 0.0, current["timestamp_drift_ms"], drift_tolerance_ms,
+                                current["timestamp_drift_ms"] <= drift_tolerance_ms))
+
+    return checks
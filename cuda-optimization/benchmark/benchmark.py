@@ -7,6 +7,11 @@ Usage:
     python benchmark.py --service whisperx --cuda-version 12.8
     python benchmark.py --service whisperx --cuda-version 13.0 --compare
     python benchmark.py --report
+    python benchmark.py --service whisperx --cuda-version 12.8 --speed
+    python benchmark.py --service whisperx --local --speed    # CPU + tiny model, no Docker
+    python benchmark.py --service whisperx --local --accuracy # speed + accuracy regression gate
+    python benchmark.py --service whisperx --import-accuracy-results
+    python benchmark.py --compare-runs whisperx-12.8-1760580000 whisperx-12.9-1760590000
 """
 
 import argparse
@@ -20,9 +25,45 @@ from pathlib import Path
 from typing import Optional, Dict, List
 import sys
 
+import accuracy
+import stats
+from speed_probe import RESULT_MARKER
+
 # Database setup
 DB_PATH = Path(__file__).parent / "results.db"
 
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+
+# Speed test corpus: LibriSpeech clips downloaded by scripts/test-whisperx-accuracy.sh,
+# or synthetic noise bursts generated with ffmpeg when those are missing (CI)
+SPEED_PROBE = Path(__file__).parent / "speed_probe.py"
+SHARED_DIR = PROJECT_ROOT / "shared"
+CONTAINER_SHARED_DIR = "/app/shared"
+LIBRISPEECH_DIR = SHARED_DIR / "librispeech-test"
+SPEED_CORPUS = [
+    "1089-134686-0000.flac",
+    "1089-134686-0001.flac",
+    "1089-134686-0002.flac",
+]
+SYNTHETIC_DIR = SHARED_DIR / "benchmark-corpus"
+SYNTHETIC_CORPUS = {"synthetic-10s.wav": 10, "synthetic-30s.wav": 30}
+
+# Reference transcripts (LibriSpeech format) and stored API outputs per CUDA version
+REFERENCE_TRANSCRIPTS = LIBRISPEECH_DIR / "transcripts.txt"
+ACCURACY_RESULTS_DIR = Path(__file__).parent / "accuracy-results"
+
+# Startup readiness: in-container health URLs; other services are ready once running
+HEALTH_URLS = {"whisperx": "http://localhost:8000/health"}
+STARTUP_TIMEOUT = 300
+STARTUP_POLL_INTERVAL = 1.0
+
+# Repeated measurements: metric -> True when higher is better
+MEASURED_METRICS = {
+    "realtime_factor": True,
+    "processing_seconds": False,
+    "startup_seconds": False,
+}
+
 
 @dataclass
 class BenchmarkResult:
@@ -91,6 +132,69 @@ class BenchmarkDatabase:
             )
         """)
 
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS speed_results (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                test_id TEXT UNIQUE NOT NULL,
+                timestamp TEXT NOT NULL,
+                service TEXT NOT NULL,
+                cuda_version TEXT NOT NULL,
+                device TEXT NOT NULL,
+                model TEXT NOT NULL,
+                compute_type TEXT,
+                corpus TEXT,
+                clip_count INTEGER,
+                audio_seconds REAL,
+                processing_seconds REAL,
+                realtime_factor REAL,
+                peak_rss_mb REAL,
+                peak_vram_mb REAL,
+                FOREIGN KEY (test_id) REFERENCES benchmark_results(test_id)
+            )
+        """)
+
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS stage_timings (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                test_id TEXT NOT NULL,
+                clip TEXT,
+                stage TEXT NOT NULL,
+                seconds REAL NOT NULL,
+                FOREIGN KEY (test_id) REFERENCES benchmark_results(test_id)
+            )
+        """)
+
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS accuracy_results (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                test_id TEXT NOT NULL,
+                timestamp TEXT NOT NULL,
+                service TEXT NOT NULL,
+                cuda_version TEXT NOT NULL,
+                clip TEXT NOT NULL,
+                reference TEXT,
+                hypothesis TEXT,
+                wer REAL,
+                cer REAL,
+                drift_mean_ms REAL,
+                drift_max_ms REAL,
+                words_json TEXT,
+                error TEXT,
+                UNIQUE(test_id, clip)
+            )
+        """)
+
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS measurements (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                test_id TEXT NOT NULL,
+                metric TEXT NOT NULL,
+                repetition INTEGER NOT NULL,
+                value REAL NOT NULL,
+                UNIQUE(test_id, metric, repetition)
+            )
+        """)
+
         self.conn.commit()
 
     def save_result(self, result: BenchmarkResult):
@@ -118,6 +222,129 @@ class BenchmarkDatabase:
         ))
         self.conn.commit()
 
+    def save_speed_result(self, test_id: str, service: str, cuda_version: str, corpus: str, probe: Dict):
+        """Save speed probe output (run summary plus per-stage timings)"""
+        cursor = self.conn.cursor()
+        cursor.execute("""
+            INSERT OR REPLACE INTO speed_results
+            (test_id, timestamp, service, cuda_version, device, model,
+             compute_type, corpus, clip_count, audio_seconds,
+             processing_seconds, realtime_factor, peak_rss_mb, peak_vram_mb)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, (
+            test_id, datetime.now().isoformat(), service, cuda_version,
+            probe['device'], probe['model'], probe['compute_type'], corpus,
+            len(probe['clips']), probe['audio_seconds'],
+            probe['processing_seconds'], probe['realtime_factor'],
+            probe['peak_rss_mb'], probe['peak_vram_mb']
+        ))
+
+        cursor.execute("DELETE FROM stage_timings WHERE test_id = ?", (test_id,))
+        cursor.executemany("""
+            INSERT INTO stage_timings (test_id, clip, stage, seconds)
+            VALUES (?, ?, ?, ?)
+        """, [
+            (test_id, Path(s['clip']).name if s['clip'] else None, s['stage'], s['seconds'])
+            for s in probe['stages']
+        ])
+        self.conn.commit()
+
+    def get_baseline_speed(self, service: str, device: str, model: str, corpus: str) -> Optional[float]:
+        """Realtime factor of the first speed run with the same device, model and corpus"""
+        cursor = self.conn.cursor()
+        cursor.execute("""
+            SELECT realtime_factor FROM speed_results
+            WHERE service = ? AND device = ? AND model = ? AND corpus = ?
+              AND realtime_factor IS NOT NULL
+            ORDER BY timestamp ASC
+            LIMIT 1
+        """, (service, device, model, corpus))
+        row = cursor.fetchone()
+        return row[0] if row else None
+
+    def get_previous_speed_run(self, service: str, device: str, model: str, corpus: str,
+                               exclude_test_id: str) -> Optional[str]:
+        """Test ID of the most recent other speed run with the same device, model and corpus"""
+        cursor = self.conn.cursor()
+        cursor.execute("""
+            SELECT test_id FROM speed_results
+            WHERE service = ? AND device = ? AND model = ? AND corpus = ?
+              AND test_id != ?
+            ORDER BY timestamp DESC
+            LIMIT 1
+        """, (service, device, model, corpus, exclude_test_id))
+        row = cursor.fetchone()
+        return row[0] if row else None
+
+    def get_speed_result(self, test_id: str) -> Optional[Dict]:
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT * FROM speed_results WHERE test_id = ?", (test_id,))
+        row = cursor.fetchone()
+        if not row:
+            return None
+        return dict(zip([desc[0] for desc in cursor.description], row))
+
+    def get_stage_totals(self, test_id: str) -> Dict[str, float]:
+        """Seconds per stage summed over clips"""
+        cursor = self.conn.cursor()
+        cursor.execute("""
+            SELECT stage, SUM(seconds) FROM stage_timings
+            WHERE test_id = ?
+            GROUP BY stage
+            ORDER BY MIN(id)
+        """, (test_id,))
+        return dict(cursor.fetchall())
+
+    def save_accuracy_results(self, test_id: str, service: str, cuda_version: str, rows: List[Dict]):
+        """Save per-clip accuracy rows (reference, hypothesis, wer, cer, drift, words)"""
+        cursor = self.conn.cursor()
+        timestamp = datetime.now().isoformat()
+        cursor.executemany("""
+            INSERT OR REPLACE INTO accuracy_results
+            (test_id, timestamp, service, cuda_version, clip, reference,
+             hypothesis, wer, cer, drift_mean_ms, drift_max_ms, words_json, error)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, [
+            (
+                test_id, timestamp, service, cuda_version, row['clip'],
+                row.get('reference'), row.get('hypothesis'), row.get('wer'),
+                row.get('cer'), row.get('drift_mean_ms'), row.get('drift_max_ms'),
+                json.dumps(row.get('words', [])), row.get('error')
+            )
+            for row in rows
+        ])
+        self.conn.commit()
+
+    def get_accuracy_results(self, test_id: str) -> List[Dict]:
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT * FROM accuracy_results WHERE test_id = ? ORDER BY clip", (test_id,))
+        columns = [desc[0] for desc in cursor.description]
+        rows = []
+        for row in cursor.fetchall():
+            data = dict(zip(columns, row))
+            data['words'] = json.loads(data.pop('words_json') or "[]")
+            rows.append(data)
+        return rows
+
+    def save_measurements(self, test_id: str, metric: str, values: List[float]):
+        """Save repeated samples of one metric (replaces earlier samples for the run)"""
+        cursor = self.conn.cursor()
+        cursor.execute("DELETE FROM measurements WHERE test_id = ? AND metric = ?", (test_id, metric))
+        cursor.executemany("""
+            INSERT INTO measurements (test_id, metric, repetition, value)
+            VALUES (?, ?, ?, ?)
+        """, [(test_id, metric, i, value) for i, value in enumerate(values) if value is not None])
+        self.conn.commit()
+
+    def get_measurements(self, test_id: str, metric: str) -> List[float]:
+        cursor = self.conn.cursor()
+        cursor.execute("""
+            SELECT value FROM measurements
+            WHERE test_id = ? AND metric = ?
+            ORDER BY repetition
+        """, (test_id, metric))
+        return [row[0] for row in cursor.fetchall()]
+
     def get_latest_results(self, service: str, limit: int = 10) -> List[Dict]:
         """Get latest benchmark results for a service"""
         cursor = self.conn.cursor()
@@ -163,9 +390,22 @@ class BenchmarkDatabase:
 class CUDABenchmark:
     """CUDA/PyTorch benchmark runner"""
 
-    def __init__(self, service: str, cuda_version: str):
+    def __init__(self, service: str, cuda_version: str, speed: bool = False,
+                 device: str = "auto", model: str = "tiny", compute_type: Optional[str] = None,
+                 accuracy: bool = False, baseline_test_id: Optional[str] = None,
+                 tolerances: Optional[Dict] = None, warmup: int = 1, repetitions: int = 5):
         self.service = service
         self.cuda_version = cuda_version
+        self.speed = speed or accuracy
+        self.device = device
+        self.model = model
+        self.compute_type = compute_type
+        self.accuracy = accuracy
+        self.baseline_test_id = baseline_test_id
+        self.tolerances = tolerances or {}
+        self.warmup = warmup
+        self.repetitions = repetitions
+        self.gate_passed: Optional[bool] = None
         self.db = BenchmarkDatabase()
         self.test_id = f"{service}-{cuda_version}-{int(time.time())}"
 
@@ -173,7 +413,7 @@ class CUDABenchmark:
         """Build the service and measure time/size"""
         print(f"Building {self.service} with CUDA {self.cuda_version}...")
 
-        start_time = time.time()
+        start_time = time.perf_counter()
 
         # Build command
         cmd = [
@@ -185,12 +425,12 @@ class CUDABenchmark:
         try:
             result = subprocess.run(
                 cmd,
-                cwd="/home/ghar/code/local-ai-packaged",
+                cwd=PROJECT_ROOT,
                 capture_output=True,
                 text=True,
                 timeout=1800  # 30 min timeout
             )
-            build_time = time.time() - start_time
+            build_time = time.perf_counter() - start_time
             build_success = result.returncode == 0
 
             if not build_success:
@@ -199,7 +439,7 @@ class CUDABenchmark:
 
         except subprocess.TimeoutExpired:
             print("Build timed out after 30 minutes")
-            return time.time() - start_time, 0.0, False
+            return time.perf_counter() - start_time, 0.0, False
 
         # Get image size
         image_name = f"localai-{self.service}"
@@ -209,16 +449,19 @@ class CUDABenchmark:
 
         return build_time, image_size, build_success
 
-    def run_runtime_test(self) -> tuple[bool, Optional[str], Optional[float], Optional[float]]:
-        """Start container and test CUDA availability"""
+    def run_runtime_test(self, keep_running: bool = False) -> tuple[bool, Optional[str], Optional[float], Optional[float]]:
+        """Start container and test CUDA availability (left running for the speed test if keep_running)"""
         print(f"Testing runtime for {self.service}...")
 
         # Start service
         start_cmd = ["docker", "compose", "up", "-d", self.service]
-        subprocess.run(start_cmd, cwd="/home/ghar/code/local-ai-packaged")
+        subprocess.run(start_cmd, cwd=PROJECT_ROOT)
 
         # Wait for startup
-        time.sleep(10)
+        startup_seconds = self.wait_for_service()
+        if startup_seconds is not None:
+            print(f"Service ready after {startup_seconds:.1f}s")
+            self.db.save_measurements(self.test_id, "startup_seconds", [startup_seconds])
 
         # Test CUDA inside container
         test_cmd = [
@@ -230,7 +473,7 @@ class CUDABenchmark:
         try:
             result = subprocess.run(
                 test_cmd,
-                cwd="/home/ghar/code/local-ai-packaged",
+                cwd=PROJECT_ROOT,
                 capture_output=True,
                 text=True,
                 timeout=30
@@ -245,11 +488,8 @@ class CUDABenchmark:
                 # Get VRAM info
                 vram_total, vram_used = self._get_vram_info()
 
-                # Stop service
-                subprocess.run(
-                    ["docker", "compose", "down", self.service],
-                    cwd="/home/ghar/code/local-ai-packaged"
-                )
+                if not keep_running:
+                    self._stop_service()
 
                 return cuda_available, pytorch_version, vram_total, vram_used
             else:
@@ -258,12 +498,267 @@ class CUDABenchmark:
 
         except (subprocess.TimeoutExpired, json.JSONDecodeError) as e:
             print(f"Runtime test error: {e}")
-            subprocess.run(
-                ["docker", "compose", "down", self.service],
-                cwd="/home/ghar/code/local-ai-packaged"
-            )
+            self._stop_service()
             return False, None, None, None
 
+    def wait_for_service(self, timeout: float = STARTUP_TIMEOUT) -> Optional[float]:
+        """Poll until the service is running (and healthy, if it has a health URL); return seconds waited"""
+        start = time.perf_counter()
+        health_url = HEALTH_URLS.get(self.service)
+
+        while time.perf_counter() - start < timeout:
+            ps = subprocess.run(
+                ["docker", "compose", "ps", "--format", "{{.State}}", self.service],
+                cwd=PROJECT_ROOT,
+                capture_output=True,
+                text=True
+            )
+            state = ps.stdout.strip()
+            if state in ("exited", "dead"):
+                print(f"{self.service} stopped during startup ({state})")
+                return None
+
+            if state == "running":
+                if not health_url:
+                    return time.perf_counter() - start
+                try:
+                    check = subprocess.run(
+                        ["docker", "compose", "exec", "-T", self.service, "python3", "-c",
+                         f"import urllib.request; urllib.request.urlopen('{health_url}', timeout=5)"],
+                        cwd=PROJECT_ROOT,
+                        capture_output=True,
+                        timeout=30
+                    )
+                    if check.returncode == 0:
+                        return time.perf_counter() - start
+                except subprocess.TimeoutExpired:
+                    pass
+
+            time.sleep(STARTUP_POLL_INTERVAL)
+
+        print(f"{self.service} not ready after {timeout:.0f}s")
+        return None
+
+    def _stop_service(self):
+        subprocess.run(
+            ["docker", "compose", "down", self.service],
+            cwd=PROJECT_ROOT
+        )
+
+    def prepare_speed_corpus(self) -> tuple[str, List[Path]]:
+        """Return (corpus name, clip paths), generating the synthetic corpus if needed"""
+        librispeech = [LIBRISPEECH_DIR / name for name in SPEED_CORPUS]
+        if all(path.exists() for path in librispeech):
+            return "librispeech", librispeech
+
+        print("LibriSpeech clips not found, using synthetic corpus")
+        SYNTHETIC_DIR.mkdir(parents=True, exist_ok=True)
+        clips = []
+        for name, duration in SYNTHETIC_CORPUS.items():
+            path = SYNTHETIC_DIR / name
+            if not path.exists():
+                # Pink noise in 3s bursts with 1s gaps so VAD sees several regions
+                subprocess.run([
+                    "ffmpeg", "-y", "-v", "error",
+                    "-f", "lavfi", "-i", f"anoisesrc=d={duration}:c=pink:a=0.2",
+                    "-af", "volume='if(lt(mod(t,4),3),1,0)':eval=frame",
+                    "-ar", "16000", "-ac", "1", str(path)
+                ], check=True)
+            clips.append(path)
+        return "synthetic", clips
+
+    def run_speed_test(self, local: bool = False) -> tuple[Optional[str], Optional[Dict]]:
+        """
+        Run the speed probe over the corpus.
+
+        In the container when the service is running (clips are read through
+        the ./shared mount), or in this interpreter when local is set.
+        """
+        print(f"Running speed test ({self.model} model, device={self.device})...")
+
+        try:
+            corpus, clips = self.prepare_speed_corpus()
+        except (OSError, subprocess.CalledProcessError) as e:
+            print(f"Failed to prepare speed corpus: {e}")
+            return None, None
+
+        probe_args = [
+            "--device", self.device,
+            "--model", self.model,
+            "--warmup", str(self.warmup),
+            "--repeat", str(self.repetitions)
+        ]
+        if self.compute_type:
+            probe_args += ["--compute-type", self.compute_type]
+
+        if local:
+            cmd = [sys.executable, str(SPEED_PROBE)] + probe_args + [str(c) for c in clips]
+            stdin = None
+        else:
+            container_clips = [
+                f"{CONTAINER_SHARED_DIR}/{c.relative_to(SHARED_DIR).as_posix()}" for c in clips
+            ]
+            cmd = ["docker", "compose", "exec", "-T", self.service, "python3", "-"] + probe_args + container_clips
+            stdin = open(SPEED_PROBE)
+
+        try:
+            result = subprocess.run(
+                cmd,
+                cwd=PROJECT_ROOT,
+                stdin=stdin,
+                capture_output=True,
+                text=True,
+                timeout=1800
+            )
+        except subprocess.TimeoutExpired:
+            print("Speed test timed out after 30 minutes")
+            return corpus, None
+        finally:
+            if stdin:
+                stdin.close()
+
+        for line in reversed(result.stdout.splitlines()):
+            if line.startswith(RESULT_MARKER):
+                return corpus, json.loads(line[len(RESULT_MARKER):])
+
+        print(f"Speed test failed: {result.stderr[-2000:]}")
+        return corpus, None
+
+    def record_speed(self, corpus: str, probe: Dict) -> Optional[float]:
+        """Store the probe result; return realtime factor relative to the first comparable run"""
+        baseline = self.db.get_baseline_speed(self.service, probe['device'], probe['model'], corpus)
+        self.db.save_speed_result(self.test_id, self.service, self.cuda_version, corpus, probe)
+        for metric in ("realtime_factor", "processing_seconds"):
+            self.db.save_measurements(self.test_id, metric, [r[metric] for r in probe['repetitions']])
+        self._print_speed(probe)
+
+        if probe['realtime_factor'] is None:
+            return None
+        if baseline is None:
+            return 1.0
+        return probe['realtime_factor'] / baseline
+
+    def run_speed_stage(self, local: bool = False) -> tuple[Optional[Dict], Optional[float]]:
+        """Speed test, plus accuracy scoring and the regression gate when enabled"""
+        corpus, probe = self.run_speed_test(local=local)
+        if not probe:
+            if self.accuracy:
+                self.gate_passed = False
+            return None, None
+
+        speed_factor = self.record_speed(corpus, probe)
+
+        if self.accuracy:
+            baseline = self.baseline_test_id or self.db.get_previous_speed_run(
+                self.service, probe['device'], probe['model'], corpus, self.test_id
+            )
+            rows = self.evaluate_accuracy(corpus, probe, baseline)
+            self.gate_passed = self.run_regression_gate(baseline, probe, rows)
+
+        return probe, speed_factor
+
+    def evaluate_accuracy(self, corpus: str, probe: Dict, baseline_test_id: Optional[str]) -> List[Dict]:
+        """
+        Score each clip against its reference transcript (LibriSpeech corpus
+        only) and its word timestamps against the baseline run.
+        """
+        references = accuracy.load_reference_transcripts(REFERENCE_TRANSCRIPTS) if corpus == "librispeech" else {}
+        baseline_words = {}
+        if baseline_test_id:
+            baseline_words = {r['clip']: r['words'] for r in self.db.get_accuracy_results(baseline_test_id)}
+
+        rows = []
+        for clip in probe['clips']:
+            name = Path(clip['clip']).name
+            reference = references.get(Path(name).stem)
+            drift = None
+            if baseline_words.get(name):
+                drift = accuracy.timestamp_drift(baseline_words[name], clip['words'])
+
+            rows.append({
+                "clip": name,
+                "reference": reference,
+                "hypothesis": clip['text'],
+                "wer": accuracy.wer(reference, clip['text']) if reference else None,
+                "cer": accuracy.cer(reference, clip['text']) if reference else None,
+                "drift_mean_ms": drift['mean_ms'] if drift else None,
+                "drift_max_ms": drift['max_ms'] if drift else None,
+                "words": clip['words']
+            })
+
+        self.db.save_accuracy_results(self.test_id, self.service, self.cuda_version, rows)
+
+        print("\nAccuracy:")
+        for row in rows:
+            wer = f"WER {row['wer'] * 100:.1f}%" if row['wer'] is not None else "no reference"
+            drift = f", drift {row['drift_mean_ms']:.0f}ms" if row['drift_mean_ms'] is not None else ""
+            print(f"  {row['clip']}: {wer}{drift}")
+
+        return rows
+
+    def run_regression_gate(self, baseline_test_id: Optional[str], probe: Dict, rows: List[Dict]) -> bool:
+        """Compare this run with the baseline run; print a diff of what regressed"""
+        if not baseline_test_id:
+            print("\nRegression gate: no baseline run yet, this run becomes the baseline")
+            return True
+
+        baseline_speed = self.db.get_speed_result(baseline_test_id) or {}
+        baseline_rows = self.db.get_accuracy_results(baseline_test_id)
+        baseline_wer, baseline_cer = accuracy.corpus_error_rates(baseline_rows)
+        current_wer, current_cer = accuracy.corpus_error_rates(rows)
+        drifts = [r['drift_mean_ms'] for r in rows if r['drift_mean_ms'] is not None]
+
+        checks = accuracy.check_regression(
+            {"realtime_factor": baseline_speed.get('realtime_factor'), "wer": baseline_wer, "cer": baseline_cer},
+            {
+                "realtime_factor": probe['realtime_factor'],
+                "wer": current_wer,
+                "cer": current_cer,
+                "timestamp_drift_ms": sum(drifts) / len(drifts) if drifts else None
+            },
+            **self.tolerances
+        )
+        passed = all(check.passed for check in checks)
+
+        print(f"\n{'='*60}")
+        print(f"REGRESSION GATE: {'PASSED' if passed else 'FAILED'}")
+        print(f"Baseline: {baseline_test_id}")
+        print(f"{'='*60}")
+        print(f"  {'metric':<20}{'baseline':>12}{'current':>12}{'limit':>10}")
+        for check in checks:
+            print(check.describe())
+
+        failed = {check.metric for check in checks if not check.passed}
+
+        if "realtime_factor" in failed:
+            baseline_stages = self.db.get_stage_totals(baseline_test_id)
+            current_stages = self.db.get_stage_totals(self.test_id)
+            print("\nStage timings (baseline -> current):")
+            for stage, seconds in current_stages.items():
+                before = baseline_stages.get(stage)
+                change = f"{(seconds / before - 1) * 100:+.0f}%" if before else "new"
+                before_text = f"{before:.2f}s" if before is not None else "-"
+                print(f"  {stage:<18}{before_text:>10} -> {seconds:.2f}s ({change})")
+
+        if failed & {"wer", "cer"}:
+            baseline_by_clip = {r['clip']: r for r in baseline_rows}
+            for row in rows:
+                before = baseline_by_clip.get(row['clip'])
+                if row['wer'] is None or not before or before['wer'] is None or row['wer'] <= before['wer']:
+                    continue
+                print(f"\n{row['clip']}: WER {before['wer'] * 100:.1f}% -> {row['wer'] * 100:.1f}%")
+                print(f"  baseline: {accuracy.format_diff(row['reference'], before['hypothesis'])}")
+                print(f"  current:  {accuracy.format_diff(row['reference'], row['hypothesis'])}")
+
+        if "timestamp_drift_ms" in failed:
+            print("\nTimestamp drift by clip:")
+            for row in rows:
+                if row['drift_mean_ms'] is not None:
+                    print(f"  {row['clip']}: mean {row['drift_mean_ms']:.0f}ms, max {row['drift_max_ms']:.0f}ms")
+
+        print()
+        return passed
+
     def _get_vram_info(self) -> tuple[Optional[float], Optional[float]]:
         """Get GPU VRAM information"""
         try:
@@ -327,7 +822,13 @@ class CUDABenchmark:
             return result
 
         # Runtime test
-        cuda_available, pytorch_version, vram_total, vram_used = self.run_runtime_test()
+        cuda_available, pytorch_version, vram_total, vram_used = self.run_runtime_test(keep_running=self.speed)
+
+        # Speed test
+        speed_factor = None
+        if self.speed:
+            _, speed_factor = self.run_speed_stage()
+            self._stop_service()
 
         # Get GPU name
         gpu_name = None
@@ -356,7 +857,7 @@ class CUDABenchmark:
             vram_total_mb=vram_total,
             vram_used_mb=vram_used,
             runtime_test_passed=cuda_available,
-            runtime_speed_factor=None,  # TODO: Implement actual speed tests
+            runtime_speed_factor=speed_factor,
             notes="Success" if cuda_available else "CUDA not available"
         )
 
@@ -365,6 +866,61 @@ class CUDABenchmark:
 
         return result
 
+    def run_local_speed_benchmark(self) -> BenchmarkResult:
+        """Speed test in this interpreter only (no build, no container)"""
+        print(f"\n{'='*60}")
+        print(f"Running local speed benchmark: {self.service}")
+        print(f"Test ID: {self.test_id}")
+        print(f"{'='*60}\n")
+
+        probe, speed_factor = self.run_speed_stage(local=True)
+
+        result = BenchmarkResult(
+            test_id=self.test_id,
+            timestamp=datetime.now().isoformat(),
+            service=self.service,
+            cuda_version=self.cuda_version,
+            pytorch_version=probe['torch_version'] if probe else None,
+            build_time_seconds=0.0,
+            image_size_mb=0.0,
+            gpu_available=bool(probe and probe['device'] == "cuda"),
+            gpu_name=None,
+            vram_total_mb=None,
+            vram_used_mb=probe['peak_vram_mb'] if probe else None,
+            runtime_test_passed=probe is not None,
+            runtime_speed_factor=speed_factor,
+            notes=f"Local speed run ({probe['device']}, {probe['model']})" if probe else "Speed test failed"
+        )
+
+        self.db.save_result(result)
+        self._print_result(result)
+
+        return result
+
+    def _print_speed(self, probe: Dict):
+        """Print per-clip and per-stage speed results"""
+        print(f"\nSpeed ({probe['model']} on {probe['device']}, {probe['compute_type']}, "
+              f"{probe['warmup']} warmup + {len(probe['repetitions'])} measured passes):")
+        samples = [r['realtime_factor'] for r in probe['repetitions'] if r['realtime_factor']]
+        if samples:
+            summary = stats.summarize(samples)
+            print(f"  Realtime factor:  median {summary['median']:.1f}x, p95 {summary['p95']:.1f}x, "
+                  f"95% CI [{summary['ci_low']:.1f}x, {summary['ci_high']:.1f}x]")
+        for clip in probe['clips']:
+            rtf = f"{clip['realtime_factor']:.1f}x" if clip['realtime_factor'] else "N/A"
+            print(f"  {Path(clip['clip']).name}: {clip['audio_seconds']:.1f}s audio "
+                  f"in {clip['processing_seconds']:.2f}s ({rtf} realtime)")
+
+        stage_totals: Dict[str, float] = {}
+        for stage in probe['stages']:
+            stage_totals[stage['stage']] = stage_totals.get(stage['stage'], 0.0) + stage['seconds']
+        for stage, seconds in stage_totals.items():
+            print(f"  {stage:<18}{seconds:.2f}s")
+
+        print(f"  Peak RSS:         {probe['peak_rss_mb']:.0f} MB")
+        if probe['peak_vram_mb'] is not None:
+            print(f"  Peak VRAM:        {probe['peak_vram_mb']:.0f} MB")
+
     def _print_result(self, result: BenchmarkResult):
         """Print benchmark result summary"""
         print(f"\n{'='*60}")
@@ -380,10 +936,64 @@ class CUDABenchmark:
             print(f"GPU Name:       {result.gpu_name}")
         if result.vram_total_mb:
             print(f"VRAM:           {result.vram_used_mb:.0f} / {result.vram_total_mb:.0f} MB")
+        if result.runtime_speed_factor is not None:
+            print(f"Speed Factor:   {result.runtime_speed_factor:.2f}x baseline")
         print(f"Status:         {result.notes}")
         print(f"{'='*60}\n")
 
 
+def summarize_run(db: BenchmarkDatabase, test_id: str) -> Dict[str, Dict]:
+    """stats.summarize() of each measured metric recorded for a run"""
+    summaries = {}
+    for metric in MEASURED_METRICS:
+        samples = db.get_measurements(test_id, metric)
+        if samples:
+            summaries[metric] = stats.summarize(samples)
+    return summaries
+
+
+def compare_runs(db: BenchmarkDatabase, baseline_test_id: str, candidate_test_id: str) -> Dict[str, Dict]:
+    """stats.compare() per metric measured in both runs, with a verdict"""
+    results = {}
+    for metric, higher_is_better in MEASURED_METRICS.items():
+        baseline = db.get_measurements(baseline_test_id, metric)
+        candidate = db.get_measurements(candidate_test_id, metric)
+        if baseline and candidate:
+            result = stats.compare(baseline, candidate)
+            result['verdict'] = stats.verdict(result, higher_is_better)
+            results[metric] = result
+    return results
+
+
+def _format_ci(low: Optional[float], high: Optional[float]) -> str:
+    if low is None:
+        return "N/A"
+    return f"[{low:+.3g}, {high:+.3g}]"
+
+
+def print_run_comparison(baseline_test_id: str, candidate_test_id: str):
+    """Console comparison of two runs' repeated measurements"""
+    db = BenchmarkDatabase()
+    for test_id in (baseline_test_id, candidate_test_id):
+        print(f"\n{test_id}:")
+        summaries = summarize_run(db, test_id)
+        if not summaries:
+            print("  no repeated measurements recorded")
+        for metric, summary in summaries.items():
+            print(f"  {metric:<20}n={summary['n']:<3} median {summary['median']:.3f}  "
+                  f"p95 {summary['p95']:.3f}  95% CI [{summary['ci_low']:.3f}, {summary['ci_high']:.3f}]")
+
+    print(f"\n{candidate_test_id} vs {baseline_test_id}:")
+    comparison = compare_runs(db, baseline_test_id, candidate_test_id)
+    if not comparison:
+        print("  no metrics measured in both runs")
+    for metric, result in comparison.items():
+        relative = f" ({result['relative'] * 100:+.1f}%)" if result['relative'] is not None else ""
+        print(f"  {metric:<20}{result['difference']:+.3f}{relative}  "
+              f"95% CI {_format_ci(result['ci_low'], result['ci_high'])}  -> {result['verdict']}")
+    db.close()
+
+
 def generate_comparison_report(service: str, cuda_versions: List[str]):
     """Generate markdown comparison report"""
     db = BenchmarkDatabase()
@@ -400,8 +1010,8 @@ def generate_comparison_report(service: str, cuda_versions: List[str]):
         f.write(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n")
 
         # Table header
-        f.write("| CUDA Ver | PyTorch | Build Time | Image Size | GPU | VRAM Used | Status |\n")
-        f.write("|----------|---------|------------|------------|-----|-----------|--------|\n")
+        f.write("| CUDA Ver | PyTorch | Build Time | Image Size | GPU | VRAM Used | Speed | Status |\n")
+        f.write("|----------|---------|------------|------------|-----|-----------|-------|--------|\n")
 
         # Sort by CUDA version
         sorted_versions = sorted(comparison.items(), key=lambda x: x[0])
@@ -413,6 +1023,7 @@ def generate_comparison_report(service: str, cuda_versions: List[str]):
             f.write(f"{result['image_size_mb']:.0f}MB | ")
             f.write(f"{'✓' if result['gpu_available'] else '✗'} | ")
             f.write(f"{result['vram_used_mb']:.0f}MB | " if result['vram_used_mb'] else "N/A | ")
+            f.write(f"{result['runtime_speed_factor']:.2f}x | " if result['runtime_speed_factor'] else "N/A | ")
             f.write(f"{result['notes']} |\n")
 
         # Find winner
@@ -424,10 +1035,106 @@ def generate_comparison_report(service: str, cuda_versions: List[str]):
         if working_versions:
             f.write(f"**Working Versions**: {', '.join(working_versions)}\n")
 
+        # Repeated measurements (speed test passes, startup time)
+        measured = [
+            (version, result['test_id'], summarize_run(db, result['test_id']))
+            for version, result in sorted_versions
+        ]
+        measured = [m for m in measured if m[2]]
+        if measured:
+            f.write("\n## Statistical Comparison\n\n")
+            f.write("Median and p95 over the measured passes, with 95% bootstrap confidence intervals of the median.\n\n")
+            f.write("| CUDA Ver | Metric | n | Median | p95 | 95% CI |\n")
+            f.write("|----------|--------|---|--------|-----|--------|\n")
+            for version, _, summaries in measured:
+                for metric, summary in summaries.items():
+                    f.write(f"| {version} | {metric} | {summary['n']} | {summary['median']:.3g} | "
+                            f"{summary['p95']:.3g} | [{summary['ci_low']:.3g}, {summary['ci_high']:.3g}] |\n")
+
+            baseline_version, baseline_test_id, _ = measured[0]
+            if len(measured) > 1:
+                f.write(f"\n### Differences vs CUDA {baseline_version}\n\n")
+                f.write("| CUDA Ver | Metric | Δ Median | Δ % | 95% CI of Δ | Verdict |\n")
+                f.write("|----------|--------|----------|-----|-------------|---------|\n")
+                for version, test_id, _ in measured[1:]:
+                    for metric, result in compare_runs(db, baseline_test_id, test_id).items():
+                        relative = f"{result['relative'] * 100:+.1f}%" if result['relative'] is not None else "N/A"
+                        f.write(f"| {version} | {metric} | {result['difference']:+.3g} | {relative} | "
+                                f"{_format_ci(result['ci_low'], result['ci_high'])} | {result['verdict']} |\n")
+
     print(f"\nComparison report saved to: {report_path}")
     db.close()
 
 
+def import_accuracy_results(service: str, results_dir: Path = ACCURACY_RESULTS_DIR):
+    """
+    Score stored /transcribe outputs (accuracy-results/*.json) against the
+    reference transcripts and compare CUDA versions within each test run.
+
+    Timestamp drift is measured against the lowest CUDA version that
+    succeeded in the same run.
+    """
+    references = accuracy.load_reference_transcripts(REFERENCE_TRANSCRIPTS)
+    if not references:
+        print(f"No reference transcripts at {REFERENCE_TRANSCRIPTS}; WER/CER will be N/A")
+
+    runs: Dict[tuple, List[Dict]] = {}
+    for path in sorted(results_dir.glob("result_*.json")):
+        parsed = accuracy.load_result_file(path)
+        if parsed:
+            runs.setdefault((parsed['run'], parsed['cuda_version']), []).append(parsed)
+
+    if not runs:
+        print(f"No result files found in {results_dir}")
+        return
+
+    db = BenchmarkDatabase()
+    print(f"\n{'Run':<17}{'CUDA':<7}{'Clips':>6}{'Failed':>8}{'WER':>8}{'CER':>8}{'Drift':>9}")
+
+    for run in sorted({run for run, _ in runs}):
+        versions = sorted((v for r, v in runs if r == run), key=lambda v: [int(p) for p in v.split('.')])
+        reference_words = {}
+        for version in versions:
+            if any(not r['error'] for r in runs[(run, version)]):
+                reference_words = {r['clip']: r['words'] for r in runs[(run, version)] if not r['error']}
+                break
+
+        for version in versions:
+            rows = []
+            for result in runs[(run, version)]:
+                reference = references.get(result['clip'])
+                drift = None
+                if not result['error'] and reference_words.get(result['clip']):
+                    drift = accuracy.timestamp_drift(reference_words[result['clip']], result['words'])
+                scored = reference and not result['error']
+                rows.append({
+                    "clip": result['clip'],
+                    "reference": reference,
+                    "hypothesis": result['text'],
+                    "wer": accuracy.wer(reference, result['text']) if scored else None,
+                    "cer": accuracy.cer(reference, result['text']) if scored else None,
+                    "drift_mean_ms": drift['mean_ms'] if drift else None,
+                    "drift_max_ms": drift['max_ms'] if drift else None,
+                    "words": result['words'],
+                    "error": result['error']
+                })
+
+            db.save_accuracy_results(f"{service}-{version}-{run}", service, version, rows)
+
+            succeeded = [r for r in rows if not r['error']]
+            wer, cer = accuracy.corpus_error_rates(succeeded)
+            drifts = [r['drift_mean_ms'] for r in succeeded if r['drift_mean_ms'] is not None]
+            print(f"{run:<17}{version:<7}{len(rows):>6}{len(rows) - len(succeeded):>8}"
+                  f"{f'{wer * 100:.1f}%' if wer is not None else 'N/A':>8}"
+                  f"{f'{cer * 100:.1f}%' if cer is not None else 'N/A':>8}"
+                  f"{f'{sum(drifts) / len(drifts):.0f}ms' if drifts else 'N/A':>9}")
+            for row in rows:
+                if row['error']:
+                    print(f"    {row['clip']}: {row['error'].splitlines()[0][:80]}")
+
+    db.close()
+
+
 def main():
     parser = argparse.ArgumentParser(description="CUDA/PyTorch Benchmark Suite")
     parser.add_argument("--service", help="Service to benchmark (e.g., whisperx)")
@@ -435,6 +1142,32 @@ def main():
     parser.add_argument("--compare", action="store_true", help="Generate comparison report")
     parser.add_argument("--report", action="store_true", help="Show latest results")
     parser.add_argument("--list", action="store_true", help="List all test results")
+    parser.add_argument("--speed", action="store_true", help="Run the transcription speed test")
+    parser.add_argument("--local", action="store_true",
+                        help="Run the speed test in this interpreter (no build/container)")
+    parser.add_argument("--device", default=None, choices=["auto", "cpu", "cuda"],
+                        help="Speed test device (default: auto, cpu with --local)")
+    parser.add_argument("--model", default="tiny", help="Speed test model size (default: tiny)")
+    parser.add_argument("--compute-type", help="Speed test compute type (default: float16 on cuda, int8 on cpu)")
+    parser.add_argument("--accuracy", action="store_true",
+                        help="Score the speed test transcripts and fail on regression vs the previous run")
+    parser.add_argument("--baseline", help="Test ID to gate against (default: previous comparable run)")
+    parser.add_argument("--speed-tolerance", type=float, default=accuracy.SPEED_TOLERANCE,
+                        help="Max relative real-time factor drop (default: %(default)s)")
+    parser.add_argument("--wer-tolerance", type=float, default=accuracy.WER_TOLERANCE,
+                        help="Max absolute WER increase (default: %(default)s)")
+    parser.add_argument("--cer-tolerance", type=float, default=accuracy.CER_TOLERANCE,
+                        help="Max absolute CER increase (default: %(default)s)")
+    parser.add_argument("--drift-tolerance-ms", type=float, default=accuracy.DRIFT_TOLERANCE_MS,
+                        help="Max mean word timestamp drift in ms (default: %(default)s)")
+    parser.add_argument("--warmup", type=int, default=1,
+                        help="Unmeasured speed test passes before measuring (default: %(default)s)")
+    parser.add_argument("--repetitions", type=int, default=5,
+                        help="Measured speed test passes (default: %(default)s)")
+    parser.add_argument("--compare-runs", nargs=2, metavar=("BASELINE", "CANDIDATE"),
+                        help="Compare two test IDs and report whether they differ significantly")
+    parser.add_argument("--import-accuracy-results", nargs="?", const=ACCURACY_RESULTS_DIR, type=Path,
+                        metavar="DIR", help="Score stored accuracy-results/*.json per CUDA version")
 
     args = parser.parse_args()
 
@@ -461,13 +1194,41 @@ def main():
         db.close()
         return
 
-    if not args.service or not args.cuda_version:
+    if args.compare_runs:
+        print_run_comparison(*args.compare_runs)
+        return
+
+    if args.import_accuracy_results:
+        import_accuracy_results(args.service or "whisperx", args.import_accuracy_results)
+        return
+
+    if not args.service or not (args.cuda_version or args.local):
         parser.print_help()
         sys.exit(1)
 
     # Run benchmark
-    benchmark = CUDABenchmark(args.service, args.cuda_version)
-    result = benchmark.run_full_benchmark()
+    benchmark = CUDABenchmark(
+        args.service,
+        args.cuda_version or "local",
+        speed=args.speed or args.local,
+        device=args.device or ("cpu" if args.local else "auto"),
+        model=args.model,
+        compute_type=args.compute_type,
+        accuracy=args.accuracy,
+        baseline_test_id=args.baseline,
+        tolerances={
+            "speed_tolerance": args.speed_tolerance,
+            "wer_tolerance": args.wer_tolerance,
+            "cer_tolerance": args.cer_tolerance,
+            "drift_tolerance_ms": args.drift_tolerance_ms
+        },
+        warmup=args.warmup,
+        repetitions=args.repetitions
+    )
+    if args.local:
+        result = benchmark.run_local_speed_benchmark()
+    else:
+        result = benchmark.run_full_benchmark()
 
     if args.compare:
         # Generate comparison with other versions
@@ -476,6 +1237,9 @@ def main():
 
     benchmark.db.close()
 
+    if benchmark.gate_passed is False:
+        sys.exit(1)
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+"""
+WhisperX Speed Probe
+Runs audio clips through the WhisperX pipeline stages and reports timings
+
+Runs wherever whisperx is importable: inside the service container (fed on
+stdin by benchmark.py --speed) or in a local environment (--local, CPU + tiny
+model for GPU-less CI). The result is printed as a single JSON line prefixed
+with RESULT_MARKER so library log output on stdout does not interfere.
+
+The corpus is processed --warmup times unmeasured (CUDA context, cuDNN
+autotuning, page cache), then --repeat times. Each measured pass is reported
+under "repetitions"; stage and clip timings are medians across passes.
+
+Usage:
+    python3 speed_probe.py --device cpu --model tiny clip1.flac clip2.flac
+    docker compose exec -T whisperx python3 - --device cuda clip.flac < speed_probe.py
+"""
+
+import argparse
+import ctypes
+import json
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import threading
+import time
+
+RESULT_MARKER = "SPEED_PROBE_RESULT "
+SAMPLE_RATE = 16000
+
+# Stages that count towards a clip's processing time (model loads are one-off)
+CLIP_STAGES = ("load_audio", "transcribe", "align")
+ONE_OFF_STAGES = ("model_load", "align_model_load")
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process (ru_maxrss is KiB on Linux)"""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _visible_index() -> int:
+    """Device index of the first GPU CUDA uses (numeric CUDA_VISIBLE_DEVICES only)"""
+    first = os.getenv("CUDA_VISIBLE_DEVICES", "0").split(",")[0].strip()
+    return int(first) if first.isdigit() else 0
+
+
+class _NvmlMemory(ctypes.Structure):
+    _fields_ = [("total", ctypes.c_ulonglong), ("free", ctypes.c_ulonglong), ("used", ctypes.c_ulonglong)]
+
+
+class DeviceMemorySampler:
+    """
+    Peak device memory in use, sampled on a background thread.
+
+    torch.cuda.max_memory_allocated() only counts torch's caching allocator,
+    so the CTranslate2 (faster-whisper) model is missing from it. NVML, as
+    in whisperx/gpu.py (inlined: this script is piped into the container),
+    or else nvidia-smi report the whole device. That includes other
+    processes, so the usage before the run is recorded as the baseline.
+    """
+
+    def __init__(self, interval: float = 0.05):
+        self.interval = interval
+        self.index = _visible_index()
+        self.baseline_mb = None
+        self.peak_mb = None
+        self._read = self._nvml_reader() or self._smi_reader()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _nvml_reader(self):
+        try:
+            library = ctypes.CDLL("libnvidia-ml.so.1")
+            handle = ctypes.c_void_p()
+            if (library.nvmlInit_v2() != 0
+                    or library.nvmlDeviceGetHandleByIndex_v2(self.index, ctypes.byref(handle)) != 0):
+                return None
+        except (OSError, AttributeError):
+            return None
+
+        def read():
+            memory = _NvmlMemory()
+            if library.nvmlDeviceGetMemoryInfo(handle, ctypes.byref(memory)) != 0:
+                return None
+            return memory.used / 1024 ** 2
+        return read if read() is not None else None
+
+    def _smi_reader(self):
+        def read():
+            try:
+                out = subprocess.run(
+                    ["nvidia-smi", "-i", str(self.index), "--query-gpu=memory.used",
+                     "--format=csv,noheader,nounits"],
+                    capture_output=True, text=True, timeout=5, check=True
+                ).stdout
+                return float(out.strip().splitlines()[0])
+            except (OSError, subprocess.SubprocessError, ValueError, IndexError):
+                return None
+        if read() is None:
+            return None
+        # nvidia-smi is a process per sample
+        self.interval = max(self.interval, 0.25)
+        return read
+
+    def _sample(self):
+        used = self._read()
+        if used is not None:
+            self.peak_mb = used if self.peak_mb is None else max(self.peak_mb, used)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def start(self):
+        if self._read is None:
+            return
+        self.baseline_mb = self._read()
+        self._sample()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Peak device memory in use in MB, or None without NVML and nvidia-smi"""
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._sample()
+        return self.peak_mb
+
+
+def main():
+    parser = argparse.ArgumentParser(description="WhisperX speed probe")
+    parser.add_argument("clips", nargs="+", help="Audio files to transcribe")
+    parser.add_argument("--device", default="auto", choices=["auto", "cpu", "cuda"])
+    parser.add_argument("--model", default="tiny", help="Whisper model size")
+    parser.add_argument("--compute-type", help="Defaults to float16 on cuda, int8 on cpu")
+    parser.add_argument("--batch-size", type=int, default=8)
+    parser.add_argument("--language", default="en", help="Skip language detection")
+    parser.add_argument("--no-align", action="store_true", help="Skip the alignment stage")
+    parser.add_argument("--warmup", type=int, default=0, help="Unmeasured passes over the corpus")
+    parser.add_argument("--repeat", type=int, default=1, help="Measured passes over the corpus")
+    args = parser.parse_args()
+
+    import torch
+    import whisperx
+
+    device = args.device
+    if device == "auto":
+        device = "cuda" if torch.cuda.is_available() else "cpu"
+    compute_type = args.compute_type or ("float16" if device == "cuda" else "int8")
+
+    vram_sampler = DeviceMemorySampler() if device == "cuda" else None
+    if vram_sampler:
+        vram_sampler.start()
+
+    stages = []
+    current_pass = None
+
+    def timed(stage, clip, fn):
+        start = time.perf_counter()
+        value = fn()
+        if device == "cuda":
+            torch.cuda.synchronize()
+        stages.append({"clip": clip, "stage": stage, "pass": current_pass,
+                       "seconds": time.perf_counter() - start})
+        return value
+
+    model = timed("model_load", None, lambda: whisperx.load_model(
+        args.model, device, compute_type=compute_type, language=args.language
+    ))
+
+    align_models = {}
+    clip_results = {}
+
+    def run_clip(path):
+        audio = timed("load_audio", path, lambda: whisperx.load_audio(path))
+        result = timed("transcribe", path, lambda: model.transcribe(audio, batch_size=args.batch_size))
+        language = result.get("language") or args.language
+
+        if not args.no_align and result["segments"]:
+            if language not in align_models:
+                align_models[language] = timed("align_model_load", path, lambda: whisperx.load_align_model(
+                    language_code=language, device=device
+                ))
+            model_a, metadata = align_models[language]
+            result = timed("align", path, lambda: whisperx.align(
+                result["segments"], model_a, metadata, audio, device, return_char_alignments=False
+            ))
+
+        clip_results[path] = (len(audio) / SAMPLE_RATE, result)
+
+    measured_passes = list(range(max(1, args.repeat)))
+    for current_pass in [None] * args.warmup + measured_passes:
+        for path in args.clips:
+            run_clip(path)
+
+    def clip_seconds(path, pass_index):
+        return sum(
+            s["seconds"] for s in stages
+            if s["clip"] == path and s["pass"] == pass_index and s["stage"] in CLIP_STAGES
+        )
+
+    repetitions = []
+    for pass_index in measured_passes:
+        processing = sum(clip_seconds(path, pass_index) for path in args.clips)
+        audio_seconds = sum(clip_results[path][0] for path in args.clips)
+        repetitions.append({
+            "processing_seconds": processing,
+            "realtime_factor": audio_seconds / processing if processing else None
+        })
+
+    clips = []
+    for path in args.clips:
+        audio_seconds, result = clip_results[path]
+        processing_seconds = statistics.median(clip_seconds(path, i) for i in measured_passes)
+        words = [
+            {"word": w.get("word", ""), "start": w.get("start"), "end": w.get("end")}
+            for seg in result["segments"]
+            for w in seg.get("words", [])
+        ]
+        clips.append({
+            "clip": path,
+            "audio_seconds": audio_seconds,
+            "processing_seconds": processing_seconds,
+            "realtime_factor": audio_seconds / processing_seconds if processing_seconds else None,
+            "segments": len(result["segments"]),
+            "text": " ".join(seg["text"].strip() for seg in result["segments"]),
+            "words": words
+        })
+
+    # One-off loads as recorded; per-clip stages as the median over measured passes
+    stage_summary = [
+        {"clip": s["clip"], "stage": s["stage"], "seconds": s["seconds"]}
+        for s in stages if s["stage"] in ONE_OFF_STAGES
+    ]
+    for path in args.clips:
+        for stage in CLIP_STAGES:
+            samples = [s["seconds"] for s in stages
+                       if s["clip"] == path and s["stage"] == stage and s["pass"] is not None]
+            if samples:
+                stage_summary.append({"clip": path, "stage": stage, "seconds": statistics.median(samples)})
+
+    peak_vram_mb = vram_sampler.stop() if vram_sampler else None
+    if device == "cuda" and peak_vram_mb is None:
+        # No NVML or nvidia-smi: torch's allocator only (misses CTranslate2's memory)
+        peak_vram_mb = torch.cuda.max_memory_allocated() / 1024 ** 2
+
+    audio_total = sum(c["audio_seconds"] for c in clips)
+    processing_total = statistics.median(r["processing_seconds"] for r in repetitions)
+
+    print(RESULT_MARKER + json.dumps({
+        "device": device,
+        "model": args.model,
+        "compute_type": compute_type,
+        "torch_version": torch.__version__,
+        "clips": clips,
+        "stages": stage_summary,
+        "warmup": args.warmup,
+        "repetitions": repetitions,
+        "audio_seconds": audio_total,
+        "processing_seconds": processing_total,
+        "realtime_factor": audio_total / processing_total if processing_total else None,
+        "peak_rss_mb": peak_rss_mb(),
+        "peak_vram_mb": peak_vram_mb,
+        "vram_baseline_mb": vram_sampler.baseline_mb if vram_sampler else None
+    }))
+    sys.stdout.flush()
+
+
+if __name__ == "__main__":
+    main()
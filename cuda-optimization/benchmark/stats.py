@@ -0,0 +1,111 @@
+"""
+Benchmark Statistics
+Summaries and significance tests for repeated measurements
+
+Repeated runs are summarized by median and p95 with percentile-bootstrap
+confidence intervals; two configurations differ significantly when the
+bootstrap interval of the difference in medians excludes zero. Seeded, so
+reports are reproducible.
+"""
+
+import random
+import statistics
+from typing import Callable, Dict, Sequence
+
+BOOTSTRAP_RESAMPLES = 2000
+CONFIDENCE = 0.95
+SEED = 1234
+
+
+def percentile(values: Sequence[float], pct: float) -> float:
+    """Linear-interpolated percentile (pct in 0-100)"""
+    ordered = sorted(values)
+    if not ordered:
+        raise ValueError("percentile of empty sequence")
+    rank = (len(ordered) - 1) * pct / 100
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def bootstrap_ci(
+    values: Sequence[float],
+    statistic: Callable[[Sequence[float]], float] = statistics.median,
+    confidence: float = CONFIDENCE,
+    resamples: int = BOOTSTRAP_RESAMPLES,
+    seed: int = SEED
+) -> tuple[float, float]:
+    """Percentile bootstrap confidence interval of statistic(values)"""
+    if len(values) < 2:
+        value = statistic(values)
+        return value, value
+    rng = random.Random(seed)
+    n = len(values)
+    estimates = [statistic([values[rng.randrange(n)] for _ in range(n)]) for _ in range(resamples)]
+    tail = (1 - confidence) / 2 * 100
+    return percentile(estimates, tail), percentile(estimates, 100 - tail)
+
+
+def summarize(values: Sequence[float], confidence: float = CONFIDENCE) -> Dict:
+    """n, median, p95, mean, stdev and the bootstrap CI of the median"""
+    values = list(values)
+    ci_low, ci_high = bootstrap_ci(values, confidence=confidence)
+    return {
+        "n": len(values),
+        "median": statistics.median(values),
+        "p95": percentile(values, 95),
+        "mean": statistics.fmean(values),
+        "stdev": statistics.stdev(values) if len(values) > 1 else 0.0,
+        "ci_low": ci_low,
+        "ci_high": ci_high
+    }
+
+
+def compare(
+    baseline: Sequence[float],
+    candidate: Sequence[float],
+    confidence: float = CONFIDENCE,
+    resamples: int = BOOTSTRAP_RESAMPLES,
+    seed: int = SEED
+) -> Dict:
+    """
+    Difference in medians (candidate - baseline) with a bootstrap CI.
+
+    Each resample draws both groups independently with replacement.
+    significant is True when the interval excludes zero; with fewer than two
+    samples on either side there is not enough data to decide.
+    """
+    baseline, candidate = list(baseline), list(candidate)
+    difference = statistics.median(candidate) - statistics.median(baseline)
+    relative = difference / statistics.median(baseline) if statistics.median(baseline) else None
+
+    if len(baseline) < 2 or len(candidate) < 2:
+        return {"difference": difference, "relative": relative,
+                "ci_low": None, "ci_high": None, "significant": False}
+
+    rng = random.Random(seed)
+    nb, nc = len(baseline), len(candidate)
+    estimates = [
+        statistics.median([candidate[rng.randrange(nc)] for _ in range(nc)])
+        - statistics.median([baseline[rng.randrange(nb)] for _ in range(nb)])
+        for _ in range(resamples)
+    ]
+    tail = (1 - confidence) / 2 * 100
+    ci_low, ci_high = percentile(estimates, tail), percentile(estimates, 100 - tail)
+    return {
+        "difference": difference,
+        "relative": relative,
+        "ci_low": ci_low,
+        "ci_high": ci_high,
+        "significant": ci_low > 0 or ci_high < 0
+    }
+
+
+def verdict(result: Dict, higher_is_better: bool = True) -> str:
+    """One-line reading of a compare() result"""
+    if result["ci_low"] is None:
+        return "not enough samples"
+    if not result["significant"]:
+        return "no significant difference"
+    better = (result["difference"] > 0) == higher_is_better
+    return "significantly faster" if better else "significantly slower"
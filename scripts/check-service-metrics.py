@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Service Status Metrics Check
+Runs MetricsCollector.collect() against a fake Docker daemon on a UNIX socket
+
+The fake daemon serves /containers/json and two rounds of
+/containers/{id}/stats documents with known counters, then the computed CPU%,
+memory and network/block I/O rates are compared with the expected values:
+- whisperx: cgroup v2 memory, online_cpus, two networks, mixed-case blkio ops
+- n8n: cgroup v1 memory (both inactive_file and total_inactive_file),
+  percpu_usage instead of online_cpus, no networks (host network mode),
+  sampled 3 s apart instead of 2 s
+- broken: stats request fails with 500 and is counted as an error
+
+Usage:
+    python scripts/check-service-metrics.py
+"""
+
+import importlib.util
+import json
+import os
+import socketserver
+import sys
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler
+from pathlib import Path
+
+MiB = 1024 ** 2
+
+CONTAINERS = [
+    {"Id": "a" * 64, "Names": ["/whisperx"], "Image": "whisperx:latest"},
+    {"Id": "b" * 64, "Names": ["/n8n"], "Image": "n8nio/n8n"},
+    {"Id": "c" * 64, "Names": ["/broken"], "Image": "broken"},
+]
+
+
+def whisperx_stats(sample):
+    cpu = [1e9, 2e9, 3.5e9][sample:sample + 2]
+    system = [10e9, 20e9, 30e9][sample:sample + 2]
+    return {
+        "read": f"2026-01-01T00:00:0{2 * sample}.123456789Z",
+        "precpu_stats": {"cpu_usage": {"total_usage": cpu[0]}, "system_cpu_usage": system[0]},
+        "cpu_stats": {"cpu_usage": {"total_usage": cpu[1]}, "system_cpu_usage": system[1], "online_cpus": 4},
+        "memory_stats": {"usage": 600 * MiB, "limit": 2048 * MiB, "stats": {"inactive_file": 100 * MiB}},
+        "networks": {
+            "eth0": {"rx_bytes": [1000, 5000][sample], "tx_bytes": [500, 1500][sample]},
+            "eth1": {"rx_bytes": [24, 1024][sample], "tx_bytes": 0}
+        },
+        "blkio_stats": {"io_service_bytes_recursive": [
+            {"op": "Read", "value": 4096 + sample * 2 * MiB},
+            {"op": "Write", "value": 8192 + sample * MiB},
+            {"op": "Total", "value": 12288 + sample * 3 * MiB}
+        ]},
+        "pids_stats": {"current": 12}
+    }
+
+
+def n8n_stats(sample):
+    return {
+        "read": f"2026-01-01T00:00:0{3 * sample}Z",
+        "precpu_stats": {"cpu_usage": {"total_usage": sample * 5e8}, "system_cpu_usage": sample * 1e10},
+        "cpu_stats": {"cpu_usage": {"total_usage": (sample + 1) * 5e8, "percpu_usage": [0, 0]},
+                      "system_cpu_usage": (sample + 1) * 1e10},
+        "memory_stats": {"usage": 300 * MiB, "limit": 0, "stats": {"inactive_file": 4 * MiB, "total_inactive_file": 44 * MiB}},
+        "networks": None,
+        "blkio_stats": {"io_service_bytes_recursive": [{"op": "write", "value": sample * 3 * MiB}]},
+        "pids_stats": {"current": 3}
+    }
+
+
+STATS = {"a" * 64: whisperx_stats, "b" * 64: n8n_stats}
+
+# Expected entries per round; rates are None until the second sample
+EXPECTED = [
+    {
+        "whisperx": {"cpu_percent": 40.0, "memory_usage_bytes": 500 * MiB, "memory_limit_bytes": 2048 * MiB,
+                     "memory_percent": 24.41, "network_rx_bytes": 1024, "network_tx_bytes": 500,
+                     "block_read_bytes": 4096, "block_write_bytes": 8192, "pids": 12,
+                     "network_rx_bytes_per_second": None, "block_read_bytes_per_second": None},
+        "n8n": {"cpu_percent": 10.0, "memory_usage_bytes": 256 * MiB, "memory_percent": 0.0,
+                "network_rx_bytes": 0, "block_write_bytes": 0,
+                "network_rx_bytes_per_second": None, "block_write_bytes_per_second": None}
+    },
+    {
+        "whisperx": {"cpu_percent": 60.0, "network_rx_bytes": 6024, "network_tx_bytes": 1500,
+                     "network_rx_bytes_per_second": 2500.0, "network_tx_bytes_per_second": 500.0,
+                     "block_read_bytes_per_second": float(MiB), "block_write_bytes_per_second": MiB / 2},
+        "n8n": {"cpu_percent": 10.0, "network_rx_bytes_per_second": 0.0, "network_tx_bytes_per_second": 0.0,
+                "block_read_bytes_per_second": 0.0, "block_write_bytes_per_second": float(MiB)}
+    }
+]
+
+
+class FakeDockerHandler(BaseHTTPRequestHandler):
+    """Docker Engine API subset; keep-alive like the real daemon"""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        path = self.path.split("?", 1)[0]
+        parts = path.strip("/").split("/")
+        if path == "/containers/json":
+            self.reply(200, CONTAINERS)
+        elif len(parts) == 3 and parts[0] == "containers" and parts[2] == "stats":
+            stats = STATS.get(parts[1])
+            if stats is None:
+                self.reply(500, {"message": "stats unavailable"})
+            else:
+                self.reply(200, stats(self.server.sample))
+        else:
+            self.reply(404, {"message": "page not found"})
+
+    def reply(self, status, document):
+        body = json.dumps(document).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FakeDockerServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, socket_path):
+        super().__init__(socket_path, FakeDockerHandler)
+        self.sample = 0
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+
+
+def load_service_status():
+    """Import service-status.py (not a valid module name)"""
+    path = Path(__file__).resolve().parent.parent / "service-status.py"
+    spec = importlib.util.spec_from_file_location("service_status", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def check_round(snapshot, expected):
+    failures = []
+    entries = {entry["name"]: entry for entry in snapshot["containers"]}
+    for name, fields in expected.items():
+        entry = entries.get(name)
+        if entry is None:
+            failures.append(f"{name}: missing")
+            continue
+        for field, value in fields.items():
+            if entry.get(field) != value:
+                failures.append(f"{name}.{field}: expected {value}, got {entry.get(field)}")
+    return failures
+
+
+def main():
+    service_status = load_service_status()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        socket_path = os.path.join(workdir, "docker.sock")
+        server = FakeDockerServer(socket_path)
+        server.start()
+        metrics = service_status.MetricsCollector(socket_path, workers=2)
+
+        failures = []
+        for sample, expected in enumerate(EXPECTED):
+            server.sample = sample
+            metrics.collect()
+            round_failures = check_round(metrics.snapshot, expected)
+            print(f"Round {sample + 1}: {len(expected)} containers, "
+                  f"{'OK' if not round_failures else f'{len(round_failures)} mismatches'}")
+            failures.extend(f"round {sample + 1} {failure}" for failure in round_failures)
+
+        collector = metrics.snapshot["collector"]
+        if (collector["containers"], collector["collect_count"], collector["error_count"]) != (3, 2, 2):
+            failures.append(f"collector: expected 3 containers, 2 collects, 2 errors, got {collector}")
+
+        exposition = service_status.render_prometheus(metrics.snapshot)
+        rx_line = f'container_network_rx_bytes_per_second{{name="whisperx",id="{"a" * 12}"}} 2500.0'
+        if rx_line not in exposition.splitlines():
+            failures.append(f"prometheus: missing {rx_line}")
+
+        server.shutdown()
+        server.server_close()
+
+    for failure in failures:
+        print(f"FAIL {failure}")
+    print("All metrics checks passed" if not failures else f"{len(failures)} checks failed")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
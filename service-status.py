@@ -1,53 +1,429 @@
-from flask import Flask, jsonify
+from flask import Flask, Response, jsonify
 from flask_cors import CORS
-import subprocess
+from concurrent.futures import ThreadPoolExecutor
+import http.client
 import json
 import os
+import socket
+import threading
 import time
 from datetime import datetime
+from urllib.parse import quote
 
 app = Flask(__name__)
 CORS(app)
 
-def get_status():
-    # Check backup status
+DOCKER_SOCKET = os.getenv("DOCKER_SOCKET", "/var/run/docker.sock")
+BACKUP_DIR = os.getenv("BACKUP_DIR", "/backup")
+REFRESH_INTERVAL = float(os.getenv("STATUS_REFRESH_INTERVAL", "15"))
+MIN_REFRESH_GAP = 1.0  # Debounce bursts of Docker events
+METRICS_INTERVAL = float(os.getenv("METRICS_INTERVAL", "15"))
+METRICS_WORKERS = int(os.getenv("METRICS_WORKERS", "8"))
+
+# Container events that change what the status page shows
+WATCHED_EVENTS = ["create", "start", "stop", "die", "restart", "pause", "unpause", "destroy", "health_status"]
+
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+    """HTTP connection over a UNIX domain socket (Docker Engine API)"""
+
+    def __init__(self, socket_path, timeout=5):
+        super().__init__("localhost", timeout=timeout)
+        self.socket_path = socket_path
+
+    def connect(self):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        sock.connect(self.socket_path)
+        self.sock = sock
+
+
+class DockerClient:
+    """Minimal Docker API client that keeps one connection open between calls"""
+
+    def __init__(self, socket_path=DOCKER_SOCKET):
+        self.socket_path = socket_path
+        self.conn = None
+
+    def get_json(self, path):
+        # Retry once on a fresh connection if the daemon closed the idle one
+        for attempt in range(2):
+            if self.conn is None:
+                self.conn = UnixHTTPConnection(self.socket_path)
+            try:
+                self.conn.request("GET", path)
+                response = self.conn.getresponse()
+                body = response.read()
+                if response.status != 200:
+                    raise RuntimeError(f"Docker API {path} returned {response.status}")
+                return json.loads(body)
+            except (http.client.HTTPException, OSError):
+                self.close()
+                if attempt:
+                    raise
+
+    def events(self, filters):
+        """Yield decoded events from the streaming /events endpoint"""
+        conn = UnixHTTPConnection(self.socket_path, timeout=None)
+        try:
+            conn.request("GET", "/events?filters=" + quote(json.dumps(filters)))
+            response = conn.getresponse()
+            if response.status != 200:
+                raise RuntimeError(f"Docker events returned {response.status}")
+            while True:
+                line = response.readline()
+                if not line:
+                    return
+                if line.strip():
+                    yield json.loads(line)
+        finally:
+            conn.close()
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+
+def get_backup_status():
     try:
-        latest = subprocess.check_output("ls -t /backup/backup-*.tar.gz 2>/dev/null | head -1", shell=True).decode().strip()
-        if latest:
-            timestamp = os.path.getmtime(latest)
-            now = time.time()
-            age = now - timestamp
+        latest_mtime = None
+        with os.scandir(BACKUP_DIR) as entries:
+            for entry in entries:
+                if entry.name.startswith("backup-") and entry.name.endswith(".tar.gz"):
+                    mtime = entry.stat().st_mtime
+                    if latest_mtime is None or mtime > latest_mtime:
+                        latest_mtime = mtime
+
+        if latest_mtime is not None:
+            age = time.time() - latest_mtime
             backup_status = "healthy" if age < 86400 else "overdue"
-            backup_time = datetime.fromtimestamp(timestamp).isoformat()
+            backup_time = datetime.fromtimestamp(latest_mtime).isoformat()
         else:
             backup_status = "no_backups"
             backup_time = None
-    except:
+    except FileNotFoundError:
+        backup_status = "no_backups"
+        backup_time = None
+    except Exception:
         backup_status = "error"
         backup_time = None
 
-    # Check service status
+    return {
+        "status": backup_status,
+        "last_backup": backup_time
+    }
+
+
+def get_service_status(docker):
     try:
-        result = subprocess.check_output(["curl", "-s", "--unix-socket", "/var/run/docker.sock", "http://localhost/containers/json"])
-        services = json.loads(result)
-        service_status = [{
+        services = docker.get_json("/containers/json")
+        return [{
             "name": container["Names"][0].lstrip("/"),
             "state": container["State"],
             "status": container["Status"]
         } for container in services]
-    except:
-        service_status = []
+    except Exception:
+        return []
+
+
+class StatusCollector:
+    """
+    Refreshes backup and container state in the background.
+
+    Requests are served from the last snapshot, so a page load never waits on
+    the filesystem or the Docker daemon. Snapshots are rebuilt on an interval
+    and whenever a relevant container event arrives.
+    """
+
+    def __init__(self, docker):
+        self.docker = docker
+        self.snapshot = {"backup": {"status": "unknown", "last_backup": None}, "services": [], "collector": {}}
+        self.refresh_count = 0
+        self.error_count = 0
+        self.events_connected = False
+        self._wake = threading.Event()
+
+    def refresh(self, trigger="interval"):
+        started = time.perf_counter()
+        backup = get_backup_status()
+        services = get_service_status(self.docker)
+        duration_ms = (time.perf_counter() - started) * 1000
+
+        self.refresh_count += 1
+        if backup["status"] == "error":
+            self.error_count += 1
+
+        # Replace the whole snapshot so readers never see a partial update
+        self.snapshot = {
+            "backup": backup,
+            "services": services,
+            "collector": {
+                "last_refresh": datetime.now().isoformat(),
+                "refresh_ms": round(duration_ms, 2),
+                "trigger": trigger,
+                "refresh_count": self.refresh_count,
+                "error_count": self.error_count,
+                "interval_seconds": REFRESH_INTERVAL,
+                "events_connected": self.events_connected
+            }
+        }
+
+    def run(self):
+        trigger = "startup"
+        while True:
+            try:
+                self.refresh(trigger)
+            except Exception as e:
+                self.error_count += 1
+                print(f"Status refresh failed: {e}")
+            woken = self._wake.wait(REFRESH_INTERVAL)
+            self._wake.clear()
+            trigger = "event" if woken else "interval"
+            if woken:
+                time.sleep(MIN_REFRESH_GAP)
+                self._wake.clear()
+
+    def watch_events(self):
+        filters = {"type": ["container"], "event": WATCHED_EVENTS}
+        while True:
+            try:
+                events = self.docker.events(filters)
+                self.events_connected = True
+                for _ in events:
+                    self._wake.set()
+            except Exception as e:
+                print(f"Docker events stream error: {e}")
+            self.events_connected = False
+            time.sleep(5)
+
+    def start(self):
+        threading.Thread(target=self.run, daemon=True).start()
+        threading.Thread(target=self.watch_events, daemon=True).start()
+
+
+def parse_docker_time(value):
+    """Parse Docker's RFC3339 nanosecond timestamps to epoch seconds"""
+    if not value or value.startswith("0001-"):
+        return None
+    value = value.rstrip("Z")
+    if "." in value:
+        base, frac = value.split(".", 1)
+        value = f"{base}.{frac[:6]}"
+    else:
+        value = f"{value}.000000"
+    return datetime.strptime(value, "%Y-%m-%dT%H:%M:%S.%f").timestamp()
+
+
+def summarize_stats(stats):
+    """Reduce a /containers/{id}/stats document to cumulative counters and gauges"""
+    cpu = stats.get("cpu_stats", {})
+    precpu = stats.get("precpu_stats", {})
+    cpu_delta = cpu.get("cpu_usage", {}).get("total_usage", 0) - precpu.get("cpu_usage", {}).get("total_usage", 0)
+    system_delta = cpu.get("system_cpu_usage", 0) - precpu.get("system_cpu_usage", 0)
+    online_cpus = cpu.get("online_cpus") or len(cpu.get("cpu_usage", {}).get("percpu_usage") or []) or 1
+    cpu_percent = (cpu_delta / system_delta) * online_cpus * 100 if cpu_delta > 0 and system_delta > 0 else 0.0
+
+    memory = stats.get("memory_stats", {})
+    memory_detail = memory.get("stats", {})
+    # Page cache is reclaimable; subtract it like `docker stats` does. cgroup v1
+    # reports both keys and the hierarchical total_inactive_file applies there
+    cache = memory_detail.get("total_inactive_file", memory_detail.get("inactive_file", 0))
+    memory_usage = max(memory.get("usage", 0) - cache, 0)
+    memory_limit = memory.get("limit", 0)
+
+    block_read = block_write = 0
+    for entry in (stats.get("blkio_stats", {}).get("io_service_bytes_recursive") or []):
+        op = entry.get("op", "").lower()
+        if op == "read":
+            block_read += entry.get("value", 0)
+        elif op == "write":
+            block_write += entry.get("value", 0)
+
+    networks = (stats.get("networks") or {}).values()
 
     return {
-        "backup": {
-            "status": backup_status,
-            "last_backup": backup_time
-        },
-        "services": service_status
+        "read_at": parse_docker_time(stats.get("read")),
+        "cpu_percent": round(cpu_percent, 2),
+        "memory_usage_bytes": memory_usage,
+        "memory_limit_bytes": memory_limit,
+        "memory_percent": round(memory_usage / memory_limit * 100, 2) if memory_limit else 0.0,
+        "block_read_bytes": block_read,
+        "block_write_bytes": block_write,
+        "network_rx_bytes": sum(n.get("rx_bytes", 0) for n in networks),
+        "network_tx_bytes": sum(n.get("tx_bytes", 0) for n in networks),
+        "pids": stats.get("pids_stats", {}).get("current", 0)
     }
 
+
+# Cumulative counters that are turned into per-second rates between samples
+RATE_FIELDS = ["block_read_bytes", "block_write_bytes", "network_rx_bytes", "network_tx_bytes"]
+
+
+class MetricsCollector:
+    """
+    Polls /containers/{id}/stats for every running container in parallel.
+
+    Each pool thread keeps its own persistent Docker connection. Byte counters
+    are converted to per-second rates from the delta with the previous sample
+    of the same container (rates are null until a second sample exists).
+    """
+
+    def __init__(self, socket_path=DOCKER_SOCKET, workers=METRICS_WORKERS):
+        self.socket_path = socket_path
+        self.docker = DockerClient(socket_path)
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="stats")
+        self._local = threading.local()
+        self.previous = {}  # {container_id: summary}
+        self.snapshot = {"containers": [], "collector": {}}
+        self.collect_count = 0
+        self.error_count = 0
+
+    def _client(self):
+        if not hasattr(self._local, "docker"):
+            self._local.docker = DockerClient(self.socket_path)
+        return self._local.docker
+
+    def _fetch(self, container):
+        try:
+            stats = self._client().get_json(f"/containers/{container['Id']}/stats?stream=false")
+            return container, summarize_stats(stats)
+        except Exception as e:
+            print(f"Stats collection failed for {container['Id'][:12]}: {e}")
+            return container, None
+
+    def collect(self):
+        started = time.perf_counter()
+        containers = self.docker.get_json("/containers/json")
+        results = list(self.pool.map(self._fetch, containers))
+
+        metrics = []
+        current = {}
+        errors = 0
+        for container, summary in results:
+            if summary is None:
+                errors += 1
+                continue
+            container_id = container["Id"]
+            current[container_id] = summary
+
+            entry = {
+                "id": container_id[:12],
+                "name": container["Names"][0].lstrip("/"),
+                "image": container.get("Image", ""),
+                **{k: v for k, v in summary.items() if k != "read_at"}
+            }
+
+            prev = self.previous.get(container_id)
+            elapsed = None
+            if prev and summary["read_at"] and prev["read_at"]:
+                elapsed = summary["read_at"] - prev["read_at"]
+            for field in RATE_FIELDS:
+                rate_key = field.replace("_bytes", "_bytes_per_second")
+                if elapsed and elapsed > 0 and summary[field] >= prev[field]:
+                    entry[rate_key] = round((summary[field] - prev[field]) / elapsed, 2)
+                else:
+                    entry[rate_key] = None
+
+            metrics.append(entry)
+
+        # Only keep samples for containers that still exist
+        self.previous = current
+        self.collect_count += 1
+        self.error_count += errors
+
+        self.snapshot = {
+            "containers": sorted(metrics, key=lambda m: m["name"]),
+            "collector": {
+                "last_collect": datetime.now().isoformat(),
+                "collect_ms": round((time.perf_counter() - started) * 1000, 2),
+                "containers": len(containers),
+                "collect_count": self.collect_count,
+                "error_count": self.error_count,
+                "interval_seconds": METRICS_INTERVAL
+            }
+        }
+
+    def run(self):
+        while True:
+            try:
+                self.collect()
+            except Exception as e:
+                self.error_count += 1
+                print(f"Metrics collection failed: {e}")
+            time.sleep(METRICS_INTERVAL)
+
+    def start(self):
+        threading.Thread(target=self.run, daemon=True).start()
+
+
+# (name, type, help, field) for the Prometheus exposition
+PROMETHEUS_METRICS = [
+    ("container_cpu_percent", "gauge", "CPU usage percent (100 = one core)", "cpu_percent"),
+    ("container_memory_usage_bytes", "gauge", "Memory usage excluding page cache", "memory_usage_bytes"),
+    ("container_memory_limit_bytes", "gauge", "Memory limit", "memory_limit_bytes"),
+    ("container_memory_percent", "gauge", "Memory usage percent of limit", "memory_percent"),
+    ("container_pids", "gauge", "Number of processes", "pids"),
+    ("container_block_read_bytes_total", "counter", "Bytes read from block devices", "block_read_bytes"),
+    ("container_block_write_bytes_total", "counter", "Bytes written to block devices", "block_write_bytes"),
+    ("container_network_rx_bytes_total", "counter", "Bytes received on all networks", "network_rx_bytes"),
+    ("container_network_tx_bytes_total", "counter", "Bytes sent on all networks", "network_tx_bytes"),
+    ("container_block_read_bytes_per_second", "gauge", "Block read rate", "block_read_bytes_per_second"),
+    ("container_block_write_bytes_per_second", "gauge", "Block write rate", "block_write_bytes_per_second"),
+    ("container_network_rx_bytes_per_second", "gauge", "Network receive rate", "network_rx_bytes_per_second"),
+    ("container_network_tx_bytes_per_second", "gauge", "Network transmit rate", "network_tx_bytes_per_second"),
+]
+
+
+def prometheus_label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def render_prometheus(snapshot):
+    lines = []
+    containers = snapshot["containers"]
+    for name, metric_type, help_text, field in PROMETHEUS_METRICS:
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {metric_type}")
+        for c in containers:
+            if c.get(field) is not None:
+                lines.append(f'{name}{{name="{prometheus_label(c["name"])}",id="{c["id"]}"}} {c[field]}')
+
+    info = snapshot["collector"]
+    if info:
+        lines.append("# HELP service_status_metrics_collect_seconds Duration of the last stats collection")
+        lines.append("# TYPE service_status_metrics_collect_seconds gauge")
+        lines.append(f"service_status_metrics_collect_seconds {info['collect_ms'] / 1000}")
+        lines.append("# HELP service_status_metrics_errors_total Failed per-container stats requests")
+        lines.append("# TYPE service_status_metrics_errors_total counter")
+        lines.append(f"service_status_metrics_errors_total {info['error_count']}")
+    return "\n".join(lines) + "\n"
+
+
+collector = StatusCollector(DockerClient())
+metrics_collector = MetricsCollector()
+
+
+def get_status():
+    return collector.snapshot
+
+
 @app.route("/")
 def status():
     return jsonify(get_status())
 
-app.run(host="0.0.0.0", port=80)
+
+@app.route("/api/metrics")
+def metrics_json():
+    return jsonify(metrics_collector.snapshot)
+
+
+@app.route("/metrics")
+def metrics_prometheus():
+    return Response(render_prometheus(metrics_collector.snapshot), mimetype="text/plain; version=0.0.4")
+
+
+if __name__ == "__main__":
+    collector.start()
+    metrics_collector.start()
+    app.run(host="0.0.0.0", port=80)
@@ -0,0 +1,208 @@
+"""
+Memory Admission Control for the WhisperX API Server
+Estimates each job's memory footprint and keeps admitted jobs within budget.
+
+A job's demand is split into two pools:
+- device: the largest model stage (Whisper plus per-batch activations,
+  alignment, or diarization; they are loaded one after another) in VRAM,
+  or in RAM when running on CPU
+- host: the decoded audio (16kHz float32, a few copies are alive at once)
+  plus a fixed per-job overhead
+
+The budget of each pool is what was free at startup times
+ADMISSION_MEMORY_FRACTION, unless ADMISSION_DEVICE_GB / ADMISSION_HOST_GB
+set it explicitly. The scheduler only dispatches a job when its demand fits
+the unreserved budget. Under pressure it halves the job's batch size (down to
+ADMISSION_MIN_BATCH_SIZE) rather than wait. A job that cannot fit even on an
+idle server, or that would queue behind ADMISSION_MAX_WAITING jobs already
+blocked on memory, is rejected with 503 and Retry-After.
+
+The estimates are deliberately coarse. Tune the budgets, not the tables, if
+the server rejects work it could run.
+"""
+
+import logging
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Optional
+
+from gpu import memory_info
+from metrics import MEMORY_BUDGET_BYTES, MEMORY_RESERVED_BYTES
+
+logger = logging.getLogger(__name__)
+
+GB = 1024 ** 3
+
+ENABLED = os.getenv("ADMISSION_CONTROL", "true").lower() in ("1", "true", "yes")
+MEMORY_FRACTION = float(os.getenv("ADMISSION_MEMORY_FRACTION", "0.9"))
+MIN_BATCH_SIZE = int(os.getenv("ADMISSION_MIN_BATCH_SIZE", "4"))
+MAX_WAITING = int(os.getenv("ADMISSION_MAX_WAITING", "4"))
+RETRY_AFTER_SECONDS = int(os.getenv("ADMISSION_RETRY_AFTER", "30"))
+# Activation memory per batch item, as a fraction of the model's weights
+BATCH_ITEM_FRACTION = float(os.getenv("ADMISSION_BATCH_ITEM_FRACTION", "0.02"))
+
+# Resident size of the float16 CTranslate2 weights plus runtime buffers
+MODEL_GB = {
+    "tiny": 0.15,
+    "base": 0.3,
+    "small": 0.9,
+    "medium": 2.2,
+    "large-v1": 3.8,
+    "large-v2": 3.8,
+    "large-v3": 3.8,
+    "large-v3-turbo": 1.8
+}
+COMPUTE_TYPE_SCALE = {"float32": 2.0, "float16": 1.0, "bfloat16": 1.0, "int8_float16": 0.6, "int8": 0.55}
+ALIGN_MODEL_GB = 1.3  # wav2vec2 large (non-English languages), float32
+DIARIZE_MODEL_GB = 1.0  # pyannote segmentation + embedding
+AUDIO_COPIES = 3  # full decode per chunk, alignment and diarization inputs
+JOB_OVERHEAD_GB = 0.5
+# Per worker process: Python, torch and the CUDA context
+WORKER_OVERHEAD_GB = {"device": 0.5, "host": 1.0}
+
+
+class AdmissionRejected(Exception):
+    """A job was not admitted; retry_after is None when retrying cannot help"""
+
+    def __init__(self, message: str, retry_after: Optional[int] = RETRY_AFTER_SECONDS):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+@dataclass
+class MemoryDemand:
+    """Estimated peak memory of one job, in bytes per pool"""
+    model: str
+    batch_size: int
+    duration: float
+    diarize: bool
+    compute_type: str
+    device: str
+
+    def at_batch_size(self, batch_size: int) -> Dict[str, float]:
+        model_gb = MODEL_GB.get(self.model, MODEL_GB["large-v3"]) * COMPUTE_TYPE_SCALE.get(self.compute_type, 1.0)
+        whisper_gb = model_gb * (1 + BATCH_ITEM_FRACTION * batch_size)
+        models_gb = max(whisper_gb, ALIGN_MODEL_GB, DIARIZE_MODEL_GB if self.diarize else 0.0)
+        audio_gb = self.duration * 16000 * 4 * AUDIO_COPIES / GB
+        host_gb = audio_gb + JOB_OVERHEAD_GB
+        if self.device == "cuda":
+            return {"device": models_gb * GB, "host": host_gb * GB}
+        return {"device": 0.0, "host": (models_gb + host_gb) * GB}
+
+    def batch_sizes(self):
+        """Requested batch size, then halved down to the minimum"""
+        batch_size = self.batch_size
+        yield batch_size
+        while batch_size > MIN_BATCH_SIZE:
+            batch_size = max(MIN_BATCH_SIZE, batch_size // 2)
+            yield batch_size
+
+
+def _cgroup_available() -> Optional[float]:
+    """Bytes left under the container's memory limit (cgroup v2 or v1), if any"""
+    for limit_file, usage_file in (
+        ("/sys/fs/cgroup/memory.max", "/sys/fs/cgroup/memory.current"),
+        ("/sys/fs/cgroup/memory/memory.limit_in_bytes", "/sys/fs/cgroup/memory/memory.usage_in_bytes")
+    ):
+        try:
+            limit = Path(limit_file).read_text().strip()
+            usage = int(Path(usage_file).read_text().strip())
+        except (OSError, ValueError):
+            continue
+        # v1 reports "no limit" as a huge number
+        if limit == "max" or int(limit) >= 1 << 60:
+            return None
+        return int(limit) - usage
+    return None
+
+
+def host_available() -> float:
+    """Bytes of RAM this process can still use"""
+    available = None
+    try:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    available = int(line.split()[1]) * 1024
+                    break
+    except OSError:
+        pass
+    limited = _cgroup_available()
+    candidates = [value for value in (available, limited) if value is not None]
+    return float(min(candidates)) if candidates else float("inf")
+
+
+def device_available(device: str) -> float:
+    """Bytes of free VRAM (0 when not on CUDA: models live in host memory)"""
+    if device != "cuda":
+        return 0.0
+    info = memory_info()
+    if info is None:
+        import torch
+        info = torch.cuda.mem_get_info()
+    return float(info[0])
+
+
+class MemoryBudget:
+    """Per-pool byte budgets that admitted jobs reserve from"""
+
+    def __init__(self, device: str, host_bytes: float, device_bytes: float):
+        self.device = device
+        self.capacity = {"host": host_bytes, "device": device_bytes}
+        self.reserved = {"host": 0.0, "device": 0.0}
+        for pool, value in self.capacity.items():
+            MEMORY_BUDGET_BYTES.set(value, pool=pool)
+
+    @classmethod
+    def detect(cls, device: str, workers: int = 0) -> "MemoryBudget":
+        host = os.getenv("ADMISSION_HOST_GB")
+        device_gb = os.getenv("ADMISSION_DEVICE_GB")
+        host_bytes = float(host) * GB if host else host_available() * MEMORY_FRACTION
+        device_bytes = float(device_gb) * GB if device_gb else device_available(device) * MEMORY_FRACTION
+        # Worker processes are spawned later and were not running when we measured
+        host_bytes -= workers * WORKER_OVERHEAD_GB["host"] * GB
+        if device == "cuda":
+            device_bytes -= workers * WORKER_OVERHEAD_GB["device"] * GB
+        budget = cls(device, max(0.0, host_bytes), max(0.0, device_bytes))
+        logger.info(f"Memory budget: {budget.capacity['host'] / GB:.1f} GB host, "
+                    f"{budget.capacity['device'] / GB:.1f} GB device")
+        return budget
+
+    def fits(self, need: Dict[str, float], free: bool = True) -> bool:
+        """Whether need fits the unreserved budget (or the whole budget, if not free)"""
+        return all(
+            need[pool] <= self.capacity[pool] - (self.reserved[pool] if free else 0.0)
+            for pool in self.capacity
+        )
+
+    def fit(self, demand: MemoryDemand, free: bool = True) -> Optional[int]:
+        """Largest batch size (from the requested one, halving) whose demand fits"""
+        for batch_size in demand.batch_sizes():
+            if self.fits(demand.at_batch_size(batch_size), free):
+                return batch_size
+        return None
+
+    def reserve(self, need: Dict[str, float]):
+        for pool, value in need.items():
+            self.reserved[pool] += value
+            MEMORY_RESERVED_BYTES.set(self.reserved[pool], pool=pool)
+
+    def unreserve(self, need: Dict[str, float]):
+        for pool, value in need.items():
+            self.reserved[pool] = max(0.0, self.reserved[pool] - value)
+            MEMORY_RESERVED_BYTES.set(self.reserved[pool], pool=pool)
+
+    def snapshot(self) -> Dict:
+        return {
+            pool: {
+                "budget_gb": round(self.capacity[pool] / GB, 2),
+                "reserved_gb": round(self.reserved[pool] / GB, 2)
+            }
+            for pool in self.capacity
+        }
+
+
+def is_out_of_memory(error: BaseException) -> bool:
+    """CUDA/CTranslate2 OOM (a RuntimeError mentioning it) or host MemoryError"""
+    return isinstance(error, MemoryError) or "out of memory" in str(error).lower()
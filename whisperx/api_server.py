@@ -5,22 +5,39 @@ A FastAPI-based transcription service using WhisperX for word-level timestamps a
 Enhanced with chunking support for large files and video processing.
 """
 
+import time
+# Taken before the heavy imports, for the startup phase timings
+_STARTUP_BEGAN = time.perf_counter()
+
+import asyncio
 import os
-import gc
-import torch
-import whisperx
-import uvicorn
-from fastapi import FastAPI, File, UploadFile, Form, HTTPException
-from fastapi.responses import JSONResponse
-from typing import Optional
+from fastapi import FastAPI, File, UploadFile, Form, HTTPException, Request
+from fastapi.responses import JSONResponse, PlainTextResponse
+from starlette.concurrency import run_in_threadpool
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Optional, Tuple
 from pathlib import Path
 import logging
-import time
-import requests
 
 # Import our custom modules
 from ffmpeg_processor import FFmpegProcessor
 from video_segmenter import VideoSegmenter, AudioSegment
+from progress_client import ProgressReporter
+import metrics
+from metrics import STAGE_SECONDS, CHUNK_SECONDS, AUDIO_SECONDS, BATCH_SIZE_REDUCTIONS, track_model
+from tracing import Tracer, span, current_tracer, activate_tracer, deactivate_tracer
+from profiling import profiler_for_request, should_keep
+from backends import create_backend
+from gpu import cuda_available, detect_device
+from worker_pool import WORKERS, WorkerPool
+from admission import ENABLED as ADMISSION_ENABLED, AdmissionRejected, MemoryBudget, MemoryDemand, is_out_of_memory
+from scheduler import PRIORITY_CLASSES, Ticket, checkpoint, classify, waited_seconds
+import autotune
+import warmup
+from warmup import startup_phase
+
+_IMPORTS_DONE = time.perf_counter()
 
 # Configure logging
 logging.basicConfig(
@@ -29,6 +46,12 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Startup phase -> seconds, reported by /ready
+STARTUP_TIMINGS = {"imports": round(_IMPORTS_DONE - _STARTUP_BEGAN, 4)}
+logger.info(f"Startup phase imports: {STARTUP_TIMINGS['imports']:.2f}s")
+# "starting" until warmup inference completes in every worker, then "ready" (or "failed")
+READINESS = {"status": "starting"}
+
 # Initialize FastAPI app
 app = FastAPI(
     title="WhisperX Transcription API",
@@ -40,58 +63,221 @@ app = FastAPI(
 UPLOAD_DIR = Path("/app/uploads")
 UPLOAD_DIR.mkdir(exist_ok=True)
 
-# GPU configuration
-DEVICE = "cuda" if torch.cuda.is_available() else "cpu"
+# GPU configuration (NVML, so torch is first imported by the model backend)
+DEVICE = detect_device()
 COMPUTE_TYPE = os.getenv("COMPUTE_TYPE", "float16" if DEVICE == "cuda" else "int8")
-BATCH_SIZE = int(os.getenv("BATCH_SIZE", "16"))
-
-# Enable TF32 for RTX 5090 Blackwell optimization (20-40% speedup on 5th-gen Tensor Cores)
-# TF32 provides significant performance boost with minimal accuracy loss
-if DEVICE == "cuda":
-    torch.backends.cuda.matmul.allow_tf32 = True
-    torch.backends.cudnn.allow_tf32 = True
-    logger.info("TF32 enabled for Tensor Core acceleration")
+# BATCH_SIZE=auto: per-model sizes from the autotuner (autotune.py), 16 until tuned
+AUTO_BATCH_SIZE = os.getenv("BATCH_SIZE", "16").lower() == "auto"
+BATCH_SIZE = 16 if AUTO_BATCH_SIZE else int(os.getenv("BATCH_SIZE", "16"))
+# Calibration clip and models to tune at startup when BATCH_SIZE=auto
+AUTOTUNE_CLIP = os.getenv("AUTOTUNE_CLIP")
+AUTOTUNE_MODELS = [m for m in os.getenv("AUTOTUNE_MODELS", "large-v3").split(",") if m]
+# 'synthetic' swaps the models for timed fakes (benchmarking without a GPU)
+WHISPERX_BACKEND = os.getenv("WHISPERX_BACKEND", "whisperx")
 
 # Initialize processors
-# Enable hw_accel for RTX 5090's 9th-gen NVENC/NVDEC - provides significant speedup for video processing
-ffmpeg_processor = FFmpegProcessor(use_hw_accel=True, enhance_speech=True)
-video_segmenter = VideoSegmenter(chunk_duration=30, overlap_duration=10)
+# Enable hw_accel for RTX 5090's 9th-gen NVENC/NVDEC on video operations, where ffmpeg was built with them
+# (audio extraction never uses it; see FFmpegProcessor)
+with startup_phase("init", STARTUP_TIMINGS):
+    ffmpeg_processor = FFmpegProcessor(use_hw_accel=DEVICE == "cuda", enhance_speech=True)
+    video_segmenter = VideoSegmenter(chunk_duration=30, overlap_duration=10)
+    backend = create_backend(WHISPERX_BACKEND, device=DEVICE, compute_type=COMPUTE_TYPE)
+
+
+def warm_up_worker() -> dict:
+    """Warmup run by each job worker before its first job (see warmup.py)"""
+    return warmup.warm_up(backend, video_segmenter)
+
+
+# Jobs run on a background thread, or in WHISPERX_WORKERS worker processes,
+# within a memory budget measured now (before any model is loaded)
+worker_pool = WorkerPool(
+    budget=MemoryBudget.detect(DEVICE, WORKERS) if ADMISSION_ENABLED else None,
+    warmup=warm_up_worker if warmup.ENABLED else None
+)
 
 # Shared directory for file processing
 SHARED_DIR = Path("/app/shared")
 TEMP_DIR = SHARED_DIR / "temp"
 TEMP_DIR.mkdir(parents=True, exist_ok=True)
+TRACE_DIR = SHARED_DIR / "traces"
+# Write a Chrome trace for every /transcribe-large request, not only trace=true ones
+TRACE_ALL_REQUESTS = os.getenv("TRACE_ALL_REQUESTS", "false").lower() in ("1", "true", "yes")
+
+logger.info(f"Starting WhisperX API Server on {DEVICE} with compute type {COMPUTE_TYPE} ({WHISPERX_BACKEND} backend)")
+
+@contextmanager
+def timed_stage(name: str, **attrs):
+    """Record a pipeline stage in the metrics histogram and the request trace"""
+    with STAGE_SECONDS.time(stage=name), span(name, **attrs):
+        yield
+
+
+def check_priority(priority: str):
+    if priority != "auto" and priority not in PRIORITY_CLASSES:
+        raise HTTPException(status_code=400, detail=f"priority must be auto or one of {', '.join(PRIORITY_CLASSES)}")
+
+
+async def job_ticket(
+    path: Path,
+    priority: str,
+    client_id: Optional[str],
+    request: Request,
+    model: str,
+    enable_diarization: bool
+) -> Ticket:
+    """Scheduler ticket for an uploaded job, with its priority class and memory demand"""
+    info = await run_in_threadpool(ffmpeg_processor.get_video_info, str(path))
+    duration = info.get("duration")
+    client = client_id or (request.client.host if request.client else "anonymous")
+    demand = MemoryDemand(
+        model=model,
+        batch_size=batch_size_for(model),
+        duration=duration or 0.0,
+        diarize=enable_diarization,
+        compute_type=COMPUTE_TYPE,
+        device=DEVICE
+    )
+    return Ticket(classify(priority, duration), client, label=path.name, demand=demand)
+
+
+def batch_size_for(model: str) -> int:
+    if AUTO_BATCH_SIZE:
+        return autotune.tuned_batch_size(backend.name, model, COMPUTE_TYPE, DEVICE, default=BATCH_SIZE)
+    return BATCH_SIZE
+
 
-logger.info(f"Starting WhisperX API Server on {DEVICE} with compute type {COMPUTE_TYPE}")
+def admission_error(e: AdmissionRejected) -> HTTPException:
+    headers = {"Retry-After": str(e.retry_after)} if e.retry_after else None
+    return HTTPException(status_code=503, detail=str(e), headers=headers)
 
 
-def send_progress_callback(callback_url: str, job_id: str, progress: int, stage: str, message: str, segment_info: dict = None):
+def transcribe_with_backoff(model, audio, batch_size: int, language: Optional[str] = None) -> Tuple[dict, int]:
     """
-    Send progress update to callback URL.
-    Fails silently if callback fails to not interrupt transcription.
+    backend.transcribe, halving the batch size on out-of-memory instead of
+    failing the job. Returns (result, batch size that worked).
     """
-    if not callback_url or not job_id:
+    while True:
+        try:
+            return backend.transcribe(model, audio, batch_size=batch_size, language=language), batch_size
+        except Exception as e:
+            if batch_size <= 1 or not is_out_of_memory(e):
+                raise
+            backend.release()
+            batch_size = max(1, batch_size // 2)
+            BATCH_SIZE_REDUCTIONS.inc(cause="oom")
+            logger.warning(f"Out of memory during transcription, retrying with batch size {batch_size}")
+
+
+@app.on_event("startup")
+async def start_worker_pool():
+    worker_pool.start()
+
+
+@app.on_event("shutdown")
+async def stop_workers():
+    worker_pool.shutdown()
+    video_segmenter.shutdown()
+
+
+# Background tasks started at startup (referenced so they are not collected)
+_background_tasks = set()
+
+
+@app.on_event("startup")
+async def wait_for_warmup():
+    """Flip /ready once warmup has finished in the background"""
+    if not warmup.ENABLED:
+        READINESS["status"] = "ready"
         return
+    task = asyncio.create_task(_finish_warmup())
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+
 
+async def _finish_warmup():
     try:
-        payload = {
-            "job_id": job_id,
-            "status": "processing",
-            "progress": progress,
-            "stage": stage,
-            "message": message
-        }
+        READINESS["warmup"] = await worker_pool.wait_warm()
+        READINESS["status"] = "ready"
+    except Exception as e:
+        logger.error(f"Warmup failed: {e}", exc_info=True)
+        READINESS.update(status="failed", error=str(e))
+    STARTUP_TIMINGS["until_ready"] = round(time.perf_counter() - _STARTUP_BEGAN, 4)
+    logger.info(f"Startup phase until_ready: {STARTUP_TIMINGS['until_ready']:.2f}s ({READINESS['status']})")
 
-        if segment_info:
-            payload["segment_info"] = segment_info
 
-        response = requests.post(callback_url, json=payload, timeout=5)
-        if response.status_code == 200:
-            logger.debug(f"Progress callback sent: {progress}% - {message}")
-        else:
-            logger.warning(f"Progress callback failed with status {response.status_code}")
-    except Exception as e:
-        logger.warning(f"Failed to send progress callback: {e}")
+@app.on_event("startup")
+async def autotune_untuned_models():
+    """With BATCH_SIZE=auto and AUTOTUNE_CLIP, tune models that have no cached result"""
+    if not (AUTO_BATCH_SIZE and AUTOTUNE_CLIP):
+        return
+    for model in AUTOTUNE_MODELS:
+        if autotune.load_result(backend.name, model, COMPUTE_TYPE, DEVICE) is None:
+            logger.info(f"No autotuned batch size for {model}, tuning in the background")
+            task = asyncio.create_task(tune_batch_size(model, AUTOTUNE_CLIP, autotune.BATCH_SIZES))
+            _background_tasks.add(task)
+            task.add_done_callback(_autotune_finished)
+
+
+def _autotune_finished(task: asyncio.Task):
+    _background_tasks.discard(task)
+    if not task.cancelled() and task.exception():
+        logger.error(f"Background autotune failed: {task.exception()}")
+
+
+async def tune_batch_size(model: str, clip_path: str, batch_sizes) -> dict:
+    """Queue an autotune job as a batch-priority job; it reserves memory for its largest batch"""
+    largest = max(batch_sizes)
+    demand = MemoryDemand(
+        model=model,
+        batch_size=largest,
+        duration=largest * autotune.WINDOW_SECONDS,
+        diarize=False,
+        compute_type=COMPUTE_TYPE,
+        device=DEVICE
+    )
+    budget = worker_pool.scheduler.budget
+    ceiling = budget.capacity["device" if DEVICE == "cuda" else "host"] if budget else None
+    return await worker_pool.run(
+        run_autotune_job,
+        ticket=Ticket("batch", "autotune", label=f"autotune {model}", demand=demand),
+        model=model,
+        clip_path=clip_path,
+        batch_sizes=list(batch_sizes),
+        memory_ceiling=ceiling
+    )
+
+
+# Endpoints that run transcription jobs (counted in whisperx_inflight_jobs)
+JOB_ENDPOINTS = {"/transcribe", "/transcribe-large", "/process-video"}
+
+
+@lru_cache(maxsize=1)
+def _route_paths() -> frozenset:
+    return frozenset(route.path for route in app.routes)
+
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    """Count requests by endpoint/outcome and track in-flight jobs"""
+    path = request.url.path
+    # Label by registered route only, so unknown URLs cannot blow up cardinality
+    endpoint = path if path in _route_paths() else "other"
+    is_job = endpoint in JOB_ENDPOINTS
+
+    if is_job:
+        metrics.INFLIGHT_JOBS.inc(endpoint=endpoint)
+    start = time.perf_counter()
+    status_code = 500
+    try:
+        response = await call_next(request)
+        status_code = response.status_code
+        return response
+    finally:
+        if is_job:
+            metrics.INFLIGHT_JOBS.dec(endpoint=endpoint)
+        metrics.REQUESTS.inc(endpoint=endpoint, outcome=metrics.outcome_for_status(status_code))
+        metrics.REQUEST_SECONDS.observe(time.perf_counter() - start, endpoint=endpoint)
 
 
 @app.get("/")
@@ -102,101 +288,91 @@ async def root():
         "version": "1.0.0",
         "device": DEVICE,
         "compute_type": COMPUTE_TYPE,
-        "status": "ready"
+        "status": READINESS["status"]
     }
 
 
 @app.get("/health")
 async def health_check():
-    """Health check endpoint for Docker"""
+    """Liveness check (the process is serving); see /ready for readiness"""
     return {
         "status": "healthy",
         "device": DEVICE,
-        "gpu_available": torch.cuda.is_available()
+        "gpu_available": cuda_available(),
+        "backend": WHISPERX_BACKEND,
+        "workers": worker_pool.mode
     }
 
 
-@app.post("/transcribe")
-async def transcribe(
-    file: UploadFile = File(...),
-    model: str = Form(default="large-v3"),
-    language: Optional[str] = Form(default=None),
-    enable_diarization: bool = Form(default=True),
-    min_speakers: Optional[int] = Form(default=None),
-    max_speakers: Optional[int] = Form(default=None),
-    hf_token: Optional[str] = Form(default=None)
-):
-    """
-    Transcribe audio file with word-level timestamps and optional speaker diarization.
+@app.get("/ready")
+async def readiness_check():
+    """Readiness: 200 once models are warmed up, 503 while starting (or if warmup failed)"""
+    body = {
+        "status": READINESS["status"],
+        "startup": STARTUP_TIMINGS,
+        **{key: READINESS[key] for key in ("warmup", "error") if key in READINESS}
+    }
+    return JSONResponse(content=body, status_code=200 if READINESS["status"] == "ready" else 503)
 
-    Parameters:
-    - file: Audio file (mp3, wav, m4a, etc.)
-    - model: Whisper model size (tiny, base, small, medium, large-v2, large-v3, large-v3-turbo)
-    - language: Language code (auto-detect if None)
-    - enable_diarization: Enable speaker diarization (requires hf_token)
-    - min_speakers: Minimum number of speakers (for diarization)
-    - max_speakers: Maximum number of speakers (for diarization)
-    - hf_token: HuggingFace token for diarization models
 
-    Returns:
-    - JSON with segments, word-level timestamps, and speaker labels
-    """
+@app.get("/queue")
+async def queue_status():
+    """Running and waiting jobs in scheduling order"""
+    return worker_pool.scheduler.snapshot()
 
-    temp_file = None
 
-    try:
-        # Save uploaded file
-        temp_file = UPLOAD_DIR / file.filename
-        logger.info(f"Processing file: {file.filename}")
+@app.get("/metrics")
+async def prometheus_metrics():
+    """Prometheus metrics (stage latencies, request counts, in-flight jobs, resident models)"""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
 
-        with open(temp_file, "wb") as f:
-            content = await file.read()
-            f.write(content)
+def transcribe_file(
+    audio_path: str,
+    filename: str,
+    model: str = "large-v3",
+    language: Optional[str] = None,
+    enable_diarization: bool = True,
+    min_speakers: Optional[int] = None,
+    max_speakers: Optional[int] = None,
+    hf_token: Optional[str] = None,
+    batch_size: int = BATCH_SIZE
+) -> dict:
+    """
+    /transcribe job: whole-file transcription, alignment and diarization.
 
+    Runs on a worker (see worker_pool.py); returns the response body.
+    """
+    try:
         # Load model
         logger.info(f"Loading Whisper model: {model}")
-        model_obj = whisperx.load_model(
-            model,
-            device=DEVICE,
-            compute_type=COMPUTE_TYPE,
-            language=language
-        )
+        with timed_stage("model_load"):
+            model_obj = track_model(backend.load_model(model, language=language), "whisper")
 
         # Transcribe with whisperx
         logger.info("Starting transcription...")
-        audio = whisperx.load_audio(str(temp_file))
-        result = model_obj.transcribe(
-            audio,
-            batch_size=BATCH_SIZE
-        )
+        audio = backend.load_audio(audio_path)
+        with timed_stage("transcription"):
+            result, batch_size = transcribe_with_backoff(model_obj, audio, batch_size)
+        AUDIO_SECONDS.inc(len(audio) / 16000)
 
         # Cleanup model to free VRAM
         del model_obj
-        gc.collect()
-        torch.cuda.empty_cache()
+        backend.release()
 
         # Align whisper output for word-level timestamps
         logger.info("Aligning timestamps...")
         detected_language = result.get("language", language)
 
         try:
-            model_a, metadata = whisperx.load_align_model(
-                language_code=detected_language,
-                device=DEVICE
-            )
-            result = whisperx.align(
-                result["segments"],
-                model_a,
-                metadata,
-                audio,
-                DEVICE,
-                return_char_alignments=False
-            )
+            with timed_stage("model_load"):
+                model_a = track_model(backend.load_align_model(detected_language), "align")
+            with timed_stage("alignment"):
+                result = backend.align(model_a, result["segments"], audio)
 
             # Cleanup alignment model
             del model_a
-            gc.collect()
-            torch.cuda.empty_cache()
+            backend.release()
 
         except Exception as e:
             logger.warning(f"Alignment failed: {e}. Continuing without word-level timestamps.")
@@ -206,43 +382,107 @@ async def transcribe(
             if not hf_token:
                 hf_token = os.getenv("HF_TOKEN")
 
-            if hf_token:
+            if hf_token or not backend.needs_hf_token:
                 logger.info("Running speaker diarization...")
                 try:
-                    diarize_model = whisperx.DiarizationPipeline(
-                        use_auth_token=hf_token,
-                        device=DEVICE
-                    )
-
-                    diarize_segments = diarize_model(
-                        audio,
-                        min_speakers=min_speakers,
-                        max_speakers=max_speakers
-                    )
-
-                    result = whisperx.assign_word_speakers(diarize_segments, result)
+                    with timed_stage("model_load"):
+                        diarize_model = track_model(backend.load_diarization_model(hf_token), "diarize")
+
+                    with timed_stage("diarization"):
+                        result = backend.diarize(
+                            diarize_model,
+                            audio,
+                            result,
+                            min_speakers=min_speakers,
+                            max_speakers=max_speakers
+                        )
 
                     # Cleanup diarization model
                     del diarize_model
-                    gc.collect()
-                    torch.cuda.empty_cache()
+                    backend.release()
 
                 except Exception as e:
                     logger.warning(f"Diarization failed: {e}. Continuing without speaker labels.")
             else:
                 logger.warning("Diarization requested but no HF_TOKEN provided. Skipping diarization.")
 
-        # Prepare response
-        response = {
-            "filename": file.filename,
+        logger.info(f"Transcription completed for {filename}")
+        return {
+            "filename": filename,
             "language": detected_language,
             "segments": result.get("segments", []),
             "word_segments": result.get("word_segments", [])
         }
 
-        logger.info(f"Transcription completed for {file.filename}")
+    finally:
+        # Final cleanup
+        backend.release()
+
+
+@app.post("/transcribe")
+async def transcribe(
+    request: Request,
+    file: UploadFile = File(...),
+    model: str = Form(default="large-v3"),
+    language: Optional[str] = Form(default=None),
+    enable_diarization: bool = Form(default=True),
+    min_speakers: Optional[int] = Form(default=None),
+    max_speakers: Optional[int] = Form(default=None),
+    hf_token: Optional[str] = Form(default=None),
+    priority: str = Form(default="auto"),
+    client_id: Optional[str] = Form(default=None)
+):
+    """
+    Transcribe audio file with word-level timestamps and optional speaker diarization.
+
+    Parameters:
+    - file: Audio file (mp3, wav, m4a, etc.)
+    - model: Whisper model size (tiny, base, small, medium, large-v2, large-v3, large-v3-turbo)
+    - language: Language code (auto-detect if None)
+    - enable_diarization: Enable speaker diarization (requires hf_token)
+    - min_speakers: Minimum number of speakers (for diarization)
+    - max_speakers: Maximum number of speakers (for diarization)
+    - hf_token: HuggingFace token for diarization models
+    - priority: 'auto' (by duration), 'interactive', 'normal' or 'batch'
+    - client_id: Fair-share key (default: client address)
+
+    Returns:
+    - JSON with segments, word-level timestamps, and speaker labels
+    """
+
+    check_priority(priority)
+    temp_file = None
+
+    try:
+        # Save uploaded file (timestamp prefix: concurrent uploads may share a name)
+        temp_file = UPLOAD_DIR / f"{time.time()}_{file.filename}"
+        logger.info(f"Processing file: {file.filename}")
+
+        with timed_stage("upload"):
+            with open(temp_file, "wb") as f:
+                content = await file.read()
+                f.write(content)
+
+        ticket = await job_ticket(temp_file, priority, client_id, request, model, enable_diarization)
+        response = await worker_pool.run(
+            transcribe_file,
+            ticket=ticket,
+            audio_path=str(temp_file),
+            filename=file.filename,
+            model=model,
+            language=language,
+            enable_diarization=enable_diarization,
+            min_speakers=min_speakers,
+            max_speakers=max_speakers,
+            hf_token=hf_token
+        )
+        response["scheduling"] = ticket.summary()
         return JSONResponse(content=response)
 
+    except AdmissionRejected as e:
+        logger.warning(f"Job not admitted: {e}")
+        raise admission_error(e)
+
     except Exception as e:
         logger.error(f"Transcription error: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Transcription failed: {str(e)}")
@@ -252,16 +492,41 @@ async def transcribe(
         if temp_file and temp_file.exists():
             temp_file.unlink()
 
-        # Final cleanup
-        gc.collect()
-        torch.cuda.empty_cache()
+
+def run_autotune_job(
+    model: str,
+    clip_path: str,
+    batch_sizes: list,
+    memory_ceiling: Optional[float] = None,
+    batch_size: Optional[int] = None
+) -> dict:
+    """
+    Autotune job: measure the batch size curve for a model and cache the result.
+
+    Runs on a worker (see worker_pool.py). batch_size, when granted by
+    admission control, caps the largest size probed.
+    """
+    if batch_size:
+        batch_sizes = [size for size in batch_sizes if size <= batch_size] or [min(batch_sizes)]
+    with timed_stage("autotune", model=model):
+        result = autotune.autotune(
+            backend,
+            model,
+            backend.load_audio(clip_path),
+            batch_sizes=batch_sizes,
+            memory_ceiling=memory_ceiling
+        )
+    result["cache_file"] = str(autotune.save_result(result))
+    logger.info(f"Autotuned {model}: batch size {result['batch_size']}\n{autotune.format_curve(result)}")
+    return result
 
 
 def transcribe_audio_segment(
     audio_path: str,
     segment: AudioSegment,
     model,  # Pre-loaded model instance
-    language: Optional[str] = None
+    language: Optional[str] = None,
+    batch_size: int = BATCH_SIZE
 ) -> dict:
     """
     Transcribe a single audio segment using a pre-loaded model.
@@ -271,22 +536,22 @@ def transcribe_audio_segment(
         segment: AudioSegment object with start/end times
         model: Pre-loaded WhisperX model instance (avoids reloading)
         language: Optional language code (if known, skips auto-detection)
+        batch_size: Batch size for inference (the returned one may be smaller after an OOM)
 
     Returns:
         Dictionary with transcription results
     """
     try:
         # Load full audio
-        audio = whisperx.load_audio(audio_path)
+        with span("load_audio"):
+            audio = backend.load_audio(audio_path)
 
         # Extract segment
-        sample_rate = 16000
-        start_sample = int(segment.start * sample_rate)
-        end_sample = int(segment.end * sample_rate)
-        segment_audio = audio[start_sample:end_sample]
+        segment_audio = segment.slice(audio)
 
         # Transcribe with pre-loaded model (no model loading overhead!)
-        result = model.transcribe(segment_audio, batch_size=BATCH_SIZE, language=language)
+        with CHUNK_SECONDS.time(), span("chunk", segment_id=segment.segment_id, start=segment.start, end=segment.end):
+            result, batch_size = transcribe_with_backoff(model, segment_audio, batch_size, language=language)
 
         # Adjust timestamps to absolute time
         for seg in result.get("segments", []):
@@ -298,7 +563,8 @@ def transcribe_audio_segment(
             "start": segment.start,
             "end": segment.end,
             "segments": result.get("segments", []),
-            "language": result.get("language", language)
+            "language": result.get("language", language),
+            "batch_size": batch_size
         }
 
     except Exception as e:
@@ -312,153 +578,149 @@ def transcribe_audio_segment(
         }
 
 
-@app.post("/transcribe-large")
-async def transcribe_large(
-    file: UploadFile = File(...),
-    model: str = Form(default="large-v3"),
-    language: Optional[str] = Form(default=None),
-    chunking_strategy: str = Form(default="auto"),
-    enable_diarization: bool = Form(default=True),
-    hf_token: Optional[str] = Form(default=None),
-    callback_url: Optional[str] = Form(default=None),
-    job_id: Optional[str] = Form(default=None)
-):
+def run_transcription_job(
+    input_path: str,
+    filename: str,
+    model: str = "large-v3",
+    language: Optional[str] = None,
+    chunking_strategy: str = "auto",
+    enable_diarization: bool = True,
+    hf_token: Optional[str] = None,
+    callback_url: Optional[str] = None,
+    job_id: Optional[str] = None,
+    trace: bool = False,
+    profile: bool = False,
+    upload: Optional[Tuple[float, float]] = None,
+    batch_size: int = BATCH_SIZE
+) -> dict:
     """
-    Transcribe large audio/video files with automatic chunking.
-
-    Uses VAD-based chunking for optimal performance (12x speedup per research).
-    Automatically segments files >10 minutes for efficient processing.
-
-    Parameters:
-    - file: Audio or video file
-    - model: Whisper model (default: large-v3)
-    - language: Language code (auto-detect if None)
-    - chunking_strategy: 'auto', 'vad', 'time', or 'silence'
-    - enable_diarization: Enable speaker diarization
-    - hf_token: HuggingFace token for diarization
-    - callback_url: Optional URL to POST progress updates
-    - job_id: Optional job ID for progress tracking
+    /transcribe-large job: chunked transcription of an uploaded file.
 
-    Returns:
-    - JSON with stitched transcription, timestamps, and speakers
+    Runs on a worker (see worker_pool.py); returns the response body.
+    input_path is left in place for the caller to delete; audio extracted
+    from a video is removed here. upload is the (start, end) perf_counter
+    span of the upload in the HTTP process, recorded in the trace.
     """
-    temp_file = None
     audio_file = None
+    reporter = ProgressReporter(callback_url, job_id)
+    input_file = Path(input_path)
+
+    # Reuse the caller's tracer when invoked internally (e.g. from /process-video)
+    tracer = current_tracer()
+    owns_tracer = tracer is None
+    if owns_tracer:
+        tracer = Tracer("transcribe_large", filename=filename, job_id=job_id)
+    trace_token = activate_tracer(tracer)
+    if upload:
+        tracer.add_span("upload", *upload)
+    profiler = profiler_for_request(profile)
+    profiler.start()
 
     try:
-        start_time = time.time()
-
-        # Save uploaded file
-        temp_file = TEMP_DIR / f"{time.time()}_{file.filename}"
-        logger.info(f"Processing large file: {file.filename}")
-
-        with open(temp_file, "wb") as f:
-            content = await file.read()
-            f.write(content)
+        # The clock starts now that the scheduler has granted the slot. The upload
+        # still counts; queue time (also while preempted) is only in "scheduling"
+        start_time = time.perf_counter() - (upload[1] - upload[0] if upload else 0.0)
+        waited_at_start = waited_seconds()
 
         # Extract audio if video file
-        if temp_file.suffix.lower() in ['.mp4', '.avi', '.mkv', '.mov', '.webm']:
+        if input_file.suffix.lower() in ['.mp4', '.avi', '.mkv', '.mov', '.webm']:
             logger.info("Detected video file, extracting audio...")
-            audio_file = TEMP_DIR / f"{temp_file.stem}.wav"
-            ffmpeg_processor.extract_audio_optimized(str(temp_file), str(audio_file))
+            audio_file = TEMP_DIR / f"{input_file.stem}.wav"
+            with timed_stage("extraction"):
+                ffmpeg_processor.extract_audio_optimized(str(input_file), str(audio_file))
         else:
-            audio_file = temp_file
+            audio_file = input_file
 
         # Get audio duration
         info = ffmpeg_processor.get_video_info(str(audio_file))
         duration = info.get('duration', 0)
         logger.info(f"Audio duration: {duration:.1f}s")
 
-        # Segment audio
-        segments = video_segmenter.segment_audio(str(audio_file), strategy=chunking_strategy)
+        # Segment audio (VAD for the default strategies)
+        with timed_stage("vad"):
+            segments = video_segmenter.segment_audio(str(audio_file), strategy=chunking_strategy)
         logger.info(f"Created {len(segments)} segments using '{chunking_strategy}' strategy")
 
         # Load Whisper model ONCE and reuse for all segments (major optimization!)
         # Best practice from 2025: "Most time is taken by model initialization"
         logger.info(f"Loading Whisper model: {model}")
-        model_obj = whisperx.load_model(
-            model,
-            device=DEVICE,
-            compute_type=COMPUTE_TYPE,
-            language=language  # Pre-set language if provided
-        )
+        with timed_stage("model_load"):
+            # Pre-set language if provided
+            model_obj = track_model(backend.load_model(model, language=language), "whisper")
 
         # Detect language once from first segment if not provided (optimization)
         # Whisper design: language detected once, reused for all segments
         all_segments = []
         detected_language = language
 
-        if not detected_language and len(segments) > 0:
-            logger.info("Detecting language from first segment...")
-            first_result = transcribe_audio_segment(str(audio_file), segments[0], model_obj, language=None)
-            detected_language = first_result.get('language', 'en')
-            all_segments.extend(first_result.get('segments', []))
-            logger.info(f"Detected language: {detected_language}")
-            start_idx = 1  # Skip first segment since we already processed it
-        else:
-            start_idx = 0
-
-        # Transcribe remaining segments with cached model and detected language
-        for i in range(start_idx, len(segments)):
-            seg = segments[i]
-            logger.info(f"Transcribing segment {i+1}/{len(segments)} ({seg.start:.1f}s - {seg.end:.1f}s)")
-
-            # Calculate progress: 20-80% range for transcription phase
-            segment_progress = 20 + int((i / len(segments)) * 60)
-
-            # Send progress callback before processing segment
-            send_progress_callback(
-                callback_url=callback_url,
-                job_id=job_id,
-                progress=segment_progress,
-                stage="transcription",
-                message=f"Transcribing segment {i+1}/{len(segments)}",
-                segment_info={
-                    "current": i + 1,
-                    "total": len(segments),
-                    "time_range": f"{seg.start:.1f}s - {seg.end:.1f}s"
-                }
-            )
-
-            # Reuse model and detected language (no reload, no re-detection!)
-            result = transcribe_audio_segment(str(audio_file), seg, model_obj, language=detected_language)
-            all_segments.extend(result.get('segments', []))
+        with timed_stage("transcription", chunks=len(segments)):
+            if not detected_language and len(segments) > 0:
+                logger.info("Detecting language from first segment...")
+                first_result = transcribe_audio_segment(
+                    str(audio_file), segments[0], model_obj, language=None, batch_size=batch_size
+                )
+                batch_size = first_result.get('batch_size', batch_size)
+                detected_language = first_result.get('language', 'en')
+                all_segments.extend(first_result.get('segments', []))
+                logger.info(f"Detected language: {detected_language}")
+                start_idx = 1  # Skip first segment since we already processed it
+            else:
+                start_idx = 0
+
+            # Transcribe remaining segments with cached model and detected language
+            for i in range(start_idx, len(segments)):
+                # Chunk boundary: the scheduler may hand the slot to a higher-ranked job here
+                checkpoint()
+                seg = segments[i]
+                logger.info(f"Transcribing segment {i+1}/{len(segments)} ({seg.start:.1f}s - {seg.end:.1f}s)")
+
+                # Calculate progress: 20-80% range for transcription phase
+                segment_progress = 20 + int((i / len(segments)) * 60)
+
+                # Send progress callback before processing segment
+                reporter.send(
+                    progress=segment_progress,
+                    stage="transcription",
+                    message=f"Transcribing segment {i+1}/{len(segments)}",
+                    segment_info={
+                        "current": i + 1,
+                        "total": len(segments),
+                        "time_range": f"{seg.start:.1f}s - {seg.end:.1f}s"
+                    }
+                )
+
+                # Reuse model and detected language (no reload, no re-detection!)
+                result = transcribe_audio_segment(
+                    str(audio_file), seg, model_obj, language=detected_language, batch_size=batch_size
+                )
+                # Keep a batch size reduced after an OOM for the remaining chunks
+                batch_size = result.get('batch_size', batch_size)
+                all_segments.extend(result.get('segments', []))
 
         # Cleanup model after all segments processed
         del model_obj
-        gc.collect()
-        torch.cuda.empty_cache()
+        backend.release()
 
         # Align for word-level timestamps
         logger.info("Aligning timestamps across all segments...")
-        send_progress_callback(
-            callback_url=callback_url,
-            job_id=job_id,
+        reporter.send(
             progress=80,
             stage="alignment",
             message="Aligning word-level timestamps..."
         )
 
-        audio = whisperx.load_audio(str(audio_file))
+        with span("load_audio"):
+            audio = backend.load_audio(str(audio_file))
 
         try:
-            model_a, metadata = whisperx.load_align_model(
-                language_code=detected_language or 'en',
-                device=DEVICE
-            )
-            result = whisperx.align(
-                all_segments,
-                model_a,
-                metadata,
-                audio,
-                DEVICE,
-                return_char_alignments=False
-            )
+            with timed_stage("model_load"):
+                model_a = track_model(backend.load_align_model(detected_language or 'en'), "align")
+            with timed_stage("alignment"):
+                result = backend.align(model_a, all_segments, audio)
             all_segments = result.get("segments", all_segments)
 
             del model_a
-            gc.collect()
-            torch.cuda.empty_cache()
+            backend.release()
 
         except Exception as e:
             logger.warning(f"Alignment failed: {e}")
@@ -468,36 +730,35 @@ async def transcribe_large(
             if not hf_token:
                 hf_token = os.getenv("HF_TOKEN")
 
-            if hf_token:
+            if hf_token or not backend.needs_hf_token:
                 logger.info("Running speaker diarization...")
-                send_progress_callback(
-                    callback_url=callback_url,
-                    job_id=job_id,
+                reporter.send(
                     progress=85,
                     stage="diarization",
                     message="Identifying speakers..."
                 )
 
                 try:
-                    diarize_model = whisperx.DiarizationPipeline(
-                        use_auth_token=hf_token,
-                        device=DEVICE
-                    )
-                    diarize_segments = diarize_model(audio)
-                    all_segments = whisperx.assign_word_speakers(diarize_segments, {"segments": all_segments})["segments"]
+                    with timed_stage("model_load"):
+                        diarize_model = track_model(backend.load_diarization_model(hf_token), "diarize")
+                    with timed_stage("diarization"):
+                        all_segments = backend.diarize(diarize_model, audio, {"segments": all_segments})["segments"]
 
                     del diarize_model
-                    gc.collect()
-                    torch.cuda.empty_cache()
+                    backend.release()
 
                 except Exception as e:
                     logger.warning(f"Diarization failed: {e}")
 
-        processing_time = time.time() - start_time
+        processing_time = time.perf_counter() - start_time - (waited_seconds() - waited_at_start)
         realtime_factor = duration / processing_time if processing_time > 0 else 0
+        AUDIO_SECONDS.inc(duration)
+
+        if owns_tracer:
+            tracer.finish()
 
         response = {
-            "filename": file.filename,
+            "filename": filename,
             "duration": duration,
             "language": detected_language,
             "num_segments": len(all_segments),
@@ -505,12 +766,113 @@ async def transcribe_large(
             "chunking_strategy": chunking_strategy,
             "processing_time": processing_time,
             "realtime_factor": realtime_factor,
+            "timings": tracer.summary(),
             "segments": all_segments
         }
 
+        artifact_name = job_id or f"{int(time.time() * 1000)}_{Path(filename).stem}"
+
+        if owns_tracer and (trace or TRACE_ALL_REQUESTS):
+            response["trace_file"] = str(tracer.write_chrome_trace(TRACE_DIR / f"{artifact_name}.json"))
+
+        profile_summary = profiler.finish(artifact_name, keep=should_keep(profile, realtime_factor))
+        if profile_summary:
+            response["profile"] = profile_summary
+
         logger.info(f"Large file transcription completed in {processing_time:.1f}s ({realtime_factor:.1f}x realtime)")
+        return response
+
+    finally:
+        profiler.stop()
+        deactivate_tracer(trace_token)
+
+        # Deliver any buffered progress updates
+        reporter.close()
+
+        # Cleanup extracted audio (the input file belongs to the caller)
+        if audio_file and audio_file != input_file and audio_file.exists():
+            audio_file.unlink()
+
+        backend.release()
+
+
+@app.post("/transcribe-large")
+async def transcribe_large(
+    request: Request,
+    file: UploadFile = File(...),
+    model: str = Form(default="large-v3"),
+    language: Optional[str] = Form(default=None),
+    chunking_strategy: str = Form(default="auto"),
+    enable_diarization: bool = Form(default=True),
+    hf_token: Optional[str] = Form(default=None),
+    callback_url: Optional[str] = Form(default=None),
+    job_id: Optional[str] = Form(default=None),
+    trace: bool = Form(default=False),
+    profile: bool = Form(default=False),
+    priority: str = Form(default="auto"),
+    client_id: Optional[str] = Form(default=None)
+):
+    """
+    Transcribe large audio/video files with automatic chunking.
+
+    Uses VAD-based chunking for optimal performance (12x speedup per research).
+    Automatically segments files >10 minutes for efficient processing.
+
+    Parameters:
+    - file: Audio or video file
+    - model: Whisper model (default: large-v3)
+    - language: Language code (auto-detect if None)
+    - chunking_strategy: 'auto', 'vad', 'time', or 'silence'
+    - enable_diarization: Enable speaker diarization
+    - hf_token: HuggingFace token for diarization
+    - callback_url: Optional URL to POST progress updates
+    - job_id: Optional job ID for progress tracking
+    - trace: Also write a Chrome trace JSON to /app/shared/traces
+    - profile: cProfile this request and write it to /app/shared/profiles
+    - priority: 'auto' (by duration), 'interactive', 'normal' or 'batch'
+    - client_id: Fair-share key (default: client address)
+
+    Returns:
+    - JSON with stitched transcription, timestamps, speakers, stage timings and scheduling
+    """
+    check_priority(priority)
+    temp_file = None
+
+    try:
+        # Save uploaded file
+        temp_file = TEMP_DIR / f"{time.time()}_{file.filename}"
+        logger.info(f"Processing large file: {file.filename}")
+
+        upload_start = time.perf_counter()
+        with timed_stage("upload"):
+            with open(temp_file, "wb") as f:
+                content = await file.read()
+                f.write(content)
+
+        ticket = await job_ticket(temp_file, priority, client_id, request, model, enable_diarization)
+        response = await worker_pool.run(
+            run_transcription_job,
+            ticket=ticket,
+            input_path=str(temp_file),
+            filename=file.filename,
+            model=model,
+            language=language,
+            chunking_strategy=chunking_strategy,
+            enable_diarization=enable_diarization,
+            hf_token=hf_token,
+            callback_url=callback_url,
+            job_id=job_id,
+            trace=trace,
+            profile=profile,
+            upload=(upload_start, time.perf_counter())
+        )
+        response["scheduling"] = ticket.summary()
         return JSONResponse(content=response)
 
+    except AdmissionRejected as e:
+        logger.warning(f"Job not admitted: {e}")
+        raise admission_error(e)
+
     except Exception as e:
         logger.error(f"Large file transcription error: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Transcription failed: {str(e)}")
@@ -519,21 +881,106 @@ async def transcribe_large(
         # Cleanup temp files
         if temp_file and temp_file.exists():
             temp_file.unlink()
-        if audio_file and audio_file != temp_file and audio_file.exists():
-            audio_file.unlink()
 
-        gc.collect()
-        torch.cuda.empty_cache()
+
+def run_video_job(
+    video_path: str,
+    filename: str,
+    model: str = "large-v3",
+    language: Optional[str] = None,
+    enhance_audio: bool = True,
+    enable_diarization: bool = True,
+    hf_token: Optional[str] = None,
+    trace: bool = False,
+    upload: Optional[Tuple[float, float]] = None,
+    batch_size: int = BATCH_SIZE
+) -> dict:
+    """
+    /process-video job: probe, audio extraction and chunked transcription.
+
+    Runs on a worker (see worker_pool.py); returns the response body.
+    """
+    temp_video = Path(video_path)
+    temp_audio = None
+    tracer = Tracer("process_video", filename=filename)
+    trace_token = activate_tracer(tracer)
+    if upload:
+        tracer.add_span("upload", *upload)
+
+    try:
+        # Get video info
+        with span("probe"):
+            video_info = ffmpeg_processor.get_video_info(str(temp_video))
+
+        # Extract and enhance audio
+        temp_audio = TEMP_DIR / f"{temp_video.stem}.wav"
+
+        with timed_stage("extraction"):
+            if enhance_audio:
+                logger.info("Extracting and enhancing audio...")
+                ffmpeg_processor.extract_audio_optimized(str(temp_video), str(temp_audio))
+            else:
+                # Basic extraction without enhancement
+                ffmpeg_processor.extract_audio_optimized(
+                    str(temp_video),
+                    str(temp_audio),
+                    sample_rate=16000,
+                    channels=1
+                )
+
+        # Use the large file job for transcription
+        # (This reuses the chunking logic and this request's tracer)
+        logger.info("Transcribing extracted audio...")
+        transcription_data = run_transcription_job(
+            input_path=str(temp_audio),
+            filename=temp_audio.name,
+            model=model,
+            language=language,
+            chunking_strategy="auto",
+            enable_diarization=enable_diarization,
+            hf_token=hf_token,
+            batch_size=batch_size
+        )
+
+        # Add video metadata to response
+        transcription_data["video_info"] = {
+            "format": video_info.get("format", ""),
+            "duration": video_info.get("duration", 0),
+            "size_bytes": video_info.get("size_bytes", 0),
+            "video_codec": video_info.get("video_codec", ""),
+            "resolution": f"{video_info.get('video_width', 0)}x{video_info.get('video_height', 0)}",
+            "audio_codec": video_info.get("audio_codec", "")
+        }
+
+        tracer.finish()
+        transcription_data["timings"] = tracer.summary()
+        if trace or TRACE_ALL_REQUESTS:
+            trace_name = f"{int(time.time() * 1000)}_{Path(filename).stem}"
+            transcription_data["trace_file"] = str(tracer.write_chrome_trace(TRACE_DIR / f"{trace_name}.json"))
+
+        return transcription_data
+
+    finally:
+        deactivate_tracer(trace_token)
+
+        if temp_audio and temp_audio.exists():
+            temp_audio.unlink()
+
+        backend.release()
 
 
 @app.post("/process-video")
 async def process_video(
+    request: Request,
     file: UploadFile = File(...),
     model: str = Form(default="large-v3"),
     language: Optional[str] = Form(default=None),
     enhance_audio: bool = Form(default=True),
     enable_diarization: bool = Form(default=True),
-    hf_token: Optional[str] = Form(default=None)
+    hf_token: Optional[str] = Form(default=None),
+    trace: bool = Form(default=False),
+    priority: str = Form(default="auto"),
+    client_id: Optional[str] = Form(default=None)
 ):
     """
     Process video file: extract audio, enhance, and transcribe.
@@ -547,84 +994,47 @@ async def process_video(
     - enhance_audio: Apply speech enhancement filters
     - enable_diarization: Enable speaker diarization
     - hf_token: HuggingFace token
+    - trace: Also write a Chrome trace JSON to /app/shared/traces
+    - priority: 'auto' (by duration), 'interactive', 'normal' or 'batch'
+    - client_id: Fair-share key (default: client address)
 
     Returns:
-    - JSON with video metadata and transcription
+    - JSON with video metadata, transcription, stage timings and scheduling
     """
+    check_priority(priority)
     temp_video = None
-    temp_audio = None
 
     try:
         # Save video
         temp_video = TEMP_DIR / f"{time.time()}_{file.filename}"
         logger.info(f"Processing video: {file.filename}")
 
-        with open(temp_video, "wb") as f:
-            content = await file.read()
-            f.write(content)
-
-        # Get video info
-        video_info = ffmpeg_processor.get_video_info(str(temp_video))
-
-        # Extract and enhance audio
-        temp_audio = TEMP_DIR / f"{temp_video.stem}.wav"
-
-        if enhance_audio:
-            logger.info("Extracting and enhancing audio...")
-            ffmpeg_processor.extract_audio_optimized(str(temp_video), str(temp_audio))
-        else:
-            # Basic extraction without enhancement
-            ffmpeg_processor.extract_audio_optimized(
-                str(temp_video),
-                str(temp_audio),
-                sample_rate=16000,
-                channels=1
-            )
-
-        # Use the large file endpoint for transcription
-        # (This reuses the chunking logic)
-        logger.info("Transcribing extracted audio...")
+        upload_start = time.perf_counter()
+        with timed_stage("upload"):
+            with open(temp_video, "wb") as f:
+                content = await file.read()
+                f.write(content)
+
+        ticket = await job_ticket(temp_video, priority, client_id, request, model, enable_diarization)
+        response = await worker_pool.run(
+            run_video_job,
+            ticket=ticket,
+            video_path=str(temp_video),
+            filename=file.filename,
+            model=model,
+            language=language,
+            enhance_audio=enhance_audio,
+            enable_diarization=enable_diarization,
+            hf_token=hf_token,
+            trace=trace,
+            upload=(upload_start, time.perf_counter())
+        )
+        response["scheduling"] = ticket.summary()
+        return JSONResponse(content=response)
 
-        # Create a mock UploadFile for internal processing
-        with open(temp_audio, "rb") as audio_file:
-            audio_content = audio_file.read()
-
-            # Process through large file transcription
-            class MockUploadFile:
-                def __init__(self, filename, content):
-                    self.filename = filename
-                    self._content = content
-
-                async def read(self):
-                    return self._content
-
-            mock_file = MockUploadFile(temp_audio.name, audio_content)
-
-            # Transcribe using large file endpoint logic
-            transcription_result = await transcribe_large(
-                file=mock_file,
-                model=model,
-                language=language,
-                chunking_strategy="auto",
-                enable_diarization=enable_diarization,
-                hf_token=hf_token
-            )
-
-            # Add video metadata to response
-            result_data = transcription_result.body.decode('utf-8')
-            import json
-            transcription_data = json.loads(result_data)
-
-            transcription_data["video_info"] = {
-                "format": video_info.get("format", ""),
-                "duration": video_info.get("duration", 0),
-                "size_bytes": video_info.get("size_bytes", 0),
-                "video_codec": video_info.get("video_codec", ""),
-                "resolution": f"{video_info.get('video_width', 0)}x{video_info.get('video_height', 0)}",
-                "audio_codec": video_info.get("audio_codec", "")
-            }
-
-            return JSONResponse(content=transcription_data)
+    except AdmissionRejected as e:
+        logger.warning(f"Job not admitted: {e}")
+        raise admission_error(e)
 
     except Exception as e:
         logger.error(f"Video processing error: {str(e)}", exc_info=True)
@@ -634,11 +1044,63 @@ async def process_video(
         # Cleanup
         if temp_video and temp_video.exists():
             temp_video.unlink()
-        if temp_audio and temp_audio.exists():
-            temp_audio.unlink()
 
-        gc.collect()
-        torch.cuda.empty_cache()
+
+@app.post("/autotune")
+async def run_autotune(
+    model: str = Form(default="large-v3"),
+    file: Optional[UploadFile] = File(default=None),
+    batch_sizes: Optional[str] = Form(default=None)
+):
+    """
+    Measure throughput per batch size for a model and cache the best size.
+
+    Parameters:
+    - model: Whisper model to tune
+    - file: Calibration clip with speech (default: AUTOTUNE_CLIP)
+    - batch_sizes: Comma-separated sizes to probe (default: AUTOTUNE_BATCH_SIZES)
+
+    Returns:
+    - JSON with the chosen batch size and the measured curve
+    """
+    if file is None and not AUTOTUNE_CLIP:
+        raise HTTPException(status_code=400, detail="Upload a calibration clip or set AUTOTUNE_CLIP")
+    try:
+        sizes = [int(size) for size in batch_sizes.split(",")] if batch_sizes else list(autotune.BATCH_SIZES)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="batch_sizes must be comma-separated integers")
+    if not sizes or min(sizes) < 1:
+        raise HTTPException(status_code=400, detail="batch_sizes must be positive")
+
+    clip = None
+    try:
+        if file is not None:
+            clip = TEMP_DIR / f"{time.time()}_{file.filename}"
+            with open(clip, "wb") as f:
+                f.write(await file.read())
+        result = await tune_batch_size(model, str(clip or AUTOTUNE_CLIP), sizes)
+        return JSONResponse(content=result)
+
+    except AdmissionRejected as e:
+        logger.warning(f"Autotune not admitted: {e}")
+        raise admission_error(e)
+
+    except Exception as e:
+        logger.error(f"Autotune error: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Autotune failed: {str(e)}")
+
+    finally:
+        if clip and clip.exists():
+            clip.unlink()
+
+
+@app.get("/autotune")
+async def autotune_results():
+    """Cached autotune results and the batch size each model currently uses"""
+    return {
+        "batch_size": "auto" if AUTO_BATCH_SIZE else BATCH_SIZE,
+        "results": autotune.list_results()
+    }
 
 
 @app.get("/models")
@@ -661,6 +1123,8 @@ async def list_models():
 
 
 if __name__ == "__main__":
+    import uvicorn
+
     uvicorn.run(
         app,
         host="0.0.0.0",
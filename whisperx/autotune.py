@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+Batch Size Autotuner for WhisperX
+Finds the throughput-optimal transcription batch size for this hardware.
+
+The best BATCH_SIZE depends on the model, the compute type and the GPU.
+The tuner tiles a calibration clip so that the largest candidate batch is
+full. It then transcribes it at increasing batch sizes (AUTOTUNE_BATCH_SIZES)
+and measures throughput in seconds of audio per second. Probing stops at the
+first out-of-memory error or when a size goes over the memory ceiling. The
+chosen size is the smallest one within AUTOTUNE_TOLERANCE of the best
+throughput, because a larger batch that is not faster only costs memory.
+
+Results, including the measured curve, are cached as JSON under
+AUTOTUNE_DIR/<backend>/<model>-<compute_type>-<device>.json. With
+BATCH_SIZE=auto the server uses the cached size for each model, and tunes
+models without one at startup when AUTOTUNE_CLIP is set. POST /autotune
+(re)tunes on demand.
+
+Usage (offline, same environment variables as the server):
+    python autotune.py --model large-v3 --clip speech.wav
+    WHISPERX_BACKEND=synthetic SYNTHETIC_BATCH_OVERHEAD_SECONDS=0.2 python autotune.py --model tiny --clip clip.wav
+"""
+
+import argparse
+import json
+import logging
+import os
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+
+from admission import GB, MemoryDemand, device_available, is_out_of_memory
+
+logger = logging.getLogger(__name__)
+
+AUTOTUNE_DIR = Path(os.getenv("AUTOTUNE_DIR", "/app/shared/autotune"))
+BATCH_SIZES = tuple(int(size) for size in os.getenv("AUTOTUNE_BATCH_SIZES", "1,2,4,8,16,32,64").split(","))
+REPEATS = int(os.getenv("AUTOTUNE_REPEATS", "2"))
+# Pick the smallest batch size within this fraction of the best throughput
+TOLERANCE = float(os.getenv("AUTOTUNE_TOLERANCE", "0.03"))
+
+SAMPLE_RATE = 16000
+WINDOW_SECONDS = 30  # Whisper input window, one batch item
+
+
+def cache_path(backend_name: str, model: str, compute_type: str, device: str) -> Path:
+    return AUTOTUNE_DIR / backend_name / f"{model}-{compute_type}-{device}.json"
+
+
+def load_result(backend_name: str, model: str, compute_type: str, device: str) -> Optional[Dict]:
+    """Cached tuning result, or None if this combination was never tuned"""
+    path = cache_path(backend_name, model, compute_type, device)
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        logger.warning(f"Ignoring unreadable autotune cache {path}: {e}")
+        return None
+
+
+def save_result(result: Dict) -> Path:
+    path = cache_path(result["backend"], result["model"], result["compute_type"], result["device"])
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    with open(tmp, "w") as f:
+        json.dump(result, f, indent=2)
+    # Atomic, so a request never reads a half-written file
+    tmp.replace(path)
+    return path
+
+
+def tuned_batch_size(backend_name: str, model: str, compute_type: str, device: str, default: int) -> int:
+    result = load_result(backend_name, model, compute_type, device)
+    return result["batch_size"] if result else default
+
+
+def list_results() -> Dict[str, Dict]:
+    results = {}
+    for path in sorted(AUTOTUNE_DIR.glob("*/*.json")):
+        try:
+            results[f"{path.parent.name}/{path.stem}"] = json.loads(path.read_text())
+        except (OSError, ValueError):
+            continue
+    return results
+
+
+def calibration_audio(clip: np.ndarray, max_batch_size: int) -> np.ndarray:
+    """Tile clip until it fills max_batch_size Whisper windows"""
+    target = max_batch_size * WINDOW_SECONDS * SAMPLE_RATE
+    if len(clip) == 0:
+        raise ValueError("Calibration clip is empty")
+    return np.tile(clip, -(-target // len(clip)))[:target]
+
+
+def autotune(
+    backend,
+    model_name: str,
+    clip: np.ndarray,
+    batch_sizes: Sequence[int] = BATCH_SIZES,
+    memory_ceiling: Optional[float] = None,
+    language: str = "en",
+    repeats: int = REPEATS
+) -> Dict:
+    """
+    Measure transcription throughput per batch size and pick the best.
+
+    memory_ceiling (bytes) caps the estimated footprint of a candidate
+    (admission.py) and, on CUDA, the device memory it was seen to use.
+    """
+    batch_sizes = sorted(set(batch_sizes))
+    audio = calibration_audio(clip, batch_sizes[-1])
+    audio_seconds = len(audio) / SAMPLE_RATE
+    pool = "device" if backend.device == "cuda" else "host"
+    curve = []
+
+    model = backend.load_model(model_name, language=language)
+    try:
+        # Warm-up: kernel selection and allocator growth are not measured
+        backend.transcribe(model, audio[:WINDOW_SECONDS * SAMPLE_RATE], batch_size=batch_sizes[0], language=language)
+
+        for batch_size in batch_sizes:
+            point = {"batch_size": batch_size}
+            curve.append(point)
+            estimate = MemoryDemand(model_name, batch_size, audio_seconds, False, backend.compute_type,
+                                    backend.device).at_batch_size(batch_size)[pool]
+            point["estimated_gb"] = round(estimate / GB, 2)
+            if memory_ceiling and estimate > memory_ceiling:
+                point["skipped"] = "estimate over memory ceiling"
+                break
+
+            free_before = device_available(backend.device)
+            try:
+                times = []
+                for _ in range(max(1, repeats)):
+                    start = time.perf_counter()
+                    backend.transcribe(model, audio, batch_size=batch_size, language=language)
+                    times.append(time.perf_counter() - start)
+            except Exception as e:
+                if not is_out_of_memory(e):
+                    raise
+                point["skipped"] = "out of memory"
+                backend.release()
+                break
+
+            point["seconds"] = round(min(times), 4)
+            point["throughput"] = round(audio_seconds / min(times), 2)
+            if backend.device == "cuda":
+                used = max(0.0, free_before - device_available(backend.device))
+                point["device_used_gb"] = round(used / GB, 2)
+                if memory_ceiling and used > memory_ceiling:
+                    point["skipped"] = "used memory over ceiling"
+                    break
+            logger.info(f"Autotune {model_name}: batch size {batch_size} -> {point['throughput']:.1f}x realtime")
+    finally:
+        del model
+        backend.release()
+
+    measured = [p for p in curve if "throughput" in p and "skipped" not in p]
+    if not measured:
+        raise RuntimeError(f"No batch size of {batch_sizes} fits for {model_name}")
+    best = max(p["throughput"] for p in measured)
+    chosen = min(p["batch_size"] for p in measured if p["throughput"] >= best * (1 - TOLERANCE))
+
+    return {
+        "backend": backend.name,
+        "model": model_name,
+        "compute_type": backend.compute_type,
+        "device": backend.device,
+        "batch_size": chosen,
+        "best_throughput": best,
+        "calibration_seconds": audio_seconds,
+        "tuned_at": datetime.now().isoformat(),
+        "curve": curve
+    }
+
+
+def format_curve(result: Dict) -> str:
+    lines = [f"{'batch':>6} {'x realtime':>11} {'seconds':>9} {'est GB':>7}  note"]
+    for point in result["curve"]:
+        chosen = "<- chosen" if point["batch_size"] == result["batch_size"] else ""
+        if "throughput" in point:
+            measured = f"{point['throughput']:>11.1f} {point['seconds']:>9.3f}"
+        else:
+            measured = f"{'-':>11} {'-':>9}"
+        lines.append(f"{point['batch_size']:>6} {measured} {point['estimated_gb']:>7.2f}  {point.get('skipped', chosen)}")
+    return "\n".join(lines)
+
+
+def main():
+    from backends import create_backend
+    from gpu import detect_device
+
+    parser = argparse.ArgumentParser(description="WhisperX batch size autotuner")
+    parser.add_argument("--model", default="large-v3")
+    parser.add_argument("--clip", required=True, help="Calibration audio (speech, any length)")
+    parser.add_argument("--batch-sizes", type=int, nargs='+', default=list(BATCH_SIZES))
+    parser.add_argument("--memory-ceiling-gb", type=float, help="Largest footprint a batch size may use")
+    parser.add_argument("--language", default="en")
+    parser.add_argument("--no-save", action="store_true", help="Do not write the cache file")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    backend_name = os.getenv("WHISPERX_BACKEND", "whisperx")
+    device = detect_device() if backend_name == "whisperx" else "cpu"
+    compute_type = os.getenv("COMPUTE_TYPE", "float16" if device == "cuda" else "int8")
+    backend = create_backend(backend_name, device=device, compute_type=compute_type)
+
+    result = autotune(
+        backend,
+        args.model,
+        backend.load_audio(args.clip),
+        batch_sizes=args.batch_sizes,
+        memory_ceiling=args.memory_ceiling_gb * GB if args.memory_ceiling_gb else None,
+        language=args.language
+    )
+    print(format_curve(result))
+    print(f"\nBest batch size for {args.model} ({compute_type}, {device}): {result['batch_size']}")
+    if not args.no_save:
+        print(f"Saved to: {save_result(result)}")
+
+
+if __name__ == "__main__":
+    main()
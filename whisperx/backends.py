@@ -0,0 +1,326 @@
+"""
+Inference Backends for the WhisperX API Server
+Transcription, alignment and diarization behind one interface
+
+- WhisperXBackend: the real model stack (whisperx, faster-whisper, pyannote)
+- SyntheticBackend: deterministic fake models with configurable latency, for
+  benchmarking the orchestration layer (chunking, scheduling, batching,
+  caching) on a machine without a GPU or model weights
+
+Selected with WHISPERX_BACKEND=whisperx|synthetic. Model handles returned by
+the load_* methods are opaque to the server and only passed back to the
+backend that created them.
+"""
+
+import gc
+import logging
+import math
+import os
+import subprocess
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_RATE = 16000
+
+
+class InferenceBackend(ABC):
+    """Model operations used by the API server"""
+
+    name = ""
+    # Whether diarization needs a HuggingFace token (pyannote gated models)
+    needs_hf_token = True
+
+    def __init__(self, device: str = "cpu", compute_type: str = "int8"):
+        self.device = device
+        self.compute_type = compute_type
+
+    @abstractmethod
+    def load_audio(self, path: str) -> np.ndarray:
+        """Decode a file to 16kHz mono float32"""
+
+    @abstractmethod
+    def load_model(self, model_name: str, language: Optional[str] = None):
+        """Load a Whisper model; the handle is passed to transcribe()"""
+
+    @abstractmethod
+    def transcribe(self, model, audio: np.ndarray, batch_size: int, language: Optional[str] = None) -> Dict:
+        """{"segments": [{start, end, text}], "language": code}"""
+
+    @abstractmethod
+    def load_align_model(self, language: str):
+        """Load the alignment model for a language; the handle is passed to align()"""
+
+    @abstractmethod
+    def align(self, align_model, segments: List[Dict], audio: np.ndarray) -> Dict:
+        """{"segments": [...with words], "word_segments": [...]}"""
+
+    @abstractmethod
+    def load_diarization_model(self, hf_token: Optional[str] = None):
+        """Load the diarization pipeline; the handle is passed to diarize()"""
+
+    @abstractmethod
+    def diarize(
+        self,
+        diarize_model,
+        audio: np.ndarray,
+        result: Dict,
+        min_speakers: Optional[int] = None,
+        max_speakers: Optional[int] = None
+    ) -> Dict:
+        """Run diarization and return result with speaker labels on segments and words"""
+
+    def preload(self):
+        """Import the model stack now instead of on first use"""
+
+    def release(self):
+        """Free memory held by models the caller has dropped"""
+        gc.collect()
+
+
+@dataclass
+class AlignModel:
+    """whisperx alignment model and its metadata, kept together as one handle"""
+    model: Any
+    metadata: Dict
+
+
+class WhisperXBackend(InferenceBackend):
+    """The production model stack"""
+
+    name = "whisperx"
+
+    def __init__(self, device: str = "cpu", compute_type: str = "int8"):
+        super().__init__(device, compute_type)
+        self._modules = None
+
+    def preload(self):
+        # Imported on first use, not at server import: torch and whisperx take
+        # seconds to import and the synthetic backend, CLI tools and the light
+        # endpoints need neither. Warmup calls this on the job worker.
+        if self._modules is not None:
+            return
+        import torch
+        import whisperx
+        if self.device == "cuda":
+            # Enable TF32 for RTX 5090 Blackwell optimization (20-40% speedup on 5th-gen Tensor Cores)
+            # TF32 provides significant performance boost with minimal accuracy loss
+            torch.backends.cuda.matmul.allow_tf32 = True
+            torch.backends.cudnn.allow_tf32 = True
+            logger.info("TF32 enabled for Tensor Core acceleration")
+        self._modules = (torch, whisperx)
+
+    @property
+    def _torch(self):
+        self.preload()
+        return self._modules[0]
+
+    @property
+    def _whisperx(self):
+        self.preload()
+        return self._modules[1]
+
+    def load_audio(self, path: str) -> np.ndarray:
+        return self._whisperx.load_audio(path)
+
+    def load_model(self, model_name: str, language: Optional[str] = None):
+        return self._whisperx.load_model(
+            model_name,
+            device=self.device,
+            compute_type=self.compute_type,
+            language=language
+        )
+
+    def transcribe(self, model, audio: np.ndarray, batch_size: int, language: Optional[str] = None) -> Dict:
+        return model.transcribe(audio, batch_size=batch_size, language=language)
+
+    def load_align_model(self, language: str):
+        model_a, metadata = self._whisperx.load_align_model(language_code=language, device=self.device)
+        return AlignModel(model_a, metadata)
+
+    def align(self, align_model: AlignModel, segments: List[Dict], audio: np.ndarray) -> Dict:
+        return self._whisperx.align(
+            segments,
+            align_model.model,
+            align_model.metadata,
+            audio,
+            self.device,
+            return_char_alignments=False
+        )
+
+    def load_diarization_model(self, hf_token: Optional[str] = None):
+        return self._whisperx.DiarizationPipeline(use_auth_token=hf_token, device=self.device)
+
+    def diarize(self, diarize_model, audio, result, min_speakers=None, max_speakers=None) -> Dict:
+        diarize_segments = diarize_model(audio, min_speakers=min_speakers, max_speakers=max_speakers)
+        return self._whisperx.assign_word_speakers(diarize_segments, result)
+
+    def release(self):
+        gc.collect()
+        if self._modules is not None:
+            self._torch.cuda.empty_cache()
+
+
+class SyntheticModel:
+    """Handle returned by SyntheticBackend.load_*"""
+
+    def __init__(self, kind: str, name: str):
+        self.kind = kind
+        self.name = name
+
+
+class SyntheticBackend(InferenceBackend):
+    """
+    Deterministic fake models.
+
+    Audio is decoded with ffmpeg like whisperx.load_audio, so decode cost is
+    real. Each stage blocks for audio_seconds / <stage>_rtf (0 = instant) and
+    returns one segment per SEGMENT_SECONDS with a word every WORD_SECONDS;
+    diarization alternates two speakers per segment. Same input, same output.
+
+    By default the stages sleep, like inference on a GPU where the Python
+    thread mostly waits. With cpu_bound they spin in Python and hold the GIL,
+    like CPU inference, so worker-process scaling can be measured.
+
+    Transcription also costs batch_overhead seconds per batch of 30s windows,
+    and batch sizes above max_batch_size (0 = no limit) fail like a CUDA
+    out-of-memory error, so batch-size tuning and OOM handling can be tested.
+    """
+
+    name = "synthetic"
+    needs_hf_token = False
+
+    SEGMENT_SECONDS = 5.0
+    WORD_SECONDS = 0.4
+    WINDOW_SECONDS = 30.0
+
+    def __init__(
+        self,
+        device: str = "cpu",
+        compute_type: str = "int8",
+        transcribe_rtf: float = None,
+        align_rtf: float = None,
+        diarize_rtf: float = None,
+        model_load_seconds: float = None,
+        cpu_bound: bool = None,
+        batch_overhead: float = None,
+        max_batch_size: int = None
+    ):
+        super().__init__(device, compute_type)
+        self.transcribe_rtf = transcribe_rtf if transcribe_rtf is not None else \
+            float(os.getenv("SYNTHETIC_TRANSCRIBE_RTF", "60"))
+        self.align_rtf = align_rtf if align_rtf is not None else float(os.getenv("SYNTHETIC_ALIGN_RTF", "300"))
+        self.diarize_rtf = diarize_rtf if diarize_rtf is not None else \
+            float(os.getenv("SYNTHETIC_DIARIZE_RTF", "200"))
+        self.model_load_seconds = model_load_seconds if model_load_seconds is not None else \
+            float(os.getenv("SYNTHETIC_MODEL_LOAD_SECONDS", "0.5"))
+        self.cpu_bound = cpu_bound if cpu_bound is not None else \
+            os.getenv("SYNTHETIC_CPU_BOUND", "false").lower() in ("1", "true", "yes")
+        self.batch_overhead = batch_overhead if batch_overhead is not None else \
+            float(os.getenv("SYNTHETIC_BATCH_OVERHEAD_SECONDS", "0"))
+        self.max_batch_size = max_batch_size if max_batch_size is not None else \
+            int(os.getenv("SYNTHETIC_MAX_BATCH_SIZE", "0"))
+
+    def _simulate(self, audio: np.ndarray, realtime_factor: float, extra_seconds: float = 0.0):
+        seconds = (len(audio) / SAMPLE_RATE / realtime_factor if realtime_factor > 0 else 0.0) + extra_seconds
+        if seconds <= 0:
+            return
+        if not self.cpu_bound:
+            time.sleep(seconds)
+            return
+        # Spend the time as CPU time of this thread, so contention slows it down
+        deadline = time.thread_time() + seconds
+        while time.thread_time() < deadline:
+            pass
+
+    def _load(self, kind: str, name: str) -> SyntheticModel:
+        logger.info(f"Loading synthetic {kind} model '{name}' (no weights)")
+        time.sleep(self.model_load_seconds)
+        return SyntheticModel(kind, name)
+
+    def _spans(self, audio: np.ndarray) -> List[tuple]:
+        duration = len(audio) / SAMPLE_RATE
+        spans = []
+        start = 0.0
+        while start < duration:
+            end = min(start + self.SEGMENT_SECONDS, duration)
+            spans.append((round(start, 3), round(end, 3)))
+            start = end
+        return spans
+
+    def load_audio(self, path: str) -> np.ndarray:
+        cmd = [
+            "ffmpeg", "-nostdin", "-threads", "0", "-i", path,
+            "-f", "s16le", "-ac", "1", "-acodec", "pcm_s16le", "-ar", str(SAMPLE_RATE), "-"
+        ]
+        try:
+            out = subprocess.run(cmd, capture_output=True, check=True).stdout
+        except subprocess.CalledProcessError as e:
+            raise RuntimeError(f"Failed to load audio: {e.stderr.decode()}") from e
+        return np.frombuffer(out, np.int16).flatten().astype(np.float32) / 32768.0
+
+    def load_model(self, model_name: str, language: Optional[str] = None):
+        return self._load("whisper", model_name)
+
+    def transcribe(self, model, audio: np.ndarray, batch_size: int, language: Optional[str] = None) -> Dict:
+        if self.max_batch_size and batch_size > self.max_batch_size:
+            raise RuntimeError(f"CUDA out of memory (synthetic: batch size {batch_size} > {self.max_batch_size})")
+        windows = math.ceil(len(audio) / SAMPLE_RATE / self.WINDOW_SECONDS)
+        self._simulate(audio, self.transcribe_rtf, math.ceil(windows / max(1, batch_size)) * self.batch_overhead)
+        segments = [
+            {"start": start, "end": end,
+             "text": " " + " ".join(f"word{i}" for i in range(int((end - start) / self.WORD_SECONDS)))}
+            for start, end in self._spans(audio)
+        ]
+        return {"segments": segments, "language": language or "en"}
+
+    def load_align_model(self, language: str):
+        return self._load("align", language)
+
+    def align(self, align_model, segments: List[Dict], audio: np.ndarray) -> Dict:
+        self._simulate(audio, self.align_rtf)
+        aligned = []
+        word_segments = []
+        for seg in segments:
+            words = []
+            for i, word in enumerate(seg.get("text", "").split()):
+                start = seg["start"] + i * self.WORD_SECONDS
+                end = min(start + self.WORD_SECONDS * 0.8, seg["end"])
+                words.append({"word": word, "start": round(start, 3), "end": round(end, 3), "score": 0.9})
+            aligned.append({**seg, "words": words})
+            word_segments.extend(words)
+        return {"segments": aligned, "word_segments": word_segments}
+
+    def load_diarization_model(self, hf_token: Optional[str] = None):
+        return self._load("diarize", "synthetic")
+
+    def diarize(self, diarize_model, audio, result, min_speakers=None, max_speakers=None) -> Dict:
+        self._simulate(audio, self.diarize_rtf)
+        turns = [(start, end, f"SPEAKER_{i % 2:02d}") for i, (start, end) in enumerate(self._spans(audio))]
+        for seg in result.get("segments", []):
+            speaker = next((s for start, end, s in turns if start <= seg["start"] < end), None)
+            if speaker:
+                seg["speaker"] = speaker
+                for word in seg.get("words", []):
+                    word["speaker"] = speaker
+        return result
+
+
+BACKENDS = {
+    WhisperXBackend.name: WhisperXBackend,
+    SyntheticBackend.name: SyntheticBackend
+}
+
+
+def create_backend(name: str, device: str = "cpu", compute_type: str = "int8") -> InferenceBackend:
+    """Instantiate a backend by name (WHISPERX_BACKEND)"""
+    try:
+        backend_class = BACKENDS[name]
+    except KeyError:
+        raise ValueError(f"Unknown inference backend '{name}', expected one of {sorted(BACKENDS)}") from None
+    return backend_class(device=device, compute_type=compute_type)
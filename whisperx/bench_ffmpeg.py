@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+FFmpeg Hardware Acceleration Benchmark for WhisperX
+Hardware (NVDEC/NVENC) vs software ffmpeg runs, as FFmpegProcessor issues them.
+
+- probe: the capability probe (-version, -hwaccels, -encoders) that runs
+  once per process, against the `ffmpeg -version` check that used to run on
+  every FFmpegProcessor() (VideoSegmenter creates one per chunking call)
+- extract_audio: audio extraction without and with `-hwaccel cuda`. With
+  -vn no video is decoded, so the hardware variant only adds setup time;
+  the processor no longer uses it
+- burn_subtitles: libx264 with software decoding, h264_nvenc with software
+  decoding, and h264_nvenc with `-hwaccel cuda`
+
+Variants the local ffmpeg build lacks are listed as skipped. Variants that
+fail, e.g. NVENC built in but no usable GPU, are listed with their error:
+burn_subtitles falls back to libx264 for those.
+
+The synthetic video (testsrc2 + tone, --size, 30 fps) is cached like the
+audio in bench_preprocessing.py.
+
+Usage:
+    python bench_ffmpeg.py
+    python bench_ffmpeg.py --durations 60 600 --size 1920x1080 --repeat 5
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+import ffmpeg_processor
+from bench_preprocessing import AUDIO_CACHE_DIR, bench, ffmpeg_version
+from ffmpeg_processor import FFmpegProcessor
+
+RESULTS_DIR = Path(__file__).parent / "bench-results"
+DEFAULT_DURATIONS = [60, 600]
+
+
+def synthetic_video(duration: int, size: str) -> Path:
+    """H.264/AAC MP4 of a test pattern with a tone (cached)"""
+    AUDIO_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    path = AUDIO_CACHE_DIR / f"testsrc_{size}_{duration}s.mp4"
+    if path.exists():
+        return path
+
+    print(f"Generating {duration}s {size} synthetic video...")
+    subprocess.run([
+        'ffmpeg', '-v', 'error', '-y',
+        '-f', 'lavfi', '-i', f'testsrc2=size={size}:rate=30:duration={duration}',
+        '-f', 'lavfi', '-i', f'sine=frequency=220:sample_rate=48000:duration={duration}',
+        '-c:v', 'libx264', '-preset', 'veryfast', '-pix_fmt', 'yuv420p', '-c:a', 'aac', str(path)
+    ], check=True)
+    return path
+
+
+def subtitles(duration: int, directory: Path) -> Path:
+    """SRT with a two-second cue every three seconds"""
+    def stamp(seconds: int) -> str:
+        return f"{seconds // 3600:02d}:{seconds // 60 % 60:02d}:{seconds % 60:02d},000"
+
+    path = directory / f"subtitles_{duration}s.srt"
+    with open(path, 'w') as f:
+        for i, start in enumerate(range(0, duration, 3)):
+            f.write(f"{i + 1}\n{stamp(start)} --> {stamp(start + 2)}\nSubtitle line {i + 1}\n\n")
+    return path
+
+
+def run(cmd: list):
+    subprocess.run(cmd, capture_output=True, text=True, check=True)
+
+
+def bench_command(name: str, cmd: list, duration: int, repeat: int, **extra) -> dict:
+    """bench() of an ffmpeg command, or an error entry if it fails"""
+    try:
+        run(cmd)
+    except subprocess.CalledProcessError as e:
+        reason = (e.stderr or '').strip().splitlines()
+        error = reason[-1] if reason else str(e)
+        print(f"  {name:<28} failed: {error}")
+        return {"name": name, "audio_seconds": duration, "error": error, **extra}
+    return bench(name, lambda: run(cmd), duration, repeat, warmup=0, **extra)
+
+
+def skipped(name: str, duration: int, reason: str) -> dict:
+    print(f"  {name:<28} skipped: {reason}")
+    return {"name": name, "audio_seconds": duration, "skipped": reason}
+
+
+def bench_probe(repeat: int) -> list:
+    def cold_probe():
+        ffmpeg_processor._capabilities = None
+        ffmpeg_processor.probe_capabilities()
+
+    print("\nProbe")
+    results = [
+        bench("probe.capabilities", cold_probe, 0, repeat, warmup=0),
+        bench("probe.cached_processor", FFmpegProcessor, 0, repeat),
+        bench("probe.ffmpeg_version", lambda: run(['ffmpeg', '-version']), 0, repeat, warmup=0)
+    ]
+    return results
+
+
+def run_suite(processor: FFmpegProcessor, duration: int, size: str, repeat: int, workdir: Path) -> list:
+    video = synthetic_video(duration, size)
+    srt = subtitles(duration, workdir)
+    audio_out = str(workdir / "audio.wav")
+    video_out = str(workdir / "burned.mp4")
+    has_cuda = 'cuda' in processor.capabilities.hwaccels
+    has_nvenc = 'h264_nvenc' in processor.capabilities.encoders
+    print(f"\n{duration}s {size} video ({video.stat().st_size / 1024 ** 2:.0f} MB)")
+    results = []
+
+    results.append(bench_command(
+        "extract_audio.software", processor.extract_audio_command(str(video), audio_out), duration, repeat
+    ))
+    if has_cuda:
+        results.append(bench_command(
+            "extract_audio.hwaccel_cuda",
+            processor.extract_audio_command(str(video), audio_out, hwaccel='cuda'), duration, repeat
+        ))
+    else:
+        results.append(skipped("extract_audio.hwaccel_cuda", duration, "ffmpeg has no cuda hwaccel"))
+
+    variants = [
+        ("burn_subtitles.libx264", 'libx264', None, True),
+        ("burn_subtitles.nvenc", 'h264_nvenc', None, has_nvenc),
+        ("burn_subtitles.nvenc_nvdec", 'h264_nvenc', 'cuda', has_nvenc and has_cuda)
+    ]
+    for name, encoder, hwaccel, available in variants:
+        if not available:
+            results.append(skipped(name, duration, f"ffmpeg has no {'h264_nvenc' if not has_nvenc else 'cuda hwaccel'}"))
+            continue
+        cmd = processor.burn_subtitles_command(str(video), str(srt), video_out, encoder=encoder, hwaccel=hwaccel)
+        results.append(bench_command(name, cmd, duration, repeat, encoder=encoder, hwaccel=hwaccel))
+
+    software = results[0].get("median_s")
+    for r in results[1:]:
+        if r["name"].startswith("extract_audio") and "median_s" in r and software:
+            r["vs_software"] = r["median_s"] / software
+    burn_software = next((r.get("median_s") for r in results if r["name"] == "burn_subtitles.libx264"), None)
+    for r in results:
+        if r["name"].startswith("burn_subtitles.nvenc") and "median_s" in r and burn_software:
+            r["speedup_vs_libx264"] = burn_software / r["median_s"]
+            print(f"  {r['name']:<28} {r['speedup_vs_libx264']:.2f}x vs libx264")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="WhisperX ffmpeg hardware acceleration benchmark")
+    parser.add_argument("--durations", type=int, nargs='+', default=DEFAULT_DURATIONS,
+                        help="Synthetic video lengths in seconds")
+    parser.add_argument("--size", default="1280x720", help="Synthetic video size (default: 1280x720)")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--json", help="Output file (default: bench-results/ffmpeg-<timestamp>.json)")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    processor = FFmpegProcessor(use_hw_accel=True)
+    capabilities = processor.capabilities
+    print(f"{capabilities.version}")
+    print(f"hwaccels: {', '.join(sorted(capabilities.hwaccels)) or 'none'}; probed in "
+          f"{(time.perf_counter() - start) * 1000:.0f} ms")
+    print(f"extraction: no hwaccel; burn_subtitles: {processor.h264_encoder}, "
+          f"decode {processor.video_hwaccel or 'software'}")
+
+    results = bench_probe(args.repeat)
+    with tempfile.TemporaryDirectory() as workdir:
+        for duration in args.durations:
+            results.extend(run_suite(processor, duration, args.size, args.repeat, Path(workdir)))
+
+    output = Path(args.json) if args.json else RESULTS_DIR / f"ffmpeg-{datetime.now():%Y%m%d-%H%M%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump({
+            "timestamp": datetime.now().isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "ffmpeg": ffmpeg_version(),
+            "hwaccels": sorted(capabilities.hwaccels),
+            "h264_encoders": sorted(name for name in capabilities.encoders if '264' in name),
+            "size": args.size,
+            "results": results
+        }, f, indent=2)
+    print(f"\nResults saved to: {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,441 @@
+#!/usr/bin/env python3
+"""
+Load Generator for the WhisperX HTTP API
+Replays a mix of synthetic audio and video uploads against /transcribe-large
+and /process-video and reports client latency, throughput and error rates
+together with the server's own stage metrics.
+
+Two arrival models:
+- closed loop (--concurrency 1 2 4): N clients each send the next request as
+  soon as the previous one returns; one run per level
+- open loop (--rate 0.5): Poisson arrivals at a fixed mean rate, independent
+  of how fast the server answers. Latency is measured from the scheduled
+  arrival time, so client-side queueing behind --max-inflight counts
+  (no coordinated omission)
+
+/metrics is scraped before and after each run (stage time deltas, request
+outcomes) and sampled during it (in-flight jobs). Run the server with
+WHISPERX_BACKEND=synthetic to load test without a GPU:
+
+    WHISPERX_BACKEND=synthetic python api_server.py
+    python bench_load.py --concurrency 1 2 4 --duration 60
+    python bench_load.py --rate 0.5 --duration 120 --mix transcribe-large=1
+"""
+
+import argparse
+import json
+import os
+import queue
+import random
+import re
+import statistics
+import subprocess
+import tempfile
+import threading
+import time
+from collections import Counter, defaultdict
+from datetime import datetime
+from pathlib import Path
+
+import requests
+
+DEFAULT_URL = os.getenv("WHISPERX_URL", "http://localhost:8000")
+DEFAULT_MIX = "transcribe-large=3,process-video=1"
+DEFAULT_AUDIO_LENGTHS = [30, 120]
+RESULTS_DIR = Path(__file__).parent / "bench-results"
+MEDIA_CACHE_DIR = Path(tempfile.gettempdir()) / "whisperx-bench-media"
+SAMPLE_RATE = 16000
+SPEECH_SECONDS = 8
+GAP_SECONDS = 3
+METRICS_SAMPLE_INTERVAL = 1.0
+
+_SAMPLE_LINE = re.compile(r"^(?P<name>[a-zA-Z_:][\w:]*)(?:\{(?P<labels>[^}]*)\})?\s+(?P<value>\S+)$")
+_LABEL = re.compile(r'(\w+)="((?:[^"\\]|\\.)*)"')
+
+
+def synthetic_media(duration: int, video: bool = False) -> Path:
+    """
+    Tone + noise bursts with silence gaps, as WAV or as a small H.264/AAC MP4 (cached).
+
+    Same signal as bench_preprocessing.synthetic_audio, generated here so the
+    load generator only needs ffmpeg and requests on the client machine.
+    """
+    MEDIA_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    path = MEDIA_CACHE_DIR / f"bursts_{duration}s.{'mp4' if video else 'wav'}"
+    if path.exists():
+        return path
+
+    period = SPEECH_SECONDS + GAP_SECONDS
+    print(f"Generating {duration}s synthetic {'video' if video else 'audio'}...")
+    inputs = [
+        '-f', 'lavfi', '-i', f'sine=frequency=220:sample_rate={SAMPLE_RATE}:duration={duration}',
+        '-f', 'lavfi', '-i', f'anoisesrc=color=pink:amplitude=0.1:sample_rate={SAMPLE_RATE}:duration={duration}'
+    ]
+    audio_filter = f"[0][1]amix=inputs=2,volume='if(lt(mod(t,{period}),{SPEECH_SECONDS}),1,0)':eval=frame[a]"
+    if video:
+        inputs += ['-f', 'lavfi', '-i', f'testsrc=size=320x240:rate=10:duration={duration}']
+        codecs = ['-map', '2:v', '-c:v', 'libx264', '-preset', 'ultrafast', '-c:a', 'aac']
+    else:
+        codecs = ['-c:a', 'pcm_s16le']
+    subprocess.run([
+        'ffmpeg', '-v', 'error', '-y', *inputs,
+        '-filter_complex', audio_filter, '-map', '[a]', *codecs,
+        '-ac', '1', '-ar', str(SAMPLE_RATE), str(path)
+    ], check=True)
+    return path
+
+
+def parse_mix(mix: str) -> dict:
+    """'transcribe-large=3,process-video=1' -> {endpoint: weight}"""
+    weights = {}
+    for part in mix.split(","):
+        name, _, weight = part.partition("=")
+        weights["/" + name.strip().lstrip("/")] = float(weight or 1)
+    return weights
+
+
+def parse_metrics(text: str) -> dict:
+    """Prometheus text format -> {(name, frozenset(labels)): value}"""
+    samples = {}
+    for line in text.splitlines():
+        if not line or line.startswith("#"):
+            continue
+        match = _SAMPLE_LINE.match(line)
+        if not match:
+            continue
+        labels = frozenset(_LABEL.findall(match.group("labels") or ""))
+        samples[(match.group("name"), labels)] = float(match.group("value"))
+    return samples
+
+
+def scrape(session: requests.Session, url: str) -> dict:
+    try:
+        response = session.get(f"{url}/metrics", timeout=5)
+        response.raise_for_status()
+        return parse_metrics(response.text)
+    except requests.RequestException:
+        return {}
+
+
+def metric_deltas(before: dict, after: dict) -> dict:
+    """Server-side stage time, job counts and request outcomes accumulated during a run"""
+    def delta(name):
+        grouped = defaultdict(float)
+        for (sample, labels), value in after.items():
+            if sample == name:
+                grouped[labels] += value - before.get((sample, labels), 0.0)
+        return grouped
+
+    stages = {}
+    counts = delta("whisperx_stage_duration_seconds_count")
+    for labels, total in delta("whisperx_stage_duration_seconds_sum").items():
+        count = counts.get(labels, 0)
+        if count:
+            stages[dict(labels)["stage"]] = {"count": int(count), "seconds": total, "mean_s": total / count}
+
+    outcomes = {}
+    for labels, value in delta("whisperx_requests_total").items():
+        label = dict(labels)
+        # Our own /metrics scrapes are not part of the load
+        if value and label["endpoint"] != "/metrics":
+            outcomes[f"{label['endpoint']}:{label['outcome']}"] = int(value)
+
+    audio = delta("whisperx_audio_seconds_processed_total").get(frozenset(), 0.0)
+    return {"stages": stages, "requests": outcomes, "audio_seconds_processed": audio}
+
+
+class InflightSampler(threading.Thread):
+    """
+    Polls whisperx_inflight_jobs while a run is in progress.
+
+    Also records how long each scrape takes: a slow /metrics response means
+    the server's event loop is blocked by request work.
+    """
+
+    def __init__(self, url: str):
+        super().__init__(daemon=True)
+        self.url = url
+        self.samples = []
+        self.scrape_seconds = []
+        self._done = threading.Event()
+
+    def run(self):
+        session = requests.Session()
+        while not self._done.wait(METRICS_SAMPLE_INTERVAL):
+            start = time.perf_counter()
+            values = scrape(session, self.url)
+            self.scrape_seconds.append(time.perf_counter() - start)
+            if values:
+                self.samples.append(sum(v for (name, _), v in values.items() if name == "whisperx_inflight_jobs"))
+
+    def stop(self) -> dict:
+        self._done.set()
+        self.join()
+        if not self.samples:
+            return {"samples": 0}
+        return {"samples": len(self.samples), "mean": statistics.fmean(self.samples), "max": max(self.samples),
+                "scrape_p50_s": statistics.median(self.scrape_seconds), "scrape_max_s": max(self.scrape_seconds)}
+
+
+class LoadGenerator:
+    def __init__(self, url: str, mix: dict, payloads: dict, form: dict, timeout: float, seed: int):
+        self.url = url.rstrip("/")
+        self.mix = mix
+        self.payloads = payloads
+        self.form = form
+        self.timeout = timeout
+        self.rng = random.Random(seed)
+        self._rng_lock = threading.Lock()
+        self._local = threading.local()
+
+    def _session(self) -> requests.Session:
+        if not hasattr(self._local, "session"):
+            self._local.session = requests.Session()
+        return self._local.session
+
+    def pick(self) -> tuple:
+        """Weighted endpoint choice and a random payload of the matching kind"""
+        with self._rng_lock:
+            endpoint = self.rng.choices(list(self.mix), weights=list(self.mix.values()))[0]
+            kind = "video" if endpoint == "/process-video" else "audio"
+            return endpoint, self.rng.choice(self.payloads[kind])
+
+    def send(self, endpoint: str, payload: dict, scheduled: float) -> dict:
+        started = time.perf_counter()
+        record = {
+            "endpoint": endpoint,
+            "audio_seconds": payload["audio_seconds"],
+            "queued_s": started - scheduled,
+            "status": None,
+            "error": None
+        }
+        try:
+            response = self._session().post(
+                self.url + endpoint,
+                files={"file": (payload["filename"], payload["content"], payload["content_type"])},
+                data=self.form,
+                timeout=self.timeout
+            )
+            record["status"] = response.status_code
+            if response.status_code >= 400:
+                record["error"] = response.text[:200]
+        except requests.RequestException as e:
+            record["error"] = type(e).__name__
+        finished = time.perf_counter()
+        record["service_s"] = finished - started
+        record["latency_s"] = finished - scheduled
+        return record
+
+    def closed_loop(self, concurrency: int, duration: float, max_requests: int = None) -> list:
+        records = []
+        lock = threading.Lock()
+        deadline = time.perf_counter() + duration
+        issued = [0]
+
+        def client():
+            while time.perf_counter() < deadline:
+                with lock:
+                    if max_requests and issued[0] >= max_requests:
+                        return
+                    issued[0] += 1
+                endpoint, payload = self.pick()
+                record = self.send(endpoint, payload, time.perf_counter())
+                with lock:
+                    records.append(record)
+
+        threads = [threading.Thread(target=client, daemon=True) for _ in range(concurrency)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        return records
+
+    def open_loop(self, rate: float, duration: float, max_inflight: int, max_requests: int = None) -> list:
+        records = []
+        lock = threading.Lock()
+        arrivals = queue.Queue()
+
+        def worker():
+            while True:
+                item = arrivals.get()
+                if item is None:
+                    return
+                record = self.send(*item)
+                with lock:
+                    records.append(record)
+
+        workers = [threading.Thread(target=worker, daemon=True) for _ in range(max_inflight)]
+        for w in workers:
+            w.start()
+
+        start = time.perf_counter()
+        next_arrival = start
+        sent = 0
+        while next_arrival - start < duration and not (max_requests and sent >= max_requests):
+            delay = next_arrival - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            endpoint, payload = self.pick()
+            arrivals.put((endpoint, payload, next_arrival))
+            sent += 1
+            with self._rng_lock:
+                next_arrival += self.rng.expovariate(rate)
+
+        for _ in workers:
+            arrivals.put(None)
+        for w in workers:
+            w.join()
+        return records
+
+
+def latency_summary(values: list) -> dict:
+    if not values:
+        return {"n": 0}
+    ordered = sorted(values)
+
+    def pct(p):
+        return ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))]
+
+    return {"n": len(ordered), "p50": pct(50), "p90": pct(90), "p95": pct(95), "p99": pct(99),
+            "max": ordered[-1], "mean": statistics.fmean(ordered)}
+
+
+def succeeded(record: dict) -> bool:
+    return record["status"] is not None and record["status"] < 400
+
+
+def summarize(records: list, wall_seconds: float) -> dict:
+    ok = [r for r in records if succeeded(r)]
+    by_endpoint = {}
+    for endpoint in sorted({r["endpoint"] for r in records}):
+        subset = [r for r in records if r["endpoint"] == endpoint]
+        by_endpoint[endpoint] = {
+            "requests": len(subset),
+            "errors": sum(1 for r in subset if not succeeded(r)),
+            "latency_s": latency_summary([r["latency_s"] for r in subset if succeeded(r)])
+        }
+    return {
+        "requests": len(records),
+        "succeeded": len(ok),
+        "error_rate": (len(records) - len(ok)) / len(records) if records else 0.0,
+        "outcomes": dict(Counter(str(r["status"] or r["error"]) for r in records)),
+        "wall_seconds": wall_seconds,
+        "throughput_rps": len(ok) / wall_seconds if wall_seconds else 0.0,
+        "audio_throughput": sum(r["audio_seconds"] for r in ok) / wall_seconds if wall_seconds else 0.0,
+        "latency_s": latency_summary([r["latency_s"] for r in ok]),
+        "client_queue_s": latency_summary([r["queued_s"] for r in records]),
+        "endpoints": by_endpoint
+    }
+
+
+def print_run(label: str, summary: dict):
+    lat = summary["latency_s"]
+    print(f"\n{label}: {summary['requests']} requests in {summary['wall_seconds']:.1f}s, "
+          f"{summary['throughput_rps']:.2f} req/s, {summary['audio_throughput']:.1f}x realtime, "
+          f"error rate {summary['error_rate']:.1%}")
+    if lat["n"]:
+        print(f"  latency  p50 {lat['p50']:.2f}s  p90 {lat['p90']:.2f}s  p95 {lat['p95']:.2f}s  "
+              f"p99 {lat['p99']:.2f}s  max {lat['max']:.2f}s")
+    for endpoint, stats in summary["endpoints"].items():
+        e_lat = stats["latency_s"]
+        p95 = f"p95 {e_lat['p95']:.2f}s" if e_lat["n"] else "no successes"
+        print(f"  {endpoint:<20} {stats['requests']:>5} requests  {stats['errors']:>4} errors  {p95}")
+    if summary["error_rate"]:
+        print(f"  outcomes: {summary['outcomes']}")
+
+    server = summary.get("server", {})
+    if server.get("stages"):
+        stages = ", ".join(f"{name} {s['mean_s']:.2f}s" for name, s in
+                           sorted(server["stages"].items(), key=lambda item: -item[1]["seconds"]))
+        print(f"  server stage means: {stages}")
+    inflight = server.get("inflight_jobs", {})
+    if inflight.get("samples"):
+        print(f"  server in-flight jobs: mean {inflight['mean']:.1f}, max {inflight['max']:.0f}; "
+              f"/metrics scrape p50 {inflight['scrape_p50_s']:.2f}s, max {inflight['scrape_max_s']:.2f}s")
+
+
+def load_payloads(lengths: list, mix: dict) -> dict:
+    payloads = {"audio": [], "video": []}
+    for duration in lengths:
+        if any(endpoint != "/process-video" for endpoint in mix):
+            path = synthetic_media(duration)
+            payloads["audio"].append({"filename": path.name, "content": path.read_bytes(),
+                                      "content_type": "audio/wav", "audio_seconds": duration})
+        if "/process-video" in mix:
+            path = synthetic_media(duration, video=True)
+            payloads["video"].append({"filename": path.name, "content": path.read_bytes(),
+                                      "content_type": "video/mp4", "audio_seconds": duration})
+    return payloads
+
+
+def main():
+    parser = argparse.ArgumentParser(description="WhisperX HTTP load generator")
+    parser.add_argument("--url", default=DEFAULT_URL, help=f"Server URL (default: {DEFAULT_URL})")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"Endpoint weights (default: {DEFAULT_MIX})")
+    parser.add_argument("--audio-lengths", type=int, nargs='+', default=DEFAULT_AUDIO_LENGTHS,
+                        help="Synthetic file lengths in seconds, picked uniformly per request")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--concurrency", type=int, nargs='+', default=[1],
+                      help="Closed-loop client counts to sweep (default: 1)")
+    mode.add_argument("--rate", type=float, nargs='+', help="Open-loop Poisson arrival rates (req/s) to sweep")
+    parser.add_argument("--max-inflight", type=int, default=32, help="Open-loop cap on concurrent requests")
+    parser.add_argument("--duration", type=float, default=60, help="Seconds of arrivals per run")
+    parser.add_argument("--requests", type=int, help="Stop each run after this many requests")
+    parser.add_argument("--timeout", type=float, default=3600, help="Per-request timeout in seconds")
+    parser.add_argument("--form", action="append", default=[], metavar="KEY=VALUE",
+                        help="Extra form field (default: enable_diarization=false, model=tiny)")
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--json", help="Output file (default: bench-results/load-<timestamp>.json)")
+    args = parser.parse_args()
+
+    mix = parse_mix(args.mix)
+    form = {"enable_diarization": "false", "model": "tiny"}
+    form.update(dict(item.split("=", 1) for item in args.form))
+    payloads = load_payloads(args.audio_lengths, mix)
+    generator = LoadGenerator(args.url, mix, payloads, form, args.timeout, args.seed)
+
+    session = requests.Session()
+    try:
+        health = session.get(f"{generator.url}/health", timeout=5).json()
+    except requests.RequestException as e:
+        raise SystemExit(f"Server not reachable at {generator.url}: {e}")
+    print(f"Server: {health}")
+
+    levels = [("rate", r) for r in args.rate] if args.rate else [("concurrency", c) for c in args.concurrency]
+    runs = []
+    for kind, level in levels:
+        before = scrape(session, generator.url)
+        sampler = InflightSampler(generator.url)
+        sampler.start()
+        start = time.perf_counter()
+        if kind == "rate":
+            records = generator.open_loop(level, args.duration, args.max_inflight, args.requests)
+        else:
+            records = generator.closed_loop(level, args.duration, args.requests)
+        wall = time.perf_counter() - start
+        inflight = sampler.stop()
+
+        summary = summarize(records, wall)
+        summary["server"] = {**metric_deltas(before, scrape(session, generator.url)), "inflight_jobs": inflight}
+        summary[kind] = level
+        print_run(f"{kind}={level}", summary)
+        runs.append({**summary, "records": records})
+
+    output = Path(args.json) if args.json else RESULTS_DIR / f"load-{datetime.now():%Y%m%d-%H%M%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump({
+            "timestamp": datetime.now().isoformat(),
+            "url": generator.url,
+            "server": health,
+            "mix": mix,
+            "audio_lengths": args.audio_lengths,
+            "form": form,
+            "duration": args.duration,
+            "runs": runs
+        }, f, indent=2)
+    print(f"\nResults saved to: {output}")
+
+
+if __name__ == "__main__":
+    main()
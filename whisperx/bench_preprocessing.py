@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+"""
+Preprocessing Microbenchmarks for WhisperX
+CPU-only timings of the request hot paths outside the model:
+
+- silencedetect: ffmpeg run and parsing of its log output, against the
+  native detector on the WAV file and on the decoded array (with the
+  largest boundary difference to ffmpeg's silences)
+- chunking: VAD Cut & Merge, time-based and silence-based chunk creation
+- audio: full-file decode (whisperx.load_audio equivalent) and per-chunk slicing
+- response: JSON rendering of a transcription response
+
+Synthetic audio (tone + pink noise in 8s bursts with 3s silence gaps) is
+generated with ffmpeg and cached between runs. Results are written as JSON
+for trend tracking; --baseline fails the run when a benchmark's median is
+slower than a previous result file by more than --max-regression.
+
+Usage:
+    python bench_preprocessing.py
+    python bench_preprocessing.py --durations 60 3600 --repeat 10
+    python bench_preprocessing.py --baseline bench-results/preprocessing-20251020-120000.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+from ffmpeg_processor import find_silences, parse_silencedetect, wav_silences
+from video_segmenter import (
+    merge_speech_segments,
+    silence_based_chunks,
+    time_based_chunks,
+)
+
+SAMPLE_RATE = 16000
+SPEECH_SECONDS = 8
+GAP_SECONDS = 3
+DEFAULT_DURATIONS = [60, 3600, 18000]
+AUDIO_CACHE_DIR = Path(tempfile.gettempdir()) / "whisperx-bench-audio"
+RESULTS_DIR = Path(__file__).parent / "bench-results"
+
+
+def synthetic_audio(duration: int) -> Path:
+    """16kHz mono WAV of tone + noise bursts separated by silence (cached)"""
+    AUDIO_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    path = AUDIO_CACHE_DIR / f"bursts_{duration}s.wav"
+    if path.exists():
+        return path
+
+    period = SPEECH_SECONDS + GAP_SECONDS
+    print(f"Generating {duration}s synthetic audio...")
+    subprocess.run([
+        'ffmpeg', '-v', 'error', '-y',
+        '-f', 'lavfi', '-i', f'sine=frequency=220:sample_rate={SAMPLE_RATE}:duration={duration}',
+        '-f', 'lavfi', '-i', f'anoisesrc=color=pink:amplitude=0.1:sample_rate={SAMPLE_RATE}:duration={duration}',
+        '-filter_complex',
+        f"[0][1]amix=inputs=2,volume='if(lt(mod(t,{period}),{SPEECH_SECONDS}),1,0)':eval=frame",
+        '-ac', '1', '-ar', str(SAMPLE_RATE), '-c:a', 'pcm_s16le', str(path)
+    ], check=True)
+    return path
+
+
+def speech_layout(duration: int) -> list:
+    """Known speech regions of synthetic_audio(), standing in for VAD output"""
+    period = SPEECH_SECONDS + GAP_SECONDS
+    return [
+        (float(start), float(min(start + SPEECH_SECONDS, duration)))
+        for start in range(0, duration, period)
+    ]
+
+
+def load_audio(path: Path) -> np.ndarray:
+    """Same decode as whisperx.load_audio: ffmpeg to s16le, scaled to float32"""
+    cmd = [
+        'ffmpeg', '-nostdin', '-threads', '0', '-i', str(path),
+        '-f', 's16le', '-ac', '1', '-acodec', 'pcm_s16le', '-ar', str(SAMPLE_RATE), '-'
+    ]
+    out = subprocess.run(cmd, capture_output=True, check=True).stdout
+    return np.frombuffer(out, np.int16).flatten().astype(np.float32) / 32768.0
+
+
+def run_silencedetect(path: Path, min_silence_duration: float = 2.0) -> str:
+    """ffmpeg silencedetect stderr, as FFmpegProcessor.detect_silence runs it"""
+    return subprocess.run([
+        'ffmpeg', '-i', str(path),
+        '-af', f'silencedetect=noise=-50dB:d={min_silence_duration}',
+        '-f', 'null', '-'
+    ], capture_output=True, text=True).stderr
+
+
+def boundary_error(reference: list, silences: list) -> float:
+    """Largest start/end difference in seconds between two silence lists (inf if the counts differ)"""
+    if len(reference) != len(silences):
+        return float("inf")
+    return max((max(abs(a[0] - b[0]), abs(a[1] - b[1])) for a, b in zip(reference, silences)), default=0.0)
+
+
+def synthetic_response(duration: int, chunks: int) -> dict:
+    """Response shaped like /transcribe-large output: one segment per speech burst"""
+    segments = []
+    for start, end in speech_layout(duration):
+        words = [
+            {"word": f"word{i}", "start": start + i * 0.4, "end": start + i * 0.4 + 0.3, "score": 0.9}
+            for i in range(int((end - start) / 0.4))
+        ]
+        segments.append({
+            "start": start,
+            "end": end,
+            "text": " ".join(w["word"] for w in words),
+            "words": words
+        })
+    return {
+        "filename": f"bursts_{duration}s.wav",
+        "duration": duration,
+        "language": "en",
+        "num_segments": len(segments),
+        "num_chunks": chunks,
+        "chunking_strategy": "vad",
+        "processing_time": 1.0,
+        "realtime_factor": float(duration),
+        "segments": segments
+    }
+
+
+def bench(name: str, fn, duration: int, repeat: int, warmup: int = 1, **extra) -> dict:
+    """Median/min/p95 wall time of fn over repeat calls after warmup calls"""
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    samples.sort()
+    result = {
+        "name": name,
+        "audio_seconds": duration,
+        "repeat": repeat,
+        "median_s": statistics.median(samples),
+        "min_s": samples[0],
+        "p95_s": samples[min(len(samples) - 1, int(round(0.95 * (len(samples) - 1))))],
+        **extra
+    }
+    print(f"  {name:<28} median {result['median_s'] * 1000:>10.3f} ms   "
+          f"min {result['min_s'] * 1000:>10.3f} ms   p95 {result['p95_s'] * 1000:>10.3f} ms")
+    return result
+
+
+def run_suite(duration: int, repeat: int, ffmpeg_repeat: int) -> list:
+    path = synthetic_audio(duration)
+    print(f"\n{duration}s audio ({path.stat().st_size / 1024 ** 2:.0f} MB)")
+    results = []
+
+    # silencedetect: ffmpeg pass (dominant) and parsing of its output, vs the native detector
+    stderr = run_silencedetect(path)
+    silences = parse_silencedetect(stderr)
+    subprocess_run = bench("silencedetect.ffmpeg", lambda: run_silencedetect(path), duration,
+                           ffmpeg_repeat, warmup=0)
+    results.append(subprocess_run)
+    results.append(bench("silencedetect.parse", lambda: parse_silencedetect(stderr), duration, repeat,
+                         silences=len(silences), log_bytes=len(stderr)))
+    audio = load_audio(path)
+    for name, detect in [
+        ("silencedetect.native_wav", lambda: wav_silences(str(path))),
+        ("silencedetect.native_array", lambda: find_silences(audio))
+    ]:
+        native = detect()
+        result = bench(name, detect, duration, ffmpeg_repeat, silences=len(native),
+                       max_boundary_diff_s=boundary_error(silences, native))
+        result["speedup_vs_ffmpeg"] = subprocess_run["median_s"] / result["median_s"]
+        print(f"  {'':<28} {result['speedup_vs_ffmpeg']:.1f}x vs ffmpeg, {len(native)} silences, "
+              f"max boundary difference {result['max_boundary_diff_s'] * 1000:.3f} ms")
+        results.append(result)
+
+    # Chunk creation from speech regions / silences
+    speech = speech_layout(duration)
+    vad_chunks = merge_speech_segments(speech, 30, 10)
+    results.append(bench("chunking.vad_merge", lambda: merge_speech_segments(speech, 30, 10), duration,
+                         repeat, speech_segments=len(speech), chunks=len(vad_chunks)))
+    results.append(bench("chunking.time_based", lambda: time_based_chunks(duration, 30, 10), duration,
+                         repeat, chunks=len(time_based_chunks(duration, 30, 10))))
+    results.append(bench("chunking.silence_based", lambda: silence_based_chunks(silences, duration, 60),
+                         duration, repeat, chunks=len(silence_based_chunks(silences, duration, 60))))
+
+    # Audio: one full decode vs slicing every chunk out of it
+    load = bench("audio.load_full", lambda: load_audio(path), duration, ffmpeg_repeat, warmup=0)
+    # transcribe_audio_segment decodes the whole file for every chunk
+    load["per_chunk_reload_estimate_s"] = load["median_s"] * len(vad_chunks)
+    results.append(load)
+    results.append(bench("audio.slice_chunks",
+                         lambda: [np.ascontiguousarray(c.slice(audio)) for c in vad_chunks],
+                         duration, repeat, chunks=len(vad_chunks)))
+
+    # Response rendering (FastAPI JSONResponse uses json.dumps with these options)
+    response = synthetic_response(duration, len(vad_chunks))
+    body = json.dumps(response, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+    results.append(bench("response.json", lambda: json.dumps(
+        response, ensure_ascii=False, allow_nan=False, separators=(",", ":")
+    ).encode("utf-8"), duration, repeat, segments=response["num_segments"], body_bytes=len(body)))
+
+    return results
+
+
+def ffmpeg_version() -> str:
+    try:
+        out = subprocess.run(['ffmpeg', '-version'], capture_output=True, text=True).stdout
+        return out.split('\n', 1)[0]
+    except OSError:
+        return "unknown"
+
+
+def check_regressions(results: list, baseline_path: str, max_regression: float) -> list:
+    """Benchmarks whose median grew by more than max_regression vs the baseline file"""
+    with open(baseline_path) as f:
+        baseline = {(r["name"], r["audio_seconds"]): r for r in json.load(f)["results"]}
+
+    regressions = []
+    for r in results:
+        before = baseline.get((r["name"], r["audio_seconds"]))
+        if not before or before["median_s"] <= 0:
+            continue
+        change = r["median_s"] / before["median_s"] - 1
+        if change > max_regression:
+            regressions.append({**r, "baseline_median_s": before["median_s"], "change": change})
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="WhisperX preprocessing microbenchmarks")
+    parser.add_argument("--durations", type=int, nargs='+', default=DEFAULT_DURATIONS,
+                        help="Synthetic audio lengths in seconds")
+    parser.add_argument("--repeat", type=int, default=20, help="Repetitions of in-process benchmarks")
+    parser.add_argument("--ffmpeg-repeat", type=int, default=3, help="Repetitions of ffmpeg subprocess benchmarks")
+    parser.add_argument("--json", help="Output file (default: bench-results/preprocessing-<timestamp>.json)")
+    parser.add_argument("--baseline", help="Previous result file to compare against")
+    parser.add_argument("--max-regression", type=float, default=0.25,
+                        help="Allowed median slowdown vs baseline (default: 0.25 = 25%%)")
+    args = parser.parse_args()
+
+    results = []
+    for duration in args.durations:
+        results.extend(run_suite(duration, args.repeat, args.ffmpeg_repeat))
+
+    output = Path(args.json) if args.json else RESULTS_DIR / f"preprocessing-{datetime.now():%Y%m%d-%H%M%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump({
+            "timestamp": datetime.now().isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "ffmpeg": ffmpeg_version(),
+            "results": results
+        }, f, indent=2)
+    print(f"\nResults saved to: {output}")
+
+    if args.baseline:
+        regressions = check_regressions(results, args.baseline, args.max_regression)
+        if regressions:
+            print(f"\nRegressions vs {args.baseline} (>{args.max_regression:.0%} slower):")
+            for r in regressions:
+                print(f"  {r['name']} @ {r['audio_seconds']}s: "
+                      f"{r['baseline_median_s'] * 1000:.3f} ms -> {r['median_s'] * 1000:.3f} ms ({r['change']:+.0%})")
+            sys.exit(1)
+        print(f"\nNo regressions vs {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
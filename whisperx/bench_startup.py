@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+Startup Benchmark for WhisperX
+Import cost of the server and the CLI modules, from `python -X importtime`.
+
+Each target module is imported in a fresh interpreter, several times. For
+each target it reports:
+- import_ms: cumulative import time of the module (module-level setup
+  included, e.g. the api_server backend and memory budget)
+- wall_ms: the whole subprocess, including interpreter startup
+- packages: top-level packages by self import time, to see what to defer
+- heavy: which of the model-stack packages (torch, whisperx, ...) got imported
+
+torch and whisperx must not be imported by any target: the server imports
+them on first use (backend preload during warmup), and the CLI tools only
+when they run a model. The run fails if they are (--forbid), or when a
+target's median is slower than a --baseline result by more than
+--max-regression. --serve also times `uvicorn api_server:app` until /health
+answers.
+
+The environment is passed through, so WHISPERX_BACKEND, WARMUP etc. apply.
+
+Usage:
+    python bench_startup.py
+    WHISPERX_BACKEND=synthetic python bench_startup.py --serve
+    python bench_startup.py --baseline bench-results/startup-20251020-120000.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+from collections import defaultdict
+from datetime import datetime
+from pathlib import Path
+
+HERE = Path(__file__).parent
+RESULTS_DIR = HERE / "bench-results"
+DEFAULT_TARGETS = ["api_server", "video_segmenter", "ffmpeg_processor", "autotune", "bench_preprocessing"]
+HEAVY_PACKAGES = ["torch", "torchaudio", "whisperx", "faster_whisper", "ctranslate2", "pyannote",
+                  "transformers", "requests", "uvicorn"]
+DEFAULT_FORBID = "torch,whisperx"
+
+
+def parse_importtime(stderr: str) -> list:
+    """(module, self_us, cumulative_us, depth) per `-X importtime` line"""
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        depth = (len(name) - len(name.lstrip())) // 2
+        entries.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return entries
+
+
+def measure_import(target: str) -> dict:
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {target}"],
+        cwd=HERE, capture_output=True, text=True
+    )
+    wall = time.perf_counter() - start
+    if proc.returncode != 0:
+        tail = "\n".join(proc.stderr.splitlines()[-5:])
+        raise RuntimeError(f"import {target} failed:\n{tail}")
+
+    entries = parse_importtime(proc.stderr)
+    packages = defaultdict(int)
+    for name, self_us, _, _ in entries:
+        packages[name.split(".")[0]] += self_us
+    imported = {name.split(".")[0] for name, _, _, _ in entries}
+    return {
+        # The target is the last top-level line: it finishes after all it imports
+        "import_ms": next(c for n, _, c, d in reversed(entries) if n == target and d == 0) / 1000,
+        "wall_ms": wall * 1000,
+        "packages": dict(packages),
+        "heavy": [name for name in HEAVY_PACKAGES if name in imported]
+    }
+
+
+def bench_target(target: str, repeat: int, top: int) -> dict:
+    runs = [measure_import(target) for _ in range(repeat)]
+    # Per-package times from the median run, so they add up to its import_ms
+    median_run = sorted(runs, key=lambda r: r["import_ms"])[len(runs) // 2]
+    packages = sorted(median_run["packages"].items(), key=lambda kv: -kv[1])[:top]
+    return {
+        "name": target,
+        "repeat": repeat,
+        "median_ms": statistics.median(r["import_ms"] for r in runs),
+        "min_ms": min(r["import_ms"] for r in runs),
+        "wall_median_ms": statistics.median(r["wall_ms"] for r in runs),
+        "heavy": median_run["heavy"],
+        "packages": [{"package": name, "self_ms": us / 1000} for name, us in packages]
+    }
+
+
+def bench_serve(port: int, timeout: float) -> dict:
+    """Seconds from launching uvicorn until /health answers, and /ready (if it does in time)"""
+    url = f"http://127.0.0.1:{port}"
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "api_server:app", "--port", str(port), "--log-level", "warning"],
+        cwd=HERE, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    times = {}
+    try:
+        while time.perf_counter() - start < timeout and len(times) < 2:
+            if proc.poll() is not None:
+                raise RuntimeError(f"Server exited with code {proc.returncode}")
+            for endpoint in ("health", "ready"):
+                if endpoint in times:
+                    continue
+                try:
+                    with urllib.request.urlopen(f"{url}/{endpoint}", timeout=1):
+                        times[endpoint] = time.perf_counter() - start
+                except OSError:
+                    pass
+            time.sleep(0.05)
+    finally:
+        proc.terminate()
+        proc.wait(timeout=30)
+    return {f"{endpoint}_s": round(seconds, 3) for endpoint, seconds in times.items()}
+
+
+def check_regressions(results: list, baseline_path: str, max_regression: float) -> list:
+    """Targets whose median import time grew by more than max_regression vs the baseline file"""
+    with open(baseline_path) as f:
+        baseline = {r["name"]: r for r in json.load(f)["results"]}
+
+    regressions = []
+    for r in results:
+        before = baseline.get(r["name"])
+        if not before or before["median_ms"] <= 0:
+            continue
+        change = r["median_ms"] / before["median_ms"] - 1
+        if change > max_regression:
+            regressions.append({**r, "baseline_median_ms": before["median_ms"], "change": change})
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="WhisperX import-time startup benchmark")
+    parser.add_argument("--targets", nargs='+', default=DEFAULT_TARGETS, help="Modules to import")
+    parser.add_argument("--repeat", type=int, default=5, help="Fresh interpreters per target")
+    parser.add_argument("--top", type=int, default=8, help="Packages to list per target")
+    parser.add_argument("--forbid", default=DEFAULT_FORBID,
+                        help=f"Comma-separated packages no target may import (default: {DEFAULT_FORBID})")
+    parser.add_argument("--serve", action="store_true", help="Also time uvicorn startup until /health")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--serve-timeout", type=float, default=120)
+    parser.add_argument("--json", help="Output file (default: bench-results/startup-<timestamp>.json)")
+    parser.add_argument("--baseline", help="Previous result file to compare against")
+    parser.add_argument("--max-regression", type=float, default=0.25,
+                        help="Allowed median slowdown vs baseline (default: 0.25 = 25%%)")
+    args = parser.parse_args()
+
+    results = []
+    for target in args.targets:
+        r = bench_target(target, args.repeat, args.top)
+        results.append(r)
+        heavy = ", ".join(r["heavy"]) or "none"
+        print(f"{target}: {r['median_ms']:.0f} ms import (min {r['min_ms']:.0f}), "
+              f"{r['wall_median_ms']:.0f} ms process; heavy: {heavy}")
+        for p in r["packages"]:
+            print(f"    {p['package']:<24} {p['self_ms']:>8.1f} ms")
+
+    serve = None
+    if args.serve:
+        serve = bench_serve(args.port, args.serve_timeout)
+        print("\nuvicorn api_server:app: " + ", ".join(f"{k[:-2]} after {v:.2f}s" for k, v in serve.items()))
+
+    output = Path(args.json) if args.json else RESULTS_DIR / f"startup-{datetime.now():%Y%m%d-%H%M%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump({
+            "timestamp": datetime.now().isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "backend": os.getenv("WHISPERX_BACKEND", "whisperx"),
+            "results": results,
+            "serve": serve
+        }, f, indent=2)
+    print(f"\nResults saved to: {output}")
+
+    failed = False
+    forbidden = [name for name in args.forbid.split(",") if name]
+    for r in results:
+        leaked = [name for name in r["heavy"] if name in forbidden]
+        if leaked:
+            print(f"\n{r['name']} imports {', '.join(leaked)} at import time")
+            failed = True
+
+    if args.baseline:
+        regressions = check_regressions(results, args.baseline, args.max_regression)
+        if regressions:
+            print(f"\nRegressions vs {args.baseline} (>{args.max_regression:.0%} slower):")
+            for r in regressions:
+                print(f"  {r['name']}: {r['baseline_median_ms']:.0f} ms -> {r['median_ms']:.0f} ms ({r['change']:+.0%})")
+            failed = True
+        else:
+            print(f"\nNo regressions vs {args.baseline}")
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
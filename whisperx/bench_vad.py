@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+Silero VAD Backend Benchmark for WhisperX
+TorchScript (torch) vs ONNX Runtime (onnx) speech detection on long audio.
+
+For each backend it loads the model the way the server does (local
+silero-vad checkout first, see video_segmenter.py) and times
+detect_speech_segments() on each audio file. Decoding is included and is the
+same for both backends. It reports:
+- load_s: model load
+- median_s / realtime: detection time and audio seconds per second
+- speech_s / segments: detected speech
+- agreement: speech time both backends agree on, over the union of both
+  (1.0 = identical), against the first backend
+
+--workers N... adds a scaling run for the first backend: sharded VAD
+(parallel_vad.py) with each worker count against the single pass, with the
+speedup and the agreement with the single pass. The run fails when an
+agreement is below --min-agreement. Files need at least 2 x
+VAD_SHARD_MIN_SECONDS (default 300s) of audio to be sharded.
+
+--prevad adds a run of the first backend with and without the energy gate
+(EnergyGate in video_segmenter.py, tuned with the PREVAD_* variables). It
+reports the fraction of audio skipped, the measured and the estimated time
+saved, and the agreement with ungated VAD.
+
+Without --audio it uses synthetic tone/noise bursts (bench_preprocessing.py).
+Silero may classify those as speech or not, so use real speech for the
+agreement figure. Timings do not depend on the content.
+
+Usage:
+    python bench_vad.py
+    python bench_vad.py --audio interview.wav --repeat 5
+    python bench_vad.py --backends onnx --durations 3600 --workers 2 4 8 16
+    PREVAD_ENERGY_DB=-45 python bench_vad.py --backends onnx --audio lecture.wav --prevad
+    SILERO_VAD_PATH=/data/.torch/hub/snakers4_silero-vad_master python bench_vad.py --durations 3600
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+from bench_preprocessing import synthetic_audio
+from video_segmenter import VideoSegmenter
+
+RESULTS_DIR = Path(__file__).parent / "bench-results"
+DEFAULT_DURATIONS = [600, 3600]
+
+
+def speech_seconds(segments: list) -> float:
+    return sum(end - start for start, end in segments)
+
+
+def agreement(a: list, b: list) -> float:
+    """Intersection over union of the speech time in two sorted segment lists"""
+    overlap = 0.0
+    i = j = 0
+    while i < len(a) and j < len(b):
+        overlap += max(0.0, min(a[i][1], b[j][1]) - max(a[i][0], b[j][0]))
+        if a[i][1] < b[j][1]:
+            i += 1
+        else:
+            j += 1
+    union = speech_seconds(a) + speech_seconds(b) - overlap
+    return overlap / union if union > 0 else 1.0
+
+
+def audio_duration(path: Path) -> float:
+    import torchaudio
+    info = torchaudio.info(str(path))
+    return info.num_frames / info.sample_rate
+
+
+def bench_backend(backend: str, files: list, repeat: int, workers: int = 0, prevad: bool = False) -> dict:
+    segmenter = VideoSegmenter(vad_backend=backend, vad_workers=workers, prevad=prevad)
+    start = time.perf_counter()
+    segmenter.load_vad_model()
+    load_s = time.perf_counter() - start
+    if segmenter.vad_model is None:
+        return {"backend": backend, "error": "VAD model could not be loaded (see log)"}
+    if segmenter.vad_backend != backend:
+        return {"backend": backend, "error": f"fell back to {segmenter.vad_backend}"}
+
+    runs = []
+    for path, duration in files:
+        if workers > 1:
+            # Start the worker processes and load their models outside the timing
+            segmenter.detect_speech_segments(str(path))
+        times = []
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            segments = segmenter.detect_speech_segments(str(path))
+            times.append(time.perf_counter() - t0)
+        median = statistics.median(times)
+        runs.append({
+            "audio": path.name,
+            "audio_seconds": round(duration, 2),
+            "median_s": round(median, 4),
+            "min_s": round(min(times), 4),
+            "realtime": round(duration / median, 1),
+            "segments": len(segments),
+            "speech_s": round(speech_seconds(segments), 2),
+            "vad_report": segmenter.last_vad_report,
+            "_segments": segments
+        })
+    segmenter.shutdown()
+    return {
+        "backend": backend,
+        "workers": workers,
+        "prevad": prevad,
+        "source": segmenter.vad_source,
+        "load_s": round(load_s, 3),
+        "runs": runs
+    }
+
+
+def bench_scaling(backend: str, files: list, repeat: int, worker_counts: list) -> list:
+    """Sharded VAD per worker count, against the single pass (workers=0)"""
+    results = [bench_backend(backend, files, repeat, workers) for workers in [0] + worker_counts]
+    if any("error" in r for r in results):
+        return results
+    print(f"\nScaling ({backend})")
+    for r in results:
+        for run, single in zip(r["runs"], results[0]["runs"]):
+            run["speedup"] = round(single["median_s"] / run["median_s"], 2)
+            run["agreement"] = round(agreement(run["_segments"], single["_segments"]), 4)
+            print(f"  {run['audio']:<28} {r['workers'] or 'single':>6} workers  {run['median_s']:>8.2f}s  "
+                  f"{run['speedup']:>5.2f}x speedup  {run['segments']:>5} segments  "
+                  f"agreement {run['agreement']:.4f}")
+    return results
+
+
+def bench_prevad(backend: str, files: list, repeat: int) -> list:
+    """The same backend without and with the pre-VAD energy gate"""
+    results = [bench_backend(backend, files, repeat, prevad=prevad) for prevad in (False, True)]
+    if any("error" in r for r in results):
+        return results
+    print(f"\nPre-VAD energy gate ({backend})")
+    for run, ungated in zip(results[1]["runs"], results[0]["runs"]):
+        report = run["vad_report"]
+        run["saved_s"] = round(ungated["median_s"] - run["median_s"], 3)
+        run["agreement"] = round(agreement(run["_segments"], ungated["_segments"]), 4)
+        estimated = report["estimated_saved_seconds"]
+        print(f"  {run['audio']:<28} skipped {report['skipped_fraction']:>6.1%}  "
+              f"{ungated['median_s']:>8.2f}s -> {run['median_s']:>8.2f}s  saved {run['saved_s']:>7.2f}s "
+              f"(estimated {estimated if estimated is not None else float('nan'):.2f}s)  "
+              f"gate {report['gate_seconds'] * 1000:.0f} ms  agreement {run['agreement']:.4f}")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Silero VAD torch vs ONNX benchmark")
+    parser.add_argument("--audio", nargs='+', help="Audio files (default: synthetic audio of --durations)")
+    parser.add_argument("--durations", type=int, nargs='+', default=DEFAULT_DURATIONS,
+                        help="Synthetic audio lengths in seconds")
+    parser.add_argument("--backends", nargs='+', default=["torch", "onnx"], choices=["torch", "onnx"])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--workers", type=int, nargs='+', help="Sharded VAD worker counts to compare")
+    parser.add_argument("--prevad", action="store_true", help="Compare with and without the energy gate")
+    parser.add_argument("--min-agreement", type=float, default=0.99,
+                        help="Lowest sharded/single-pass agreement accepted (default: 0.99)")
+    parser.add_argument("--json", help="Output file (default: bench-results/vad-<timestamp>.json)")
+    args = parser.parse_args()
+
+    paths = [Path(p) for p in args.audio] if args.audio else [synthetic_audio(d) for d in args.durations]
+    files = [(path, audio_duration(path)) for path in paths]
+
+    results = [bench_backend(backend, files, args.repeat) for backend in args.backends]
+    reference = next((r for r in results if "runs" in r), None)
+    for r in results:
+        if "error" in r:
+            print(f"\n{r['backend']}: {r['error']}")
+            continue
+        print(f"\n{r['backend']} (loaded in {r['load_s']:.2f}s from {r['source']})")
+        for run, ref_run in zip(r["runs"], reference["runs"]):
+            run["agreement"] = round(agreement(run["_segments"], ref_run["_segments"]), 4)
+            print(f"  {run['audio']:<28} {run['audio_seconds']:>8.0f}s audio  {run['median_s']:>8.2f}s  "
+                  f"{run['realtime']:>7.1f}x realtime  {run['segments']:>5} segments  "
+                  f"agreement {run['agreement']:.3f}")
+
+    scaling = bench_scaling(args.backends[0], files, args.repeat, args.workers) if args.workers else []
+    failed = [
+        (r["workers"], run) for r in scaling for run in r.get("runs", [])
+        if run.get("agreement", 1.0) < args.min_agreement
+    ]
+    prevad = bench_prevad(args.backends[0], files, args.repeat) if args.prevad else []
+
+    for r in results + scaling + prevad:
+        for run in r.get("runs", []):
+            del run["_segments"]
+
+    output = Path(args.json) if args.json else RESULTS_DIR / f"vad-{datetime.now():%Y%m%d-%H%M%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump({
+            "timestamp": datetime.now().isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "results": results,
+            "scaling": scaling,
+            "prevad": prevad
+        }, f, indent=2)
+    print(f"\nResults saved to: {output}")
+
+    if failed:
+        print(f"\nSharded VAD below {args.min_agreement} agreement with the single pass:")
+        for workers, run in failed:
+            print(f"  {run['audio']} with {workers} workers: {run['agreement']:.4f}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Worker Scaling Benchmark for the WhisperX API Server
+Measures throughput from in-process serving up to N worker processes.
+
+For each worker count a server is started on a local port with the
+synthetic backend (CPU-bound by default, so the stages hold the GIL like
+CPU inference), warmed up with one request per worker, and loaded by
+bench_load's closed-loop generator at a fixed concurrency. Reports
+throughput, latency and scaling efficiency relative to the first level.
+
+Usage:
+    python bench_workers.py --workers 0 1 2 4 --duration 60
+    python bench_workers.py --workers 1 2 4 8 --concurrency 16 --sleep-backend
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+import requests
+
+from bench_load import LoadGenerator, load_payloads, metric_deltas, parse_mix, scrape, summarize
+
+RESULTS_DIR = Path(__file__).parent / "bench-results"
+STARTUP_TIMEOUT = 120
+
+
+def start_server(workers: int, port: int, cpu_bound: bool, log_path: Path) -> subprocess.Popen:
+    env = {
+        **os.environ,
+        "WHISPERX_WORKERS": str(workers),
+        "WHISPERX_BACKEND": "synthetic",
+        "SYNTHETIC_CPU_BOUND": "true" if cpu_bound else "false"
+    }
+    log = open(log_path, "w")
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "api_server:app", "--port", str(port), "--log-level", "warning"],
+        cwd=Path(__file__).parent, env=env, stdout=log, stderr=subprocess.STDOUT
+    )
+
+
+def wait_ready(url: str, server: subprocess.Popen):
+    deadline = time.monotonic() + STARTUP_TIMEOUT
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"Server exited with code {server.returncode}")
+        try:
+            if requests.get(f"{url}/health", timeout=2).ok:
+                return
+        except requests.RequestException:
+            pass
+        time.sleep(0.5)
+    raise RuntimeError(f"Server not ready after {STARTUP_TIMEOUT}s")
+
+
+def stop_server(server: subprocess.Popen):
+    server.terminate()
+    try:
+        server.wait(timeout=30)
+    except subprocess.TimeoutExpired:
+        server.kill()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="WhisperX worker scaling benchmark")
+    parser.add_argument("--workers", type=int, nargs='+', default=[0, 1, 2, 4],
+                        help="Worker counts to test (0 = in-process)")
+    parser.add_argument("--concurrency", type=int, help="Closed-loop clients (default: 2 x max workers)")
+    parser.add_argument("--duration", type=float, default=60, help="Measured seconds per level")
+    parser.add_argument("--mix", default="transcribe-large=1", help="Endpoint weights, as in bench_load.py")
+    parser.add_argument("--audio-lengths", type=int, nargs='+', default=[60])
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--sleep-backend", action="store_true",
+                        help="Synthetic stages sleep instead of burning CPU (GPU-like)")
+    parser.add_argument("--json", help="Output file (default: bench-results/workers-<timestamp>.json)")
+    args = parser.parse_args()
+
+    concurrency = args.concurrency or 2 * max(1, max(args.workers))
+    mix = parse_mix(args.mix)
+    payloads = load_payloads(args.audio_lengths, mix)
+    form = {"enable_diarization": "false", "model": "tiny"}
+    url = f"http://127.0.0.1:{args.port}"
+    RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+
+    levels = []
+    for workers in args.workers:
+        print(f"\n== {workers or 'in-process'} worker(s), {concurrency} clients ==")
+        server = start_server(workers, args.port, not args.sleep_backend, RESULTS_DIR / f"workers-{workers}.log")
+        try:
+            wait_ready(url, server)
+            generator = LoadGenerator(url, mix, payloads, form, timeout=3600, seed=1234)
+            # One request per worker first, so process spawn and imports are not measured
+            generator.closed_loop(max(1, workers), duration=STARTUP_TIMEOUT, max_requests=max(1, workers))
+
+            session = requests.Session()
+            before = scrape(session, url)
+            start = time.perf_counter()
+            records = generator.closed_loop(concurrency, args.duration)
+            summary = summarize(records, time.perf_counter() - start)
+            summary["server"] = metric_deltas(before, scrape(session, url))
+        finally:
+            stop_server(server)
+
+        lat = summary["latency_s"]
+        print(f"  {summary['throughput_rps']:.2f} req/s, {summary['audio_throughput']:.1f}x realtime, "
+              f"p50 {lat.get('p50', 0):.2f}s, p95 {lat.get('p95', 0):.2f}s, error rate {summary['error_rate']:.1%}")
+        levels.append({"workers": workers, "concurrency": concurrency, **summary})
+
+    base = levels[0]["throughput_rps"]
+    print(f"\n{'workers':>10} {'req/s':>8} {'x realtime':>11} {'p50 s':>8} {'p95 s':>8} {'speedup':>8} {'efficiency':>11}")
+    for level in levels:
+        speedup = level["throughput_rps"] / base if base else 0.0
+        level["speedup"] = speedup
+        level["efficiency"] = speedup / max(1, level["workers"]) * max(1, levels[0]["workers"])
+        lat = level["latency_s"]
+        print(f"{level['workers'] or 'in-proc':>10} {level['throughput_rps']:>8.2f} {level['audio_throughput']:>11.1f} "
+              f"{lat.get('p50', 0):>8.2f} {lat.get('p95', 0):>8.2f} {speedup:>7.2f}x {level['efficiency']:>10.0%}")
+
+    output = Path(args.json) if args.json else RESULTS_DIR / f"workers-{datetime.now():%Y%m%d-%H%M%S}.json"
+    with open(output, 'w') as f:
+        json.dump({
+            "timestamp": datetime.now().isoformat(),
+            "cpu_count": os.cpu_count(),
+            "cpu_bound": not args.sleep_backend,
+            "mix": mix,
+            "audio_lengths": args.audio_lengths,
+            "duration": args.duration,
+            "levels": levels
+        }, f, indent=2)
+    print(f"\nResults saved to: {output}")
+
+
+if __name__ == "__main__":
+    main()
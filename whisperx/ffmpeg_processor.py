@@ -2,17 +2,235 @@
 FFmpeg Video Processor for WhisperX
 Optimized for speech recognition with RTX 5090 hardware acceleration (9th-gen NVENC/NVDEC)
 Based on 2025 best practices for audio extraction and enhancement
+
+ffmpeg's hardware acceleration methods and encoders are probed once per
+process (probe_capabilities). Audio extraction never uses -hwaccel: with
+-vn nothing is decoded on the GPU, so it would only add CUDA setup time (or
+fail on hosts without a GPU). Video operations use NVDEC/NVENC when both the
+processor and the ffmpeg build allow it, and fall back to software decoding
+and libx264 if the hardware path fails.
+
+Silence detection runs natively on PCM (SilenceDetector) with the semantics
+of ffmpeg's silencedetect filter. 16-bit PCM WAV files (what
+extract_audio_optimized writes) are read directly; other inputs, or
+SILENCE_DETECTOR=ffmpeg, use an ffmpeg silencedetect pass.
 """
 
 import subprocess
 import os
 import logging
+import threading
+import wave
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict
+from typing import Dict, FrozenSet, List, Optional, Tuple
 import json
 
+import numpy as np
+
+from tracing import span
+
 logger = logging.getLogger(__name__)
 
+SILENCE_DETECTOR = os.getenv("SILENCE_DETECTOR", "native")  # native or ffmpeg
+SILENCE_BLOCK_FRAMES = 1 << 20
+
+# Probed once per process, see probe_capabilities()
+_capabilities = None
+_capabilities_lock = threading.Lock()
+
+
+def parse_silencedetect(output: str) -> list:
+    """
+    Parse ffmpeg silencedetect log output.
+
+    Args:
+        output: ffmpeg stderr containing silence_start / silence_end lines
+
+    Returns:
+        List of silence periods as (start, end) tuples
+    """
+    silences = []
+    silence_start = None
+    for line in output.split('\n'):
+        if 'silence_start' in line:
+            parts = line.split('silence_start: ')
+            if len(parts) > 1:
+                silence_start = float(parts[1].strip())
+        elif 'silence_end' in line and silence_start is not None:
+            parts = line.split('silence_end: ')
+            if len(parts) > 1:
+                silence_end_str = parts[1].split('|')[0].strip()
+                silence_end = float(silence_end_str)
+                silences.append((silence_start, silence_end))
+                silence_start = None
+    return silences
+
+
+def noise_amplitude(threshold: str) -> float:
+    """silencedetect noise option as an amplitude ratio: '-50dB' or '0.003'"""
+    threshold = str(threshold).strip()
+    if threshold.lower().endswith('db'):
+        return 10 ** (float(threshold[:-2]) / 20)
+    return float(threshold)
+
+
+class SilenceDetector:
+    """
+    ffmpeg silencedetect on PCM, fed block by block.
+
+    Same semantics as the filter (default, non-mono mode): a frame is silent
+    when every channel's sample is strictly within +/- noise, int16 samples
+    are compared against int(noise * 32767) like ffmpeg does, and a silence
+    is a run of at least min_duration seconds of silent frames. It starts at
+    its first silent frame and ends at the next non-silent one, or at the
+    end of the audio. Runs are found with vectorized edge detection, so the
+    cost is a few passes over each block.
+    """
+
+    def __init__(self, sample_rate: int, noise: float = 0.001, min_duration: float = 2.0):
+        self.sample_rate = sample_rate
+        self.noise = noise
+        self.min_frames = max(1, round(min_duration * sample_rate))
+        self.position = 0
+        self._run_start = None  # First frame of the silent run still open at the end of the last block
+        self._starts = []
+        self._ends = []
+
+    def silent_frames(self, block: np.ndarray) -> np.ndarray:
+        noise = int(self.noise * 32767) if block.dtype == np.int16 else self.noise
+        # Not abs(): -32768 has no int16 absolute value
+        silent = (block < noise) & (block > -noise)
+        return silent.all(axis=1) if silent.ndim > 1 else silent
+
+    def feed(self, block: np.ndarray):
+        """Next frames: 1-D mono or (frames, channels)"""
+        silent = self.silent_frames(block)
+        flags = np.empty(len(silent) + 1, dtype=bool)
+        flags[0] = self._run_start is not None
+        flags[1:] = silent
+        changes = np.flatnonzero(flags[1:] != flags[:-1])
+        starts = changes[silent[changes]] + self.position
+        ends = changes[~silent[changes]] + self.position
+        if self._run_start is not None:
+            starts = np.concatenate(([self._run_start], starts))
+        # Runs alternate with non-silence, so a run is open iff it has no end yet
+        self._run_start = int(starts[-1]) if len(starts) > len(ends) else None
+        starts = starts[:len(ends)]
+        keep = ends - starts >= self.min_frames
+        self._starts.append(starts[keep])
+        self._ends.append(ends[keep])
+        self.position += len(silent)
+
+    def finish(self) -> List[Tuple[float, float]]:
+        """Silence periods as (start, end) seconds, like parse_silencedetect()"""
+        starts = np.concatenate(self._starts or [np.empty(0, dtype=np.int64)])
+        ends = np.concatenate(self._ends or [np.empty(0, dtype=np.int64)])
+        silences = [
+            (start / self.sample_rate, end / self.sample_rate)
+            for start, end in zip(starts.tolist(), ends.tolist())
+        ]
+        if self._run_start is not None and self.position - self._run_start >= self.min_frames:
+            silences.append((self._run_start / self.sample_rate, self.position / self.sample_rate))
+        return silences
+
+
+def find_silences(
+    audio: np.ndarray,
+    sample_rate: int = 16000,
+    min_silence_duration: float = 2.0,
+    silence_threshold: str = '-50dB'
+) -> List[Tuple[float, float]]:
+    """
+    Silence periods in decoded audio, as ffmpeg silencedetect reports them.
+
+    Args:
+        audio: int16 or float samples, 1-D mono or (frames, channels)
+        sample_rate: Sample rate of audio
+        min_silence_duration: Minimum silence duration in seconds
+        silence_threshold: Silence threshold (e.g., '-50dB')
+
+    Returns:
+        List of silence periods as (start, end) tuples
+    """
+    detector = SilenceDetector(sample_rate, noise_amplitude(silence_threshold), min_silence_duration)
+    for first in range(0, len(audio), SILENCE_BLOCK_FRAMES):
+        detector.feed(audio[first:first + SILENCE_BLOCK_FRAMES])
+    return detector.finish()
+
+
+def wav_silences(
+    path: str,
+    min_silence_duration: float = 2.0,
+    silence_threshold: str = '-50dB'
+) -> Optional[List[Tuple[float, float]]]:
+    """find_silences() streamed from a 16-bit PCM WAV, or None for any other file"""
+    try:
+        with wave.open(path, 'rb') as f:
+            if f.getsampwidth() != 2:
+                return None
+            channels = f.getnchannels()
+            detector = SilenceDetector(f.getframerate(), noise_amplitude(silence_threshold), min_silence_duration)
+            while True:
+                frames = f.readframes(SILENCE_BLOCK_FRAMES)
+                # A truncated file can end mid-frame; ffmpeg drops the partial frame too
+                frames = frames[:len(frames) - len(frames) % (2 * channels)]
+                if not frames:
+                    break
+                detector.feed(np.frombuffer(frames, dtype='<i2').reshape(-1, channels))
+    except (wave.Error, EOFError, OSError):
+        return None
+    return detector.finish()
+
+
+@dataclass(frozen=True)
+class FFmpegCapabilities:
+    """What the installed ffmpeg was built with (not whether a GPU is present)"""
+    version: str
+    hwaccels: FrozenSet[str]
+    encoders: FrozenSet[str]
+
+
+def parse_hwaccels(output: str) -> FrozenSet[str]:
+    """Method names from `ffmpeg -hwaccels`"""
+    _, _, methods = output.partition('Hardware acceleration methods:')
+    return frozenset(line.strip() for line in methods.split('\n') if line.strip())
+
+
+def parse_encoders(output: str) -> FrozenSet[str]:
+    """Encoder names from `ffmpeg -encoders` (the second column after the legend)"""
+    _, _, table = output.partition(' ------')
+    return frozenset(line.split()[1] for line in table.split('\n') if len(line.split()) > 1)
+
+
+def _ffmpeg_output(*args: str) -> str:
+    return subprocess.run(['ffmpeg', '-hide_banner', *args], capture_output=True, text=True, check=True).stdout
+
+
+def probe_capabilities() -> FFmpegCapabilities:
+    """
+    Version, hwaccels and encoders of ffmpeg, probed on first use and cached.
+
+    Raises RuntimeError if ffmpeg is missing or broken (not cached, so a
+    later call probes again).
+    """
+    global _capabilities
+    with _capabilities_lock:
+        if _capabilities is None:
+            try:
+                with span("ffmpeg.probe"):
+                    version = _ffmpeg_output('-version').split('\n', 1)[0]
+                    hwaccels = parse_hwaccels(_ffmpeg_output('-hwaccels'))
+                    encoders = parse_encoders(_ffmpeg_output('-encoders'))
+            except (OSError, subprocess.CalledProcessError) as e:
+                logger.error(f"FFmpeg verification failed: {e}")
+                raise RuntimeError("FFmpeg not found or not working")
+            _capabilities = FFmpegCapabilities(version, hwaccels, encoders)
+            h264 = sorted(name for name in encoders if '264' in name)
+            logger.info(f"FFmpeg verified: {version}; hwaccels: {', '.join(sorted(hwaccels)) or 'none'}; "
+                        f"H.264 encoders: {', '.join(h264) or 'none'}")
+        return _capabilities
+
 
 class FFmpegProcessor:
     """
@@ -20,7 +238,7 @@ class FFmpegProcessor:
 
     Features:
     - Speech-optimized audio extraction (16kHz mono)
-    - Hardware acceleration (9th-gen NVENC/NVDEC for RTX 5090)
+    - Hardware acceleration for video (9th-gen NVENC/NVDEC for RTX 5090), when available
     - Speech enhancement filters
     - Memory-efficient streaming
     - Metadata extraction
@@ -31,26 +249,28 @@ class FFmpegProcessor:
         Initialize FFmpeg processor.
 
         Args:
-            use_hw_accel: Enable NVIDIA hardware acceleration
+            use_hw_accel: Enable NVIDIA hardware acceleration (video operations only)
             enhance_speech: Apply speech enhancement filters
         """
         self.use_hw_accel = use_hw_accel
         self.enhance_speech = enhance_speech
-        self._verify_ffmpeg()
-
-    def _verify_ffmpeg(self):
-        """Verify FFmpeg is installed and accessible."""
-        try:
-            subprocess.run(
-                ['ffmpeg', '-version'],
-                capture_output=True,
-                text=True,
-                check=True
-            )
-            logger.info("FFmpeg verified successfully")
-        except subprocess.CalledProcessError as e:
-            logger.error(f"FFmpeg verification failed: {e}")
-            raise RuntimeError("FFmpeg not found or not working")
+        self.capabilities = probe_capabilities()
+        # Set once a hardware run failed (e.g. no GPU or driver); later runs use software
+        self.hardware_failed = False
+
+    @property
+    def video_hwaccel(self) -> Optional[str]:
+        """Hardware video decoder to use (-hwaccel), or None for software decoding"""
+        if self.use_hw_accel and not self.hardware_failed and 'cuda' in self.capabilities.hwaccels:
+            return 'cuda'
+        return None
+
+    @property
+    def h264_encoder(self) -> str:
+        """h264_nvenc when hardware is enabled and ffmpeg has it, else libx264"""
+        if self.use_hw_accel and not self.hardware_failed and 'h264_nvenc' in self.capabilities.encoders:
+            return 'h264_nvenc'
+        return 'libx264'
 
     def get_video_info(self, video_path: str) -> Dict:
         """
@@ -72,7 +292,8 @@ class FFmpegProcessor:
         ]
 
         try:
-            result = subprocess.run(cmd, capture_output=True, text=True, check=True)
+            with span("ffprobe"):
+                result = subprocess.run(cmd, capture_output=True, text=True, check=True)
             metadata = json.loads(result.stdout)
 
             # Extract useful info
@@ -129,13 +350,42 @@ class FFmpegProcessor:
             Path to extracted audio file
         """
         logger.info(f"Extracting audio from {video_path}")
+        cmd = self.extract_audio_command(video_path, output_path, sample_rate, channels, codec)
+
+        try:
+            with span("ffmpeg.extract_audio", enhance=self.enhance_speech):
+                subprocess.run(
+                    cmd,
+                    capture_output=True,
+                    text=True,
+                    check=True
+                )
+            logger.info(f"Audio extracted successfully to {output_path}")
+            return output_path
+        except subprocess.CalledProcessError as e:
+            logger.error(f"FFmpeg extraction failed: {e.stderr}")
+            raise RuntimeError(f"Audio extraction failed: {e.stderr}")
+
+    def extract_audio_command(
+        self,
+        video_path: str,
+        output_path: str,
+        sample_rate: int = 16000,
+        channels: int = 1,
+        codec: str = 'pcm_s16le',
+        hwaccel: Optional[str] = None
+    ) -> list:
+        """
+        FFmpeg command of extract_audio_optimized.
 
-        # Build FFmpeg command
+        hwaccel is only for comparing timings (bench_ffmpeg.py): with -vn no
+        video is decoded, so a hardware decoder only adds setup time.
+        """
         cmd = ['ffmpeg']
 
         # Hardware acceleration for decoding (must come BEFORE input file)
-        if self.use_hw_accel:
-            cmd.extend(['-hwaccel', 'cuda'])
+        if hwaccel:
+            cmd.extend(['-hwaccel', hwaccel])
 
         # Add input file
         cmd.extend(['-i', video_path])
@@ -166,19 +416,7 @@ class FFmpegProcessor:
             '-y',  # Overwrite output file
             output_path
         ])
-
-        try:
-            subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                check=True
-            )
-            logger.info(f"Audio extracted successfully to {output_path}")
-            return output_path
-        except subprocess.CalledProcessError as e:
-            logger.error(f"FFmpeg extraction failed: {e.stderr}")
-            raise RuntimeError(f"Audio extraction failed: {e.stderr}")
+        return cmd
 
     def detect_silence(
         self,
@@ -189,6 +427,9 @@ class FFmpegProcessor:
         """
         Detect silence periods in audio for intelligent segmentation.
 
+        16-bit PCM WAV files are scanned natively (wav_silences), without
+        decoding them again through ffmpeg.
+
         Args:
             audio_path: Path to audio file
             min_silence_duration: Minimum silence duration in seconds
@@ -197,6 +438,13 @@ class FFmpegProcessor:
         Returns:
             List of silence periods as (start, end) tuples
         """
+        if SILENCE_DETECTOR == 'native':
+            with span("silencedetect.native"):
+                silences = wav_silences(audio_path, min_silence_duration, silence_threshold)
+            if silences is not None:
+                logger.info(f"Detected {len(silences)} silence periods")
+                return silences
+
         cmd = [
             'ffmpeg',
             '-i', audio_path,
@@ -206,25 +454,10 @@ class FFmpegProcessor:
         ]
 
         try:
-            result = subprocess.run(cmd, capture_output=True, text=True)
-
-            # Parse silence detection output
-            silences = []
-            lines = result.stderr.split('\n')
-
-            silence_start = None
-            for line in lines:
-                if 'silence_start' in line:
-                    parts = line.split('silence_start: ')
-                    if len(parts) > 1:
-                        silence_start = float(parts[1].strip())
-                elif 'silence_end' in line and silence_start is not None:
-                    parts = line.split('silence_end: ')
-                    if len(parts) > 1:
-                        silence_end_str = parts[1].split('|')[0].strip()
-                        silence_end = float(silence_end_str)
-                        silences.append((silence_start, silence_end))
-                        silence_start = None
+            with span("ffmpeg.silencedetect"):
+                result = subprocess.run(cmd, capture_output=True, text=True)
+
+            silences = parse_silencedetect(result.stderr)
 
             logger.info(f"Detected {len(silences)} silence periods")
             return silences
@@ -297,7 +530,11 @@ class FFmpegProcessor:
         use_hw_accel: bool = True
     ) -> str:
         """
-        Burn subtitles into video using NVENC hardware acceleration.
+        Burn subtitles into video, with NVDEC/NVENC hardware acceleration when available.
+
+        If the hardware run fails (e.g. the build has NVENC but the host has
+        no usable GPU), it is retried with software decoding and libx264, and
+        this processor uses software from then on.
 
         Args:
             video_path: Input video file
@@ -305,21 +542,70 @@ class FFmpegProcessor:
             output_path: Output video file
             font_size: Subtitle font size
             font_color: Subtitle color
-            use_hw_accel: Use NVENC for encoding
+            use_hw_accel: Use NVDEC/NVENC if the processor allows it
 
         Returns:
             Path to output video
         """
         logger.info(f"Burning subtitles into {video_path}")
+        hwaccel = self.video_hwaccel if use_hw_accel else None
+        encoder = self.h264_encoder if use_hw_accel else 'libx264'
 
+        try:
+            if hwaccel or encoder != 'libx264':
+                try:
+                    return self._burn_subtitles(
+                        video_path, subtitle_path, output_path, font_size, font_color, encoder, hwaccel
+                    )
+                except subprocess.CalledProcessError as e:
+                    reason = (e.stderr or '').strip().splitlines()
+                    logger.warning(f"Hardware subtitle burning failed ({reason[-1] if reason else e}), "
+                                   f"retrying with libx264")
+                    self.hardware_failed = True
+            return self._burn_subtitles(video_path, subtitle_path, output_path, font_size, font_color)
+        except subprocess.CalledProcessError as e:
+            logger.error(f"Subtitle burning failed: {e.stderr}")
+            raise RuntimeError(f"Failed to burn subtitles: {e.stderr}")
+
+    def _burn_subtitles(
+        self,
+        video_path: str,
+        subtitle_path: str,
+        output_path: str,
+        font_size: int,
+        font_color: str,
+        encoder: str = 'libx264',
+        hwaccel: Optional[str] = None
+    ) -> str:
+        with span("ffmpeg.burn_subtitles", encoder=encoder, hwaccel=hwaccel or "none"):
+            subprocess.run(
+                self.burn_subtitles_command(
+                    video_path, subtitle_path, output_path, font_size, font_color, encoder, hwaccel
+                ),
+                capture_output=True, text=True, check=True
+            )
+        logger.info(f"Subtitles burned successfully to {output_path} ({encoder})")
+        return output_path
+
+    def burn_subtitles_command(
+        self,
+        video_path: str,
+        subtitle_path: str,
+        output_path: str,
+        font_size: int = 24,
+        font_color: str = 'white',
+        encoder: str = 'libx264',
+        hwaccel: Optional[str] = None
+    ) -> list:
+        """FFmpeg command of burn_subtitles for an encoder (h264_nvenc or libx264) and decoder"""
         # Escape subtitle path for FFmpeg filter
         subtitle_path_escaped = subtitle_path.replace('\\', '/').replace(':', '\\:')
 
         cmd = ['ffmpeg']
 
         # Hardware decoding (must come BEFORE input file)
-        if use_hw_accel and self.use_hw_accel:
-            cmd.extend(['-hwaccel', 'cuda'])
+        if hwaccel:
+            cmd.extend(['-hwaccel', hwaccel])
 
         # Add input file
         cmd.extend(['-i', video_path])
@@ -330,7 +616,7 @@ class FFmpegProcessor:
         ])
 
         # Hardware encoding with NVENC (RTX 5090's 9th-gen NVENC)
-        if use_hw_accel and self.use_hw_accel:
+        if encoder == 'h264_nvenc':
             cmd.extend([
                 '-c:v', 'h264_nvenc',
                 '-preset', 'p6',  # High quality preset (RTX 5090 9th-gen NVENC)
@@ -338,7 +624,7 @@ class FFmpegProcessor:
                 '-b:v', '0'  # Let CQ control bitrate
             ])
         else:
-            cmd.extend(['-c:v', 'libx264', '-crf', '23'])
+            cmd.extend(['-c:v', encoder, '-crf', '23'])
 
         # Copy audio without re-encoding
         cmd.extend([
@@ -346,15 +632,7 @@ class FFmpegProcessor:
             '-y',
             output_path
         ])
-
-        try:
-            subprocess.run(cmd, capture_output=True, text=True, check=True)
-            logger.info(f"Subtitles burned successfully to {output_path}")
-            return output_path
-        except subprocess.CalledProcessError as e:
-            logger.error(f"Subtitle burning failed: {e.stderr}")
-            raise RuntimeError(f"Failed to burn subtitles: {e.stderr}")
-
+        return cmd
 
 if __name__ == "__main__":
     # Example usage
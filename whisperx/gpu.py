@@ -0,0 +1,94 @@
+"""
+GPU Discovery for the WhisperX API Server
+Device selection and free VRAM without importing torch.
+
+Importing torch takes seconds and, through torch.cuda, creates a CUDA
+context. The server only needs to know whether a GPU is there (to pick the
+device and compute type) and how much memory it has free (for the admission
+budget). Both come from NVML (libnvidia-ml, installed with the NVIDIA
+driver), which is a cheap ctypes call. Once torch has been imported anyway,
+it is asked instead.
+
+WHISPERX_DEVICE=cuda|cpu overrides detection, e.g. for a CPU-only torch
+build on a GPU host. CUDA_VISIBLE_DEVICES is honoured for numeric ids; with
+UUIDs, the first NVML device is assumed.
+"""
+
+import ctypes
+import os
+import sys
+from typing import Optional, Tuple
+
+_NVML_SUCCESS = 0
+# The loaded library, or False once loading failed
+_nvml = None
+
+
+class _NvmlMemory(ctypes.Structure):
+    _fields_ = [
+        ("total", ctypes.c_ulonglong),
+        ("free", ctypes.c_ulonglong),
+        ("used", ctypes.c_ulonglong)
+    ]
+
+
+def _library() -> Optional[ctypes.CDLL]:
+    global _nvml
+    if _nvml is None:
+        try:
+            library = ctypes.CDLL("libnvidia-ml.so.1")
+            _nvml = library if library.nvmlInit_v2() == _NVML_SUCCESS else False
+        except (OSError, AttributeError):
+            _nvml = False
+    return _nvml or None
+
+
+def _visible_index() -> Optional[int]:
+    """NVML index of the first device CUDA will use, None if CUDA_VISIBLE_DEVICES hides all"""
+    visible = os.getenv("CUDA_VISIBLE_DEVICES")
+    if visible is None:
+        return 0
+    first = visible.split(",")[0].strip()
+    if not first or first == "-1":
+        return None
+    return int(first) if first.isdigit() else 0
+
+
+def device_count() -> int:
+    """Number of GPUs NVML reports (0 without a driver or when none is visible)"""
+    library = _library()
+    if library is None or _visible_index() is None:
+        return 0
+    count = ctypes.c_uint()
+    if library.nvmlDeviceGetCount_v2(ctypes.byref(count)) != _NVML_SUCCESS:
+        return 0
+    return count.value
+
+
+def memory_info() -> Optional[Tuple[int, int]]:
+    """(free, total) bytes of the first visible GPU, or None if NVML cannot tell"""
+    library = _library()
+    index = _visible_index()
+    if library is None or index is None:
+        return None
+    handle = ctypes.c_void_p()
+    memory = _NvmlMemory()
+    if (library.nvmlDeviceGetHandleByIndex_v2(index, ctypes.byref(handle)) != _NVML_SUCCESS
+            or library.nvmlDeviceGetMemoryInfo(handle, ctypes.byref(memory)) != _NVML_SUCCESS):
+        return None
+    return memory.free, memory.total
+
+
+def cuda_available() -> bool:
+    """torch.cuda.is_available(), without importing torch if it is not loaded yet"""
+    torch = sys.modules.get("torch")
+    if torch is not None:
+        return torch.cuda.is_available()
+    return device_count() > 0
+
+
+def detect_device() -> str:
+    device = os.getenv("WHISPERX_DEVICE")
+    if device:
+        return device
+    return "cuda" if cuda_available() else "cpu"
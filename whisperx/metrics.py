@@ -0,0 +1,308 @@
+"""
+Prometheus Metrics for WhisperX
+Minimal thread-safe counters, gauges and histograms with text exposition.
+
+Kept dependency-free (no prometheus_client) so the CUDA base image does not
+need another package; the output follows the Prometheus text format 0.0.4.
+"""
+
+import threading
+import time
+import weakref
+from contextlib import contextmanager
+from typing import Dict, List, Sequence, Tuple
+
+# Stage durations range from milliseconds (VAD on a short clip) to tens of minutes
+STAGE_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800, 3600)
+CALLBACK_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+
+_registry: List["_Metric"] = []
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labelnames: Sequence[str], values: Tuple, extra: Dict[str, str] = None) -> str:
+    pairs = list(zip(labelnames, values))
+    if extra:
+        pairs.extend(extra.items())
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    metric_type = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values = {}
+        _registry.append(self)
+
+    def _key(self, labels: Dict[str, str]) -> Tuple:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.metric_type}"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            lines.extend(self._render_sample(key, value))
+        return lines
+
+    def _render_sample(self, key: Tuple, value) -> List[str]:
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"]
+
+
+class Counter(_Metric):
+    """Monotonically increasing value"""
+
+    metric_type = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        if amount < 0:
+            raise ValueError("Counters can only increase")
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def merge(self, values: Dict):
+        with self._lock:
+            for key, amount in values.items():
+                self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    """Value that can go up and down"""
+
+    metric_type = "gauge"
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    """Cumulative bucketed distribution with _sum and _count"""
+
+    metric_type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = STAGE_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = {"counts": [0] * len(self.buckets), "sum": 0.0}
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state["counts"][i] += 1
+                    break
+            state["sum"] += value
+
+    def merge(self, values: Dict):
+        with self._lock:
+            for key, other in values.items():
+                state = self._values.get(key)
+                if state is None:
+                    state = self._values[key] = {"counts": [0] * len(self.buckets), "sum": 0.0}
+                state["counts"] = [a + b for a, b in zip(state["counts"], other["counts"])]
+                state["sum"] += other["sum"]
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe the duration of the with-block (also when it raises)"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def _render_sample(self, key: Tuple, state) -> List[str]:
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets, state["counts"]):
+            cumulative += count
+            labels = _format_labels(self.labelnames, key, {"le": _format_value(bound)})
+            lines.append(f"{self.name}_bucket{labels} {cumulative}")
+        base = _format_labels(self.labelnames, key)
+        lines.append(f"{self.name}_sum{base} {_format_value(state['sum'])}")
+        lines.append(f"{self.name}_count{base} {cumulative}")
+        return lines
+
+
+def render() -> str:
+    """Text exposition of every registered metric"""
+    lines = []
+    for metric in _registry:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+def unregister(metric: "_Metric"):
+    """Leave metric out of render(), e.g. a gauge that only worker processes update"""
+    if metric in _registry:
+        _registry.remove(metric)
+
+
+def export_values() -> Dict[str, Dict]:
+    """
+    Take the counter and histogram values recorded so far, resetting them.
+
+    Worker processes call this after each job and ship the result to the
+    HTTP process, which adds it to its own registry with merge_values().
+    Gauges describe the worker's own state and are not exported.
+    """
+    exported = {}
+    for metric in _registry:
+        if not isinstance(metric, (Counter, Histogram)):
+            continue
+        with metric._lock:
+            if metric._values:
+                exported[metric.name] = metric._values
+                metric._values = {}
+    return exported
+
+
+def merge_values(exported: Dict[str, Dict]):
+    """Add values from export_values() (possibly another process) to this registry"""
+    by_name = {metric.name: metric for metric in _registry}
+    for name, values in exported.items():
+        if name in by_name:
+            by_name[name].merge(values)
+
+
+# WhisperX metrics
+STAGE_SECONDS = Histogram(
+    "whisperx_stage_duration_seconds",
+    "Duration of pipeline stages (upload, extraction, vad, model_load, transcription, alignment, diarization)",
+    ["stage"]
+)
+CHUNK_SECONDS = Histogram(
+    "whisperx_chunk_transcription_seconds",
+    "Transcription time per audio chunk"
+)
+CALLBACK_SECONDS = Histogram(
+    "whisperx_progress_callback_duration_seconds",
+    "Latency of progress callback POSTs",
+    buckets=CALLBACK_BUCKETS
+)
+REQUEST_SECONDS = Histogram(
+    "whisperx_request_duration_seconds",
+    "End-to-end HTTP request duration",
+    ["endpoint"]
+)
+REQUESTS = Counter(
+    "whisperx_requests_total",
+    "HTTP requests by endpoint and outcome",
+    ["endpoint", "outcome"]
+)
+AUDIO_SECONDS = Counter(
+    "whisperx_audio_seconds_processed_total",
+    "Seconds of audio transcribed"
+)
+INFLIGHT_JOBS = Gauge(
+    "whisperx_inflight_jobs",
+    "Requests currently being processed",
+    ["endpoint"]
+)
+QUEUED_JOBS = Gauge(
+    "whisperx_queued_jobs",
+    "Jobs waiting for a free worker",
+    ["priority"]
+)
+SCHEDULER_WAIT_SECONDS = Histogram(
+    "whisperx_scheduler_wait_seconds",
+    "Time a job spent queued for a worker (including re-waits after preemption)",
+    ["priority"]
+)
+SCHEDULER_SERVICE_SECONDS = Histogram(
+    "whisperx_scheduler_service_seconds",
+    "Time a job held a worker slot",
+    ["priority"]
+)
+SCHEDULER_PREEMPTIONS = Counter(
+    "whisperx_scheduler_preemptions_total",
+    "Jobs suspended between chunks for a higher-ranked job",
+    ["priority"]
+)
+MEMORY_BUDGET_BYTES = Gauge(
+    "whisperx_memory_budget_bytes",
+    "Memory available to admitted jobs",
+    ["pool"]
+)
+MEMORY_RESERVED_BYTES = Gauge(
+    "whisperx_memory_reserved_bytes",
+    "Estimated memory reserved by running and suspended jobs",
+    ["pool"]
+)
+ADMISSION_REJECTIONS = Counter(
+    "whisperx_admission_rejections_total",
+    "Jobs rejected with 503 by memory admission control",
+    ["reason"]
+)
+BATCH_SIZE_REDUCTIONS = Counter(
+    "whisperx_batch_size_reductions_total",
+    "Jobs run with a smaller batch size than configured",
+    ["cause"]
+)
+VAD_AUDIO_SECONDS = Counter(
+    "whisperx_vad_audio_seconds_total",
+    "Seconds of audio through speech detection, by what classified them",
+    ["handled_by"]
+)
+RESIDENT_MODELS = Gauge(
+    "whisperx_resident_models",
+    "Models currently loaded in memory",
+    ["kind"]
+)
+
+
+def track_model(model, kind: str):
+    """
+    Count a loaded model as resident until it is garbage collected.
+
+    Using a finalizer keeps the gauge correct on error paths that never
+    reach the explicit `del model` cleanup.
+    """
+    RESIDENT_MODELS.inc(kind=kind)
+    try:
+        weakref.finalize(model, RESIDENT_MODELS.dec, kind=kind)
+    except TypeError:
+        # Object does not support weak references; count the load only
+        RESIDENT_MODELS.dec(kind=kind)
+    return model
+
+
+def outcome_for_status(status_code: int) -> str:
+    if status_code < 400:
+        return "success"
+    if status_code < 500:
+        return "client_error"
+    return "error"
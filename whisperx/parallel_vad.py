@@ -0,0 +1,232 @@
+"""
+Sharded Silero VAD for Long Audio
+Runs VAD over shards of one file in a pool of worker processes.
+
+Silero VAD is a small recurrent model evaluated window by window, so a single
+pass uses one core however long the file is. With VAD_WORKERS > 1, a file of
+at least 2 x VAD_SHARD_MIN_SECONDS is split into equal shards (at most one
+per worker), aligned to the VAD window grid. Each shard is evaluated with
+VAD_SHARD_CONTEXT_SECONDS of extra audio on both sides, so the model state
+has settled by the time it reaches the range the shard owns. Workers read
+their own slice of the 16kHz mono PCM WAV (what extract_audio_optimized
+writes), so decoding runs in parallel too. Other inputs use a single pass.
+
+Merging depends only on the shard layout, so it is deterministic:
+1. each shard's segments are clipped to the range it owns
+2. the first piece after a boundary continues the last piece before it if
+   either touches the boundary and the gap between them is shorter than the
+   minimum silence (a single pass would not split there)
+3. clipped pieces still shorter than the minimum speech duration are dropped
+
+Away from the boundaries the result is the single-pass one.
+`bench_vad.py --workers` measures parity and scaling.
+
+Each worker process is spawned with one torch thread and loads its own VAD
+model once. With WHISPERX_WORKERS job processes, each one has its own pool.
+"""
+
+import logging
+import multiprocessing
+import os
+import threading
+import wave
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+WORKERS = int(os.getenv("VAD_WORKERS", "0"))
+SHARD_MIN_SECONDS = float(os.getenv("VAD_SHARD_MIN_SECONDS", "300"))
+CONTEXT_SECONDS = float(os.getenv("VAD_SHARD_CONTEXT_SECONDS", "30"))
+
+SAMPLE_RATE = 16000
+WINDOW_SAMPLES = 512  # Silero's window at 16kHz
+
+# (model, get_speech_timestamps) in a VAD worker process
+_worker_vad = None
+
+
+@dataclass
+class Shard:
+    """Samples [start, end) are evaluated, speech in [own_start, own_end) is kept"""
+    start: int
+    end: int
+    own_start: int
+    own_end: int
+
+
+def plan_shards(
+    total_samples: int,
+    workers: int,
+    min_seconds: float = SHARD_MIN_SECONDS,
+    context_seconds: float = CONTEXT_SECONDS
+) -> List[Shard]:
+    """Equal, window-aligned shards with context; empty if the file is too short to split"""
+    count = min(workers, int(total_samples // (min_seconds * SAMPLE_RATE)))
+    if count < 2:
+        return []
+    windows = -(-total_samples // WINDOW_SAMPLES)
+    context = int(context_seconds * SAMPLE_RATE) // WINDOW_SAMPLES * WINDOW_SAMPLES
+    bounds = [windows * i // count * WINDOW_SAMPLES for i in range(count)] + [total_samples]
+    return [
+        Shard(max(0, own_start - context), min(total_samples, own_end + context), own_start, own_end)
+        for own_start, own_end in zip(bounds, bounds[1:])
+    ]
+
+
+def merge_shard_segments(
+    shards: List[Shard],
+    results: List[List[Tuple[int, int]]],
+    min_silence_samples: int,
+    min_speech_samples: int
+) -> List[Tuple[int, int]]:
+    """Stitch per-shard speech (absolute sample ranges) into one timeline"""
+    pieces = []  # [start, end, clipped]
+    for index, (shard, segments) in enumerate(zip(shards, results)):
+        first = True
+        for start, end in segments:
+            clipped = start < shard.own_start or end > shard.own_end
+            start, end = max(start, shard.own_start), min(end, shard.own_end)
+            if end <= start:
+                continue
+            # Only the first piece after a boundary can continue the last one before it
+            at_boundary = first and index and pieces and (
+                start == shard.own_start or pieces[-1][1] == shards[index - 1].own_end
+            )
+            first = False
+            if at_boundary and start - pieces[-1][1] < min_silence_samples:
+                pieces[-1][1] = end
+                pieces[-1][2] = pieces[-1][2] or clipped
+            else:
+                pieces.append([start, end, clipped])
+    return [
+        (start, end) for start, end, clipped in pieces
+        if not clipped or end - start >= min_speech_samples
+    ]
+
+
+def wav_samples(path: str) -> Optional[int]:
+    """Sample count of a 16kHz mono PCM16 WAV, or None for anything else"""
+    try:
+        with wave.open(path, "rb") as f:
+            if (f.getframerate(), f.getnchannels(), f.getsampwidth()) != (SAMPLE_RATE, 1, 2):
+                return None
+            return f.getnframes()
+    except (wave.Error, EOFError, OSError):
+        return None
+
+
+def _init_worker(backend: str):
+    global _worker_vad
+    import torch
+    from video_segmenter import load_silero_vad
+
+    # Shards already use every worker; more threads per worker only contend
+    torch.set_num_threads(1)
+    model, utils, _ = load_silero_vad(onnx=backend == "onnx")
+    _worker_vad = (model, utils[0])
+
+
+def _detect_shard(path: str, shard: Shard, params: Dict, gate) -> Tuple[List[Tuple[int, int]], Dict]:
+    """Speech in samples [start, end) of path, and the gated_speech() counters of the owned range"""
+    import torch
+    from video_segmenter import gated_speech
+
+    start, end = shard.start, shard.end
+    with wave.open(path, "rb") as f:
+        f.setpos(start)
+        frames = f.readframes(end - start)
+    # Same scaling as torchaudio.load, which the single pass uses
+    audio = np.frombuffer(frames, dtype="<i2").astype(np.float32) / 32768.0
+    model, get_speech_timestamps = _worker_vad
+
+    def detect(begin: int, stop: int) -> List[Tuple[int, int]]:
+        timestamps = get_speech_timestamps(
+            torch.from_numpy(audio[begin:stop]), model, sampling_rate=SAMPLE_RATE, **params
+        )
+        return [(ts["start"], ts["end"]) for ts in timestamps]
+
+    speech, stats = gated_speech(audio, detect, gate, (shard.own_start - start, shard.own_end - start))
+    return [(a + start, b + start) for a, b in speech], stats
+
+
+class ShardedVAD:
+    """Pool of VAD worker processes, started on first use"""
+
+    def __init__(self, workers: int, backend: str):
+        self.workers = workers
+        self.backend = backend
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                logger.info(f"Starting {self.workers} VAD worker processes ({self.backend})")
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    # spawn: torch state must not be forked from a threaded parent
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                    initargs=(self.backend,)
+                )
+            return self._executor
+
+    def detect(
+        self,
+        audio_path: str,
+        threshold: float,
+        min_speech_duration: float,
+        min_silence_duration: float,
+        gate=None
+    ) -> Optional[Tuple[List[Tuple[int, int]], Dict]]:
+        """
+        Speech as (start, end) sample ranges, plus the gated_speech() counters
+        summed over the shards' owned ranges, or None when audio_path
+        is too short or not a 16kHz mono PCM16 WAV (the caller runs a single
+        pass). gate is the optional pre-VAD EnergyGate, applied per shard.
+        """
+        total = wav_samples(audio_path)
+        shards = plan_shards(total, self.workers) if total else []
+        if not shards:
+            return None
+
+        params = {
+            "threshold": threshold,
+            "min_speech_duration_ms": int(min_speech_duration * 1000),
+            "min_silence_duration_ms": int(min_silence_duration * 1000)
+        }
+        executor = self._pool()
+        futures = [executor.submit(_detect_shard, audio_path, shard, params, gate) for shard in shards]
+        try:
+            results = [future.result() for future in futures]
+        except BrokenProcessPool:
+            # A worker died or its initializer failed; start a fresh pool next time
+            with self._lock:
+                if self._executor is executor:
+                    self._executor = None
+            executor.shutdown(wait=False, cancel_futures=True)
+            raise
+
+        speech = merge_shard_segments(
+            shards,
+            [segments for segments, _ in results],
+            int(min_silence_duration * SAMPLE_RATE),
+            int(min_speech_duration * SAMPLE_RATE)
+        )
+        # Shards run at the same time: wall time is the slowest shard's
+        stats = {key: sum(shard_stats[key] for _, shard_stats in results) for key in ("samples", "skipped_samples")}
+        for key in ("gate_seconds", "vad_seconds"):
+            stats[key] = max(shard_stats[key] for _, shard_stats in results)
+        logger.info(f"Sharded VAD: {len(shards)} shards of {shards[0].own_end / SAMPLE_RATE:.0f}s")
+        return speech, stats
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
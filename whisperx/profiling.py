@@ -0,0 +1,214 @@
+"""
+Request Profiling for WhisperX
+Opt-in profiles of slow transcription requests.
+
+Two modes:
+- cProfile: deterministic, enabled per request with profile=true
+- Sampling: a background thread samples the request thread's stack every
+  PROFILE_SAMPLE_INTERVAL seconds; enabled for all requests when
+  PROFILE_RTF_THRESHOLD is set, and kept only when the request's real-time
+  factor falls below that threshold
+
+With neither enabled a shared no-op profiler is used, so the disabled path
+costs two attribute lookups per request.
+"""
+
+import cProfile
+import io
+import json
+import logging
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+PROFILE_DIR = Path(os.getenv("PROFILE_DIR", "/app/shared/profiles"))
+# Keep a sampling profile when realtime_factor drops below this (0 = disabled)
+PROFILE_RTF_THRESHOLD = float(os.getenv("PROFILE_RTF_THRESHOLD", "0"))
+PROFILE_SAMPLE_INTERVAL = float(os.getenv("PROFILE_SAMPLE_INTERVAL", "0.01"))
+PROFILE_TOP_N = 25
+
+
+def _frame_label(code) -> str:
+    return f"{code.co_filename}:{code.co_firstlineno}({code.co_name})"
+
+
+class NullProfiler:
+    """Profiler used when profiling is disabled"""
+
+    mode = None
+
+    def start(self):
+        pass
+
+    def stop(self):
+        pass
+
+    def finish(self, name: str, keep: bool) -> Optional[Dict]:
+        return None
+
+
+NULL_PROFILER = NullProfiler()
+
+
+class CProfileProfiler:
+    """Deterministic profile of the calling thread via cProfile"""
+
+    mode = "cprofile"
+
+    def __init__(self):
+        self.profile = cProfile.Profile()
+        self.active = False
+
+    def start(self):
+        try:
+            self.profile.enable()
+            self.active = True
+        except ValueError as e:
+            # Only one cProfile can be active per interpreter (concurrent requests)
+            logger.warning(f"cProfile unavailable for this request: {e}")
+
+    def stop(self):
+        if self.active:
+            self.profile.disable()
+            self.active = False
+
+    def top_functions(self, limit: int = PROFILE_TOP_N) -> List[Dict]:
+        stats = pstats.Stats(self.profile)
+        rows = sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)
+        return [
+            {
+                "function": f"{filename}:{line}({func})",
+                "calls": calls,
+                "self_seconds": round(self_time, 4),
+                "cumulative_seconds": round(cumulative, 4)
+            }
+            for (filename, line, func), (_, calls, self_time, cumulative, _) in rows[:limit]
+        ]
+
+    def finish(self, name: str, keep: bool) -> Optional[Dict]:
+        self.stop()
+        if not keep:
+            return None
+
+        PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+        prof_path = PROFILE_DIR / f"{name}.prof"
+        self.profile.dump_stats(str(prof_path))
+
+        text = io.StringIO()
+        pstats.Stats(self.profile, stream=text).sort_stats("cumulative").print_stats(PROFILE_TOP_N)
+        (PROFILE_DIR / f"{name}.txt").write_text(text.getvalue())
+
+        logger.info(f"Profile written to {prof_path}")
+        return {"mode": self.mode, "file": str(prof_path), "top_functions": self.top_functions()}
+
+
+class SamplingProfiler:
+    """
+    Statistical profile of one thread.
+
+    Every interval the sampler reads the target thread's current frame and
+    records the stack: the leaf counts as self time and each distinct
+    function on the stack as cumulative time. Collapsed stacks are written in
+    the format flamegraph.pl / speedscope accept.
+    """
+
+    mode = "sampling"
+
+    def __init__(self, interval: float = PROFILE_SAMPLE_INTERVAL):
+        self.interval = interval
+        self.target_thread = None
+        self.samples = 0
+        self.self_counts = Counter()
+        self.cumulative_counts = Counter()
+        self.stacks = Counter()
+        self.started_at = None
+        self.elapsed = 0.0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self.target_thread = threading.get_ident()
+        self.started_at = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="request-sampler", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.target_thread)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(_frame_label(frame.f_code))
+                frame = frame.f_back
+            self.samples += 1
+            self.self_counts[stack[0]] += 1
+            self.cumulative_counts.update(set(stack))
+            self.stacks[";".join(reversed(stack))] += 1
+
+    def stop(self):
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+            self.elapsed = time.perf_counter() - self.started_at
+
+    def top_functions(self, limit: int = PROFILE_TOP_N) -> List[Dict]:
+        # Scale sample counts to the measured wall time
+        seconds_per_sample = self.elapsed / self.samples if self.samples else 0
+        return [
+            {
+                "function": label,
+                "samples": count,
+                "self_seconds": round(self.self_counts[label] * seconds_per_sample, 4),
+                "cumulative_seconds": round(count * seconds_per_sample, 4)
+            }
+            for label, count in self.cumulative_counts.most_common(limit)
+        ]
+
+    def finish(self, name: str, keep: bool) -> Optional[Dict]:
+        self.stop()
+        if not keep:
+            return None
+
+        PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+        collapsed_path = PROFILE_DIR / f"{name}.collapsed"
+        with open(collapsed_path, "w") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+        summary = {
+            "mode": self.mode,
+            "file": str(collapsed_path),
+            "samples": self.samples,
+            "interval_seconds": self.interval,
+            "top_functions": self.top_functions()
+        }
+        with open(PROFILE_DIR / f"{name}.json", "w") as f:
+            json.dump(summary, f, indent=2)
+
+        logger.info(f"Sampling profile written to {collapsed_path} ({self.samples} samples)")
+        return summary
+
+
+def profiler_for_request(requested: bool):
+    """cProfile when requested, sampling when a slow-request threshold is set, else no-op"""
+    if requested:
+        return CProfileProfiler()
+    if PROFILE_RTF_THRESHOLD > 0:
+        return SamplingProfiler()
+    return NULL_PROFILER
+
+
+def should_keep(requested: bool, realtime_factor: float) -> bool:
+    """Keep explicit profiles always; threshold profiles only for slow requests"""
+    if requested:
+        return True
+    return PROFILE_RTF_THRESHOLD > 0 and realtime_factor < PROFILE_RTF_THRESHOLD
@@ -0,0 +1,159 @@
+"""
+Progress Callback Client for WhisperX
+Sends job progress updates to the progress tracker (or any webhook).
+
+Updates go out over a shared keep-alive session. With batching enabled they
+are buffered and posted as one array to `<callback_url>/batch`, which the
+progress tracker applies last-write-wins per job.
+"""
+
+import logging
+import os
+import threading
+import time
+from typing import Optional
+
+from metrics import CALLBACK_SECONDS
+
+logger = logging.getLogger(__name__)
+
+# 1 = one POST per update (works with any webhook); >1 enables batching
+CALLBACK_BATCH_SIZE = int(os.getenv("PROGRESS_CALLBACK_BATCH_SIZE", "1"))
+# Maximum time an update may sit in the buffer before it is flushed
+CALLBACK_FLUSH_INTERVAL = float(os.getenv("PROGRESS_CALLBACK_FLUSH_INTERVAL", "2.0"))
+CALLBACK_TIMEOUT = 5
+
+# Shared across requests so callbacks reuse pooled TCP connections. Created
+# on the first callback: requests is only imported when callbacks are used.
+_session = None
+_session_lock = threading.Lock()
+
+
+def _get_session():
+    global _session
+    with _session_lock:
+        if _session is None:
+            import requests
+            _session = requests.Session()
+        return _session
+
+
+class ProgressReporter:
+    """
+    Per-job progress sender.
+
+    Fails silently: a broken callback endpoint must never interrupt a
+    transcription. A stage change or close() flushes the buffer so the
+    frontend sees stage transitions without waiting for the batch to fill.
+    Otherwise a timer flushes it flush_interval seconds after the first
+    buffered update, even if no further update arrives.
+    """
+
+    def __init__(
+        self,
+        callback_url: Optional[str],
+        job_id: Optional[str],
+        batch_size: int = None,
+        flush_interval: float = None
+    ):
+        """
+        Initialize reporter.
+
+        Args:
+            callback_url: Single-update callback URL (None disables reporting)
+            job_id: Job identifier included in every update
+            batch_size: Updates per POST (defaults to PROGRESS_CALLBACK_BATCH_SIZE)
+            flush_interval: Max seconds to buffer (defaults to PROGRESS_CALLBACK_FLUSH_INTERVAL)
+        """
+        self.callback_url = callback_url
+        self.job_id = job_id
+        self.batch_size = max(1, batch_size or CALLBACK_BATCH_SIZE)
+        self.flush_interval = CALLBACK_FLUSH_INTERVAL if flush_interval is None else flush_interval
+        self.enabled = bool(callback_url and job_id)
+
+        self._buffer = []
+        self._timer = None  # Flush deadline of the buffered updates
+        self._last_stage = None
+        self._lock = threading.Lock()
+
+    @property
+    def batch_url(self) -> str:
+        return f"{self.callback_url.rstrip('/')}/batch"
+
+    def send(
+        self,
+        progress: int,
+        stage: str,
+        message: str,
+        segment_info: dict = None,
+        status: str = "processing"
+    ):
+        """Queue (or send) a progress update"""
+        if not self.enabled:
+            return
+
+        payload = {
+            "job_id": self.job_id,
+            "status": status,
+            "progress": progress,
+            "stage": stage,
+            "message": message,
+            "sent_at": time.time()
+        }
+
+        if segment_info:
+            payload["segment_info"] = segment_info
+
+        if self.batch_size == 1:
+            self._post(self.callback_url, payload)
+            return
+
+        with self._lock:
+            stage_changed = self._last_stage is not None and stage != self._last_stage
+            if stage_changed and self._buffer:
+                self._flush_locked()
+
+            self._buffer.append(payload)
+            self._last_stage = stage
+
+            if len(self._buffer) >= self.batch_size or self.flush_interval <= 0:
+                self._flush_locked()
+            elif self._timer is None:
+                self._timer = threading.Timer(self.flush_interval, self._flush_due)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def flush(self):
+        """Send any buffered updates now"""
+        with self._lock:
+            self._flush_locked()
+
+    def close(self):
+        """Flush remaining updates; call when the job finishes"""
+        self.flush()
+
+    def _flush_due(self):
+        with self._lock:
+            # A flush since the timer started already sent (and un-timed) its updates
+            if self._timer is threading.current_thread():
+                self._flush_locked()
+
+    def _flush_locked(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self._buffer:
+            batch, self._buffer = self._buffer, []
+            self._post(self.batch_url, batch)
+
+    def _post(self, url: str, body):
+        try:
+            with CALLBACK_SECONDS.time():
+                response = _get_session().post(url, json=body, timeout=CALLBACK_TIMEOUT)
+            if response.status_code == 200:
+                count = len(body) if isinstance(body, list) else 1
+                logger.debug(f"Progress callback sent ({count} update(s))")
+            else:
+                logger.warning(f"Progress callback failed with status {response.status_code}")
+        except Exception as e:
+            logger.warning(f"Failed to send progress callback: {e}")
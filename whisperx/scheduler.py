@@ -0,0 +1,347 @@
+"""
+Job Scheduler for the WhisperX API Server
+Priority classes and per-client fair share for worker slots.
+
+Each job gets a Ticket with a priority class (interactive, normal, batch) and
+a client id. When a worker slot frees up, it goes to the waiting ticket with:
+1. the highest priority class
+2. then the client that has received the least service so far (slot-seconds)
+3. then the earliest arrival
+
+A client that becomes active starts at the lowest service among the clients
+that currently have work. This way it is not starved, and it cannot use a
+long idle period to push everyone else aside.
+
+Chunks are the unit of work. /transcribe-large calls checkpoint() between
+chunks. With SCHEDULER_PREEMPTION enabled, a running job then gives up its
+slot when a waiting ticket ranks higher, either by class or by fair share
+within its class. It resumes later from the next chunk. A suspended job keeps
+its models loaded and its thread, so at most SCHEDULER_MAX_SUSPENDED jobs are
+parked at once. Preemption needs the in-process worker pool; worker
+processes are scheduled per job.
+
+With a memory budget (admission.py), a ticket carrying a memory demand is
+only dispatched when the demand fits the unreserved budget. The batch size is
+reduced if needed, and the reservation is held until the ticket is released,
+including while it is suspended. Tickets that do not fit wait while smaller
+ones go ahead.
+
+Wait time (queued, including re-waits after preemption), service time
+(holding a slot) and preemptions are recorded per priority class.
+"""
+
+import asyncio
+import contextvars
+import itertools
+import logging
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+from admission import MAX_WAITING, AdmissionRejected, MemoryBudget, MemoryDemand
+from metrics import (
+    ADMISSION_REJECTIONS,
+    BATCH_SIZE_REDUCTIONS,
+    QUEUED_JOBS,
+    SCHEDULER_PREEMPTIONS,
+    SCHEDULER_SERVICE_SECONDS,
+    SCHEDULER_WAIT_SECONDS
+)
+
+logger = logging.getLogger(__name__)
+
+PRIORITY_CLASSES = ("interactive", "normal", "batch")
+PREEMPTION = os.getenv("SCHEDULER_PREEMPTION", "false").lower() in ("1", "true", "yes")
+MAX_SUSPENDED = int(os.getenv("SCHEDULER_MAX_SUSPENDED", "2"))
+# priority=auto: files up to this long are interactive, longer ones normal
+INTERACTIVE_MAX_SECONDS = float(os.getenv("SCHEDULER_INTERACTIVE_SECONDS", "300"))
+
+_RANK = {name: rank for rank, name in enumerate(PRIORITY_CLASSES)}
+_current_ticket: contextvars.ContextVar = contextvars.ContextVar("whisperx_ticket", default=None)
+
+
+def classify(requested: str, duration: Optional[float]) -> str:
+    """Resolve a requested priority ('auto' or a class name) to a class"""
+    if requested in _RANK:
+        return requested
+    if requested != "auto":
+        raise ValueError(f"Unknown priority '{requested}', expected auto or one of {PRIORITY_CLASSES}")
+    if duration is not None and duration <= INTERACTIVE_MAX_SECONDS:
+        return "interactive"
+    return "normal"
+
+
+class Ticket:
+    """One job's place in the scheduler, with its wait/service accounting"""
+
+    def __init__(
+        self,
+        priority: str = "normal",
+        client: str = "anonymous",
+        label: str = "",
+        demand: Optional[MemoryDemand] = None
+    ):
+        if priority not in _RANK:
+            raise ValueError(f"Unknown priority '{priority}', expected one of {PRIORITY_CLASSES}")
+        self.priority = priority
+        self.client = client
+        self.label = label
+        self.demand = demand
+        # Batch size granted against the memory budget (None without a demand)
+        self.batch_size: Optional[int] = None
+        self._reserved: Optional[Dict[str, float]] = None
+        self.seq = None
+        self.wait_seconds = 0.0
+        self.service_seconds = 0.0
+        self.preemptions = 0
+        self.started = False
+        self.scheduler = None
+        self._waiting_since = None
+        self._running_since = None
+        self._notify: Optional[Callable] = None
+
+    def summary(self) -> Dict:
+        summary = {
+            "priority": self.priority,
+            "client": self.client,
+            "wait_seconds": round(self.wait_seconds, 4),
+            "service_seconds": round(self.service_seconds, 4),
+            "preemptions": self.preemptions
+        }
+        if self.batch_size is not None:
+            summary["batch_size"] = self.batch_size
+        return summary
+
+
+class Scheduler:
+    """Grants a fixed number of slots to tickets by class, fair share and arrival"""
+
+    def __init__(
+        self,
+        slots: int = 1,
+        preemption: bool = PREEMPTION,
+        max_suspended: int = MAX_SUSPENDED,
+        budget: Optional[MemoryBudget] = None
+    ):
+        self.slots = max(1, slots)
+        self.preemption = preemption
+        self.max_suspended = max(0, max_suspended)
+        self.budget = budget
+        self._lock = threading.Lock()
+        self._waiting: List[Ticket] = []
+        self._running: List[Ticket] = []
+        self._suspended = 0
+        self._service: Dict[str, float] = {}
+        self._active: Dict[str, int] = {}
+        self._seq = itertools.count()
+
+    # Accounting (callers hold the lock)
+
+    def _key(self, ticket: Ticket):
+        return _RANK[ticket.priority], self._service[ticket.client], ticket.seq
+
+    def _charge(self, ticket: Ticket, now: float):
+        """Move running time since the last charge into the ticket's and client's service"""
+        elapsed = now - ticket._running_since
+        ticket._running_since = now
+        ticket.service_seconds += elapsed
+        self._service[ticket.client] += elapsed
+
+    def _fits(self, ticket: Ticket) -> bool:
+        """Whether ticket could start now (suspended tickets keep their reservation)"""
+        if self.budget is None or ticket.demand is None or ticket.started:
+            return True
+        return self.budget.fit(ticket.demand) is not None
+
+    def _reserve(self, ticket: Ticket):
+        if ticket.demand is None or ticket.started:
+            return
+        if self.budget is None:
+            ticket.batch_size = ticket.demand.batch_size
+            return
+        ticket.batch_size = self.budget.fit(ticket.demand)
+        if ticket.batch_size < ticket.demand.batch_size:
+            BATCH_SIZE_REDUCTIONS.inc(cause="admission")
+            logger.info(f"Memory pressure: running {ticket.label or 'job'} with batch size "
+                        f"{ticket.batch_size} instead of {ticket.demand.batch_size}")
+        ticket._reserved = ticket.demand.at_batch_size(ticket.batch_size)
+        self.budget.reserve(ticket._reserved)
+
+    def _forget(self, ticket: Ticket):
+        """Drop a finished ticket's reservation and its client's share if it was the last"""
+        if ticket._reserved:
+            self.budget.unreserve(ticket._reserved)
+            ticket._reserved = None
+        self._active[ticket.client] -= 1
+        if not self._active[ticket.client]:
+            del self._active[ticket.client]
+            del self._service[ticket.client]
+
+    def _enqueue(self, ticket: Ticket, now: float):
+        ticket._waiting_since = now
+        self._waiting.append(ticket)
+        self._update_queue_metrics()
+
+    def _dispatch(self, now: float):
+        while len(self._running) < self.slots:
+            candidates = [t for t in self._waiting if self._fits(t)]
+            if not candidates:
+                break
+            ticket = min(candidates, key=self._key)
+            self._waiting.remove(ticket)
+            self._reserve(ticket)
+            ticket.wait_seconds += now - ticket._waiting_since
+            ticket._running_since = now
+            if ticket.started:
+                self._suspended -= 1
+            ticket.started = True
+            self._running.append(ticket)
+            ticket._notify()
+        self._update_queue_metrics()
+
+    def _update_queue_metrics(self):
+        for name in PRIORITY_CLASSES:
+            QUEUED_JOBS.set(sum(1 for t in self._waiting if t.priority == name), priority=name)
+
+    def _should_yield(self, ticket: Ticket) -> bool:
+        if not self.preemption or not self._waiting or self._suspended >= self.max_suspended:
+            return False
+        rank, service = _RANK[ticket.priority], self._service[ticket.client]
+        for other in self._waiting:
+            if not self._fits(other):
+                continue
+            other_rank = _RANK[other.priority]
+            if other_rank < rank:
+                return True
+            if other_rank == rank and other.client != ticket.client and self._service[other.client] < service:
+                return True
+        return False
+
+    # Public API
+
+    def submit(self, ticket: Ticket, notify: Callable):
+        """
+        Queue a new ticket; notify() is called (under the lock) once it holds a slot.
+
+        Raises AdmissionRejected if its memory demand can never fit, or if a
+        slot is free but too many tickets are already waiting for memory.
+        """
+        now = time.perf_counter()
+        with self._lock:
+            if self.budget is not None and ticket.demand is not None and self.budget.fit(ticket.demand, free=False) is None:
+                ADMISSION_REJECTIONS.inc(reason="too_large")
+                raise AdmissionRejected("Job needs more memory than this server has, even at the smallest batch size",
+                                        retry_after=None)
+            ticket.seq = next(self._seq)
+            ticket.scheduler = self
+            ticket._notify = notify
+            if not self._active.get(ticket.client):
+                # Join at the current minimum so neither side starves
+                active = [self._service[c] for c, n in self._active.items() if n]
+                self._service[ticket.client] = min(active) if active else 0.0
+            self._active[ticket.client] = self._active.get(ticket.client, 0) + 1
+            self._enqueue(ticket, now)
+            self._dispatch(now)
+
+            # A free slot that nothing waiting can use means the queue is blocked on memory
+            if ticket in self._waiting and len(self._running) < self.slots and len(self._waiting) > MAX_WAITING:
+                self._waiting.remove(ticket)
+                self._forget(ticket)
+                self._update_queue_metrics()
+                ADMISSION_REJECTIONS.inc(reason="memory_pressure")
+                raise AdmissionRejected(f"Too many jobs are already waiting for memory ({len(self._waiting)})")
+
+    async def acquire(self, ticket: Ticket):
+        """Wait (without blocking the event loop) until ticket holds a slot"""
+        loop = asyncio.get_running_loop()
+        granted = loop.create_future()
+
+        def notify():
+            loop.call_soon_threadsafe(lambda: granted.done() or granted.set_result(None))
+
+        self.submit(ticket, notify)
+        try:
+            await granted
+        except asyncio.CancelledError:
+            self.release(ticket)
+            raise
+
+    def checkpoint(self, ticket: Ticket):
+        """
+        Between work units: give the slot to a higher-ranked waiting ticket and
+        block until this ticket is granted a slot again.
+        """
+        now = time.perf_counter()
+        resumed = threading.Event()
+        with self._lock:
+            if ticket not in self._running:
+                return
+            self._charge(ticket, now)
+            if not self._should_yield(ticket):
+                return
+            self._running.remove(ticket)
+            self._suspended += 1
+            ticket.preemptions += 1
+            ticket._notify = resumed.set
+            SCHEDULER_PREEMPTIONS.inc(priority=ticket.priority)
+            logger.info(f"Suspending {ticket.label or 'job'} ({ticket.priority}, client {ticket.client}) "
+                        f"for a higher-ranked job")
+            self._enqueue(ticket, now)
+            self._dispatch(now)
+        resumed.wait()
+
+    def release(self, ticket: Ticket):
+        """Finish a ticket (granted or still waiting) and record its metrics"""
+        now = time.perf_counter()
+        with self._lock:
+            if ticket in self._running:
+                self._charge(ticket, now)
+                self._running.remove(ticket)
+            elif ticket in self._waiting:
+                self._waiting.remove(ticket)
+                ticket.wait_seconds += now - ticket._waiting_since
+                if ticket.started:
+                    self._suspended -= 1
+            else:
+                return
+            self._forget(ticket)
+            self._dispatch(now)
+
+        SCHEDULER_WAIT_SECONDS.observe(ticket.wait_seconds, priority=ticket.priority)
+        SCHEDULER_SERVICE_SECONDS.observe(ticket.service_seconds, priority=ticket.priority)
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            snapshot = {
+                "slots": self.slots,
+                "preemption": self.preemption,
+                "running": [t.summary() for t in self._running],
+                "waiting": [t.summary() for t in sorted(self._waiting, key=self._key)],
+                "suspended": self._suspended
+            }
+            if self.budget is not None:
+                snapshot["memory"] = self.budget.snapshot()
+            return snapshot
+
+
+def run_with_ticket(ticket: Ticket, fn: Callable, kwargs: Dict):
+    """Run fn with ticket current, so checkpoint() inside it can yield the slot"""
+    token = _current_ticket.set(ticket)
+    try:
+        return fn(**kwargs)
+    finally:
+        _current_ticket.reset(token)
+
+
+def checkpoint():
+    """Work-unit boundary; a no-op outside a scheduled in-process job"""
+    ticket = _current_ticket.get()
+    if ticket is not None and ticket.scheduler is not None:
+        ticket.scheduler.checkpoint(ticket)
+
+
+def waited_seconds() -> float:
+    """Queue time of the current job's ticket so far; 0 outside a scheduled in-process job"""
+    ticket = _current_ticket.get()
+    return ticket.wait_seconds if ticket is not None else 0.0
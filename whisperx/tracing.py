@@ -0,0 +1,185 @@
+"""
+Lightweight Request Tracing for WhisperX
+Nested stage timings for a single transcription request.
+
+A Tracer is activated per request through a context variable. Library code
+(FFmpegProcessor, VideoSegmenter) calls the module-level span(), which is a
+no-op when no tracer is active, so the modules stay usable on their own.
+The recorded tree is returned in responses and can be exported as a Chrome
+trace (open in chrome://tracing or https://ui.perfetto.dev).
+"""
+
+import contextvars
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, Optional
+
+_current_tracer: contextvars.ContextVar = contextvars.ContextVar("whisperx_tracer", default=None)
+
+
+class Span:
+    """A named, timed region with optional attributes and child spans"""
+
+    __slots__ = ("name", "start", "end", "attrs", "children", "thread_id")
+
+    def __init__(self, name: str, start: float, attrs: Dict = None):
+        self.name = name
+        self.start = start
+        self.end = None
+        self.attrs = attrs or {}
+        self.children: List["Span"] = []
+        self.thread_id = threading.get_ident()
+
+    @property
+    def duration(self) -> float:
+        end = self.end if self.end is not None else time.perf_counter()
+        return end - self.start
+
+
+class Tracer:
+    """
+    Collects spans for one request.
+
+    Each thread keeps its own stack of open spans, so work moved to a thread
+    pool nests under the root instead of under an unrelated open span.
+    """
+
+    def __init__(self, name: str, **attrs):
+        self.origin = time.perf_counter()
+        self.root = Span(name, self.origin, attrs)
+        self._stacks: Dict[int, List[Span]] = {}
+        self._lock = threading.Lock()
+
+    def _stack(self) -> List[Span]:
+        thread_id = threading.get_ident()
+        with self._lock:
+            if thread_id not in self._stacks:
+                self._stacks[thread_id] = [self.root]
+            return self._stacks[thread_id]
+
+    @contextmanager
+    def span(self, name: str, **attrs):
+        stack = self._stack()
+        span = Span(name, time.perf_counter(), attrs)
+        with self._lock:
+            stack[-1].children.append(span)
+        stack.append(span)
+        try:
+            yield span
+        finally:
+            span.end = time.perf_counter()
+            stack.pop()
+
+    def add_span(self, name: str, start: float, end: float, **attrs):
+        """
+        Record a span that was timed elsewhere, e.g. the upload measured by the
+        HTTP process before a worker picked up the job. perf_counter() is the
+        system-wide monotonic clock on Linux, so timestamps from another
+        process on the same host line up. The root is extended to cover it.
+        """
+        span = Span(name, start, attrs)
+        span.end = end
+        with self._lock:
+            self.root.children.append(span)
+            self.root.children.sort(key=lambda child: child.start)
+            if start < self.root.start:
+                self.root.start = self.origin = start
+
+    def finish(self):
+        if self.root.end is None:
+            self.root.end = time.perf_counter()
+
+    def _span_to_dict(self, span: Span) -> Dict:
+        data = {
+            "name": span.name,
+            "start_ms": round((span.start - self.origin) * 1000, 3),
+            "duration_ms": round(span.duration * 1000, 3)
+        }
+        if span.attrs:
+            data["attrs"] = span.attrs
+        if span.children:
+            data["children"] = [self._span_to_dict(child) for child in span.children]
+        return data
+
+    def summary(self) -> Dict:
+        """
+        Timings for API responses:
+        - total_seconds: root span duration
+        - stages: seconds per top-level stage name (summed if repeated)
+        - chunks: per-chunk transcription durations
+        - spans: full nested tree
+        """
+        stages: Dict[str, float] = {}
+        for child in self.root.children:
+            stages[child.name] = round(stages.get(child.name, 0.0) + child.duration, 4)
+
+        chunks = [
+            {**span.attrs, "seconds": round(span.duration, 4)}
+            for span in self.iter_spans()
+            if span.name == "chunk"
+        ]
+
+        return {
+            "total_seconds": round(self.root.duration, 4),
+            "stages": stages,
+            "chunks": chunks,
+            "spans": self._span_to_dict(self.root)
+        }
+
+    def iter_spans(self):
+        pending = [self.root]
+        while pending:
+            span = pending.pop()
+            yield span
+            pending.extend(reversed(span.children))
+
+    def to_chrome_trace(self) -> Dict:
+        """Chrome trace event format (complete 'X' events, microseconds)"""
+        pid = os.getpid()
+        events = []
+        for span in self.iter_spans():
+            events.append({
+                "name": span.name,
+                "ph": "X",
+                "ts": round((span.start - self.origin) * 1e6, 1),
+                "dur": round(span.duration * 1e6, 1),
+                "pid": pid,
+                "tid": span.thread_id,
+                "args": span.attrs
+            })
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def write_chrome_trace(self, path: Path) -> Path:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(self.to_chrome_trace(), f)
+        return path
+
+
+def current_tracer() -> Optional[Tracer]:
+    return _current_tracer.get()
+
+
+def activate_tracer(tracer: Tracer) -> contextvars.Token:
+    """Make tracer current; pass the returned token to deactivate_tracer()"""
+    return _current_tracer.set(tracer)
+
+
+def deactivate_tracer(token: contextvars.Token):
+    _current_tracer.reset(token)
+
+
+@contextmanager
+def span(name: str, **attrs):
+    """Record a span on the active tracer; does nothing when tracing is off"""
+    tracer = _current_tracer.get()
+    if tracer is None:
+        yield None
+        return
+    with tracer.span(name, **attrs) as s:
+        yield s
@@ -7,15 +7,48 @@ Based on 2025 best practices:
 - 30-second chunks with 10-second overlap (12x speedup)
 - Cut & Merge strategy for boundary handling
 - Scene detection for natural break points
+
+Silero VAD is loaded from a local silero-vad checkout when there is one
+(SILERO_VAD_PATH, else torch.hub's copy in TORCH_HOME, i.e. the shared
+torch-cache volume), so startup needs no GitHub access. Only without one is
+it fetched through torch.hub, which fills the cache. VAD_BACKEND=onnx runs
+it with ONNX Runtime, which is faster on CPU than the TorchScript model
+(torch); auto (default) uses ONNX when onnxruntime is installed. With
+VAD_WORKERS > 1, long files are split into shards that run on several cores
+(parallel_vad.py). With PREVAD, a vectorized energy/zero-crossing gate
+(EnergyGate) first removes obvious silence, so Silero only runs on the rest.
 """
 
+import importlib.util
 import logging
-from typing import List, Tuple, Optional
-import torch
+import os
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple, Optional
 import numpy as np
 
+from metrics import VAD_AUDIO_SECONDS
+from parallel_vad import WINDOW_SAMPLES, WORKERS as VAD_WORKERS, ShardedVAD
+from tracing import span
+
 logger = logging.getLogger(__name__)
 
+VAD_BACKEND = os.getenv("VAD_BACKEND", "auto").lower()
+SILERO_VAD_PATH = os.getenv("SILERO_VAD_PATH")
+SILERO_VAD_REPO = "snakers4/silero-vad"
+# After a failed load, chunking falls back to time-based until this many seconds pass
+VAD_RETRY_SECONDS = float(os.getenv("VAD_RETRY_SECONDS", "300"))
+
+PREVAD = os.getenv("PREVAD", "false").lower() in ("1", "true", "yes")
+PREVAD_ENERGY_DB = float(os.getenv("PREVAD_ENERGY_DB", "-50"))
+PREVAD_ZCR = float(os.getenv("PREVAD_ZCR", "0.25"))
+PREVAD_ZCR_ENERGY_DB = float(os.getenv("PREVAD_ZCR_ENERGY_DB", "-60"))
+PREVAD_MIN_SILENCE_SECONDS = float(os.getenv("PREVAD_MIN_SILENCE_SECONDS", "1.0"))
+PREVAD_PAD_SECONDS = float(os.getenv("PREVAD_PAD_SECONDS", "0.25"))
+# Frames per vectorized block, bounding the gate's temporary arrays (~32 MB)
+GATE_BLOCK_FRAMES = 1 << 16
+
 
 class AudioSegment:
     """Represents a segment of audio with metadata."""
@@ -36,6 +69,303 @@ class AudioSegment:
     def __repr__(self):
         return f"AudioSegment(id={self.segment_id}, start={self.start:.2f}, end={self.end:.2f}, duration={self.duration:.2f})"
 
+    def slice(self, audio: np.ndarray, sample_rate: int = 16000) -> np.ndarray:
+        """Samples of this segment from the full-file audio array (a view, no copy)"""
+        return audio[int(self.start * sample_rate):int(self.end * sample_rate)]
+
+
+def merge_speech_segments(
+    speech_segments: List[Tuple[float, float]],
+    target_duration: float,
+    overlap: float
+) -> List[AudioSegment]:
+    """
+    Cut & Merge: join consecutive speech segments into chunks of up to
+    target_duration, padding each chunk with overlap seconds.
+
+    Args:
+        speech_segments: Sorted (start, end) speech regions in seconds
+        target_duration: Maximum span of merged speech per chunk
+        overlap: Padding added before each chunk and after all but the last
+
+    Returns:
+        List of AudioSegment objects
+    """
+    if not speech_segments:
+        return []
+
+    chunks = []
+    current_start = speech_segments[0][0]
+    current_end = speech_segments[0][1]
+    chunk_id = 0
+
+    for i in range(1, len(speech_segments)):
+        seg_start, seg_end = speech_segments[i]
+
+        # Check if adding this segment would exceed target duration
+        if (seg_end - current_start) <= target_duration:
+            # Merge segment
+            current_end = seg_end
+        else:
+            # Save current chunk with overlap
+            chunk_end = current_end + overlap
+            chunks.append(AudioSegment(
+                start=max(0, current_start - overlap),
+                end=chunk_end,
+                segment_id=chunk_id
+            ))
+            chunk_id += 1
+
+            # Start new chunk
+            current_start = seg_start
+            current_end = seg_end
+
+    # Add final chunk
+    if current_start < current_end:
+        chunks.append(AudioSegment(
+            start=max(0, current_start - overlap),
+            end=current_end,
+            segment_id=chunk_id
+        ))
+
+    return chunks
+
+
+def time_based_chunks(duration: float, chunk_duration: float, overlap: float) -> List[AudioSegment]:
+    """Fixed-duration chunks advancing by (chunk_duration - overlap)"""
+    chunks = []
+    chunk_id = 0
+    current_pos = 0
+
+    while current_pos < duration:
+        chunk_start = current_pos
+        chunk_end = min(current_pos + chunk_duration, duration)
+
+        chunks.append(AudioSegment(
+            start=chunk_start,
+            end=chunk_end,
+            segment_id=chunk_id
+        ))
+
+        chunk_id += 1
+        # Move forward by (chunk_duration - overlap) to create overlap
+        current_pos += (chunk_duration - overlap)
+
+    return chunks
+
+
+def silence_based_chunks(
+    silences: List[Tuple[float, float]],
+    duration: Optional[float],
+    max_chunk_duration: float
+) -> List[AudioSegment]:
+    """
+    Chunks spanning the audio between silence periods.
+
+    Args:
+        silences: Sorted (start, end) silence periods in seconds
+        duration: Total audio duration (None skips the trailing chunk)
+        max_chunk_duration: Longer non-silent spans are split at this length
+
+    Returns:
+        List of AudioSegment objects
+    """
+    chunks = []
+    chunk_id = 0
+    prev_end = 0
+
+    for silence_start, silence_end in silences:
+        if silence_start > prev_end:
+            # Check if segment is too long
+            if (silence_start - prev_end) > max_chunk_duration:
+                # Split long segment into smaller chunks
+                pos = prev_end
+                while pos < silence_start:
+                    chunk_end = min(pos + max_chunk_duration, silence_start)
+                    chunks.append(AudioSegment(
+                        start=pos,
+                        end=chunk_end,
+                        segment_id=chunk_id
+                    ))
+                    chunk_id += 1
+                    pos = chunk_end
+            else:
+                # Add chunk
+                chunks.append(AudioSegment(
+                    start=prev_end,
+                    end=silence_start,
+                    segment_id=chunk_id
+                ))
+                chunk_id += 1
+
+        prev_end = silence_end
+
+    # Add final chunk if needed
+    if duration is not None and prev_end < duration:
+        chunks.append(AudioSegment(
+            start=prev_end,
+            end=duration,
+            segment_id=chunk_id
+        ))
+
+    return chunks
+
+
+@dataclass
+class EnergyGate:
+    """
+    Pre-VAD: finds obvious silence cheaply so Silero only runs on the rest.
+
+    Audio is cut into Silero-sized frames (32 ms). A frame may be speech if
+    its level is at least energy_db dBFS, or at least zcr_energy_db with a
+    zero-crossing rate of at least zcr (quiet fricatives such as "s" and
+    "f"). Runs of other frames lasting min_silence seconds or more are
+    skipped, except pad seconds next to the candidate regions, so Silero
+    still sees speech onsets and endings with some context.
+    """
+    energy_db: float = PREVAD_ENERGY_DB
+    zcr: float = PREVAD_ZCR
+    zcr_energy_db: float = PREVAD_ZCR_ENERGY_DB
+    min_silence: float = PREVAD_MIN_SILENCE_SECONDS
+    pad: float = PREVAD_PAD_SECONDS
+
+    def active_frames(self, audio: np.ndarray) -> np.ndarray:
+        """Per full frame: whether it may contain speech"""
+        frames = len(audio) // WINDOW_SAMPLES
+        active = np.empty(frames, dtype=bool)
+        for first in range(0, frames, GATE_BLOCK_FRAMES):
+            last = min(frames, first + GATE_BLOCK_FRAMES)
+            block = audio[first * WINDOW_SAMPLES:last * WINDOW_SAMPLES].reshape(-1, WINDOW_SAMPLES)
+            power = np.einsum("ij,ij->i", block, block) / WINDOW_SAMPLES
+            level = 10 * np.log10(power + 1e-12)
+            signs = np.signbit(block)
+            crossings = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / (WINDOW_SAMPLES - 1)
+            active[first:last] = (level >= self.energy_db) | ((level >= self.zcr_energy_db) & (crossings >= self.zcr))
+        return active
+
+    def regions(self, audio: np.ndarray, sample_rate: int = 16000) -> List[Tuple[int, int]]:
+        """Sample ranges that may contain speech, in order (a trailing partial frame is kept)"""
+        active = self.active_frames(audio)
+        edges = np.diff(np.concatenate(([0], (~active).astype(np.int8), [0])))
+        starts, ends = np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+        min_frames = max(1, int(self.min_silence * sample_rate / WINDOW_SAMPLES))
+        pad = int(self.pad * sample_rate / WINDOW_SAMPLES)
+
+        regions = []
+        position = 0
+        for start, end in zip(starts, ends):
+            if end - start < min_frames:
+                continue
+            # No padding towards the start and end of the file
+            skip_start = start + pad if start > 0 else start
+            skip_end = end - pad if end < len(active) else end
+            if skip_end <= skip_start:
+                continue
+            if skip_start * WINDOW_SAMPLES > position:
+                regions.append((position, int(skip_start) * WINDOW_SAMPLES))
+            position = int(skip_end) * WINDOW_SAMPLES
+        if position < len(audio):
+            regions.append((position, len(audio)))
+        return regions
+
+
+def gated_speech(
+    audio: np.ndarray,
+    detect: Callable[[int, int], List[Tuple[int, int]]],
+    gate: Optional[EnergyGate],
+    counted: Optional[Tuple[int, int]] = None
+) -> Tuple[List[Tuple[int, int]], Dict]:
+    """
+    Speech sample ranges from detect(start, end), which runs the neural VAD
+    on audio[start:end] and returns ranges relative to start. It is called
+    on each gate region, or once on the whole audio without a gate.
+
+    Also returns counters for vad_report(): samples, skipped_samples,
+    gate_seconds and vad_seconds. The sample counters cover the counted
+    range of audio (default: all of it).
+    """
+    count_start, count_end = counted or (0, len(audio))
+    stats = {"samples": count_end - count_start, "skipped_samples": 0, "gate_seconds": 0.0, "vad_seconds": 0.0}
+    regions = [(0, len(audio))]
+    if gate is not None:
+        start = time.perf_counter()
+        regions = gate.regions(audio)
+        stats["gate_seconds"] = time.perf_counter() - start
+        stats["skipped_samples"] = stats["samples"] - sum(
+            max(0, min(end, count_end) - max(begin, count_start)) for begin, end in regions
+        )
+
+    start = time.perf_counter()
+    speech = []
+    for begin, end in regions:
+        speech.extend((begin + a, begin + b) for a, b in detect(begin, end))
+    stats["vad_seconds"] = time.perf_counter() - start
+    return speech, stats
+
+
+def vad_report(stats: Dict, sample_rate: int = 16000) -> Dict:
+    """
+    Skipped fraction and estimated time saved by the pre-VAD gate.
+
+    Silero's cost is linear in the audio it sees, so the skipped audio would
+    have cost vad_seconds * skipped / processed. The gate's own time is
+    subtracted. The estimate is None when everything was skipped.
+    """
+    audio_seconds = stats["samples"] / sample_rate
+    skipped = stats["skipped_samples"] / sample_rate
+    processed = audio_seconds - skipped
+    saved = stats["vad_seconds"] * skipped / processed - stats["gate_seconds"] if processed > 0 else None
+    return {
+        "audio_seconds": round(audio_seconds, 2),
+        "skipped_seconds": round(skipped, 2),
+        "skipped_fraction": round(skipped / audio_seconds, 4) if audio_seconds else 0.0,
+        "gate_seconds": round(stats["gate_seconds"], 4),
+        "vad_seconds": round(stats["vad_seconds"], 4),
+        "estimated_saved_seconds": None if saved is None else round(saved, 2)
+    }
+
+
+def resolve_vad_backend(backend: str) -> str:
+    """torch or onnx for a VAD_BACKEND value (auto: onnx if onnxruntime is installed)"""
+    if backend == "auto":
+        return "onnx" if importlib.util.find_spec("onnxruntime") else "torch"
+    if backend not in ("torch", "onnx"):
+        raise ValueError(f"Unknown VAD backend '{backend}', expected torch, onnx or auto")
+    return backend
+
+
+def silero_vad_dir() -> Optional[Path]:
+    """Local silero-vad checkout: SILERO_VAD_PATH, else torch.hub's cached copy (if any)"""
+    if SILERO_VAD_PATH:
+        return Path(SILERO_VAD_PATH)
+    import torch
+    cached = sorted(Path(torch.hub.get_dir()).glob("snakers4_silero-vad_*"))
+    return cached[0] if cached else None
+
+
+def load_silero_vad(onnx: bool) -> Tuple[object, tuple, str]:
+    """
+    Load Silero VAD; returns (model, utils, where it was loaded from).
+
+    torch.hub.load with a GitHub repo queries GitHub for the default branch
+    even when the repo is cached, so a local checkout is loaded directly.
+    """
+    import torch
+    local = silero_vad_dir()
+    if local is not None and (local / "hubconf.py").exists():
+        model, utils = torch.hub.load(str(local), "silero_vad", source="local", onnx=onnx)
+        return model, utils, str(local)
+    if SILERO_VAD_PATH:
+        raise FileNotFoundError(f"SILERO_VAD_PATH={SILERO_VAD_PATH} is not a silero-vad checkout (no hubconf.py)")
+    model, utils = torch.hub.load(
+        repo_or_dir=SILERO_VAD_REPO,
+        model='silero_vad',
+        force_reload=False,
+        onnx=onnx,
+        trust_repo=True
+    )
+    return model, utils, f"github.com/{SILERO_VAD_REPO}"
+
 
 class VideoSegmenter:
     """
@@ -52,7 +382,10 @@ class VideoSegmenter:
         self,
         chunk_duration: int = 30,
         overlap_duration: int = 10,
-        vad_threshold: float = 0.5
+        vad_threshold: float = 0.5,
+        vad_backend: Optional[str] = None,
+        vad_workers: Optional[int] = None,
+        prevad: Optional[bool] = None
     ):
         """
         Initialize video segmenter.
@@ -61,34 +394,55 @@ class VideoSegmenter:
             chunk_duration: Target chunk length in seconds (default 30, optimal per research)
             overlap_duration: Overlap between chunks in seconds (default 10)
             vad_threshold: VAD confidence threshold (0.0-1.0)
+            vad_backend: torch, onnx or auto (defaults to VAD_BACKEND)
+            vad_workers: Processes for sharded VAD of long files (defaults to VAD_WORKERS)
+            prevad: Skip obvious silence with EnergyGate before VAD (defaults to PREVAD)
         """
         self.chunk_duration = chunk_duration
         self.overlap_duration = overlap_duration
         self.vad_threshold = vad_threshold
+        self.vad_backend = resolve_vad_backend(vad_backend or VAD_BACKEND)
         self.vad_model = None
+        self.vad_source = None
+        self._vad_failed_at = None
+        self.vad_workers = VAD_WORKERS if vad_workers is None else vad_workers
+        self._sharded_vad = None
+        self.gate = EnergyGate() if (PREVAD if prevad is None else prevad) else None
+        self.last_vad_report = None
 
     def load_vad_model(self):
         """
         Load Silero VAD model for voice activity detection.
 
-        Silero VAD is lightweight, accurate, and runs on GPU.
+        Silero VAD is lightweight and accurate, and runs on CPU. If the ONNX
+        model cannot be loaded, the TorchScript one is used. After a failure,
+        loading is retried only once VAD_RETRY_SECONDS have passed, so
+        requests do not each wait for an unreachable GitHub.
         """
+        if self.vad_model is not None:
+            return
+        if self._vad_failed_at is not None and time.monotonic() - self._vad_failed_at < VAD_RETRY_SECONDS:
+            return
         try:
-            if self.vad_model is None:
-                logger.info("Loading Silero VAD model...")
-                model, utils = torch.hub.load(
-                    repo_or_dir='snakers4/silero-vad',
-                    model='silero_vad',
-                    force_reload=False,
-                    onnx=False,
-                    trust_repo=True
-                )
-                self.vad_model = model
-                self.vad_utils = utils
-                logger.info("VAD model loaded successfully")
+            logger.info(f"Loading Silero VAD model ({self.vad_backend})...")
+            with span("vad.load_model", backend=self.vad_backend):
+                try:
+                    model, utils, source = load_silero_vad(onnx=self.vad_backend == "onnx")
+                except Exception as e:
+                    if self.vad_backend != "onnx":
+                        raise
+                    logger.warning(f"ONNX VAD unavailable ({e}), using the TorchScript model")
+                    self.vad_backend = "torch"
+                    model, utils, source = load_silero_vad(onnx=False)
+            self.vad_model = model
+            self.vad_utils = utils
+            self.vad_source = source
+            self._vad_failed_at = None
+            logger.info(f"VAD model loaded from {source} ({self.vad_backend})")
         except Exception as e:
             logger.error(f"Failed to load VAD model: {e}")
             self.vad_model = None
+            self._vad_failed_at = time.monotonic()
 
     def detect_speech_segments(
         self,
@@ -114,37 +468,59 @@ class VideoSegmenter:
             logger.warning("VAD model not available, falling back to time-based chunking")
             return []
 
+        if self.vad_workers > 1:
+            if self._sharded_vad is None:
+                self._sharded_vad = ShardedVAD(self.vad_workers, self.vad_backend)
+            try:
+                with span("vad.sharded", workers=self.vad_workers) as trace_span:
+                    detected = self._sharded_vad.detect(
+                        audio_path, self.vad_threshold, min_speech_duration, min_silence_duration, self.gate
+                    )
+            except Exception as e:
+                logger.warning(f"Sharded VAD failed ({e}), running a single pass")
+                detected = None
+            if detected is not None:
+                speech, stats = detected
+                self._report_vad(stats, trace_span)
+                segments = [(start / 16000, end / 16000) for start, end in speech]
+                logger.info(f"Detected {len(segments)} speech segments")
+                return segments
+
         try:
             import torchaudio
 
             # Load audio
-            wav, sr = torchaudio.load(audio_path)
-
-            # Resample to 16kHz if needed (VAD expects 16kHz)
-            if sr != 16000:
-                resampler = torchaudio.transforms.Resample(sr, 16000)
-                wav = resampler(wav)
-                sr = 16000
-
-            # Ensure mono
-            if wav.shape[0] > 1:
-                wav = wav.mean(dim=0, keepdim=True)
-
-            # Get speech timestamps using VAD
-            speech_timestamps = self.vad_utils[0](
-                wav,
-                self.vad_model,
-                sampling_rate=sr,
-                threshold=self.vad_threshold,
-                min_speech_duration_ms=int(min_speech_duration * 1000),
-                min_silence_duration_ms=int(min_silence_duration * 1000)
-            )
+            with span("vad.load_audio"):
+                wav, sr = torchaudio.load(audio_path)
+
+                # Resample to 16kHz if needed (VAD expects 16kHz)
+                if sr != 16000:
+                    resampler = torchaudio.transforms.Resample(sr, 16000)
+                    wav = resampler(wav)
+                    sr = 16000
+
+                # Ensure mono
+                if wav.shape[0] > 1:
+                    wav = wav.mean(dim=0, keepdim=True)
+
+            def detect(begin: int, end: int) -> List[Tuple[int, int]]:
+                speech_timestamps = self.vad_utils[0](
+                    wav[:, begin:end],
+                    self.vad_model,
+                    sampling_rate=sr,
+                    threshold=self.vad_threshold,
+                    min_speech_duration_ms=int(min_speech_duration * 1000),
+                    min_silence_duration_ms=int(min_silence_duration * 1000)
+                )
+                return [(ts['start'], ts['end']) for ts in speech_timestamps]
+
+            # Get speech timestamps using VAD (on the gate's candidate regions with PREVAD)
+            with span("vad.inference", audio_seconds=round(wav.shape[-1] / sr, 2)) as trace_span:
+                speech, stats = gated_speech(np.asarray(wav[0]), detect, self.gate)
+            self._report_vad(stats, trace_span)
 
             # Convert to seconds
-            segments = [
-                (ts['start'] / sr, ts['end'] / sr)
-                for ts in speech_timestamps
-            ]
+            segments = [(start / sr, end / sr) for start, end in speech]
 
             logger.info(f"Detected {len(segments)} speech segments")
             return segments
@@ -153,6 +529,28 @@ class VideoSegmenter:
             logger.error(f"Speech detection failed: {e}")
             return []
 
+    def _report_vad(self, stats: Dict, trace_span=None) -> Dict:
+        """Record a detection's pre-VAD report in the metrics, the log and the trace"""
+        report = vad_report(stats)
+        # For benchmarks: a segmenter shared by concurrent jobs keeps the latest one
+        self.last_vad_report = report
+        VAD_AUDIO_SECONDS.inc(report["audio_seconds"] - report["skipped_seconds"], handled_by="silero")
+        if self.gate is None:
+            return report
+        VAD_AUDIO_SECONDS.inc(report["skipped_seconds"], handled_by="prevad")
+        saved = report["estimated_saved_seconds"]
+        logger.info(f"Pre-VAD skipped {report['skipped_fraction']:.0%} of the audio "
+                    f"({report['skipped_seconds']:.0f}s of {report['audio_seconds']:.0f}s), "
+                    f"saving ~{saved if saved is not None else 0:.1f}s of VAD")
+        if trace_span is not None:
+            trace_span.attrs.update(report)
+        return report
+
+    def shutdown(self):
+        """Stop the sharded VAD worker processes, if any were started"""
+        if self._sharded_vad is not None:
+            self._sharded_vad.shutdown()
+
     def create_vad_chunks(
         self,
         audio_path: str,
@@ -182,7 +580,8 @@ class VideoSegmenter:
             overlap = self.overlap_duration
 
         # Detect speech segments
-        speech_segments = self.detect_speech_segments(audio_path)
+        with span("vad.detect_speech"):
+            speech_segments = self.detect_speech_segments(audio_path)
 
         if not speech_segments:
             # Fallback to time-based chunking
@@ -190,39 +589,7 @@ class VideoSegmenter:
             return self.create_time_based_chunks(audio_path, target_duration, overlap)
 
         # Merge segments using Cut & Merge strategy
-        chunks = []
-        current_start = speech_segments[0][0]
-        current_end = speech_segments[0][1]
-        chunk_id = 0
-
-        for i in range(1, len(speech_segments)):
-            seg_start, seg_end = speech_segments[i]
-
-            # Check if adding this segment would exceed target duration
-            if (seg_end - current_start) <= target_duration:
-                # Merge segment
-                current_end = seg_end
-            else:
-                # Save current chunk with overlap
-                chunk_end = current_end + overlap
-                chunks.append(AudioSegment(
-                    start=max(0, current_start - overlap),
-                    end=chunk_end,
-                    segment_id=chunk_id
-                ))
-                chunk_id += 1
-
-                # Start new chunk
-                current_start = seg_start
-                current_end = seg_end
-
-        # Add final chunk
-        if current_start < current_end:
-            chunks.append(AudioSegment(
-                start=max(0, current_start - overlap),
-                end=current_end,
-                segment_id=chunk_id
-            ))
+        chunks = merge_speech_segments(speech_segments, target_duration, overlap)
 
         logger.info(f"Created {len(chunks)} VAD-based chunks")
         return chunks
@@ -263,23 +630,7 @@ class VideoSegmenter:
             logger.error(f"Could not determine audio duration: {e}")
             return []
 
-        chunks = []
-        chunk_id = 0
-        current_pos = 0
-
-        while current_pos < duration:
-            chunk_start = current_pos
-            chunk_end = min(current_pos + chunk_duration, duration)
-
-            chunks.append(AudioSegment(
-                start=chunk_start,
-                end=chunk_end,
-                segment_id=chunk_id
-            ))
-
-            chunk_id += 1
-            # Move forward by (chunk_duration - overlap) to create overlap
-            current_pos += (chunk_duration - overlap)
+        chunks = time_based_chunks(duration, chunk_duration, overlap)
 
         logger.info(f"Created {len(chunks)} time-based chunks ({chunk_duration}s with {overlap}s overlap)")
         return chunks
@@ -316,45 +667,8 @@ class VideoSegmenter:
             return self.create_time_based_chunks(audio_path)
 
         # Create chunks between silence periods
-        chunks = []
-        chunk_id = 0
-        prev_end = 0
-
-        for silence_start, silence_end in silences:
-            if silence_start > prev_end:
-                # Check if segment is too long
-                if (silence_start - prev_end) > max_chunk_duration:
-                    # Split long segment into smaller chunks
-                    pos = prev_end
-                    while pos < silence_start:
-                        chunk_end = min(pos + max_chunk_duration, silence_start)
-                        chunks.append(AudioSegment(
-                            start=pos,
-                            end=chunk_end,
-                            segment_id=chunk_id
-                        ))
-                        chunk_id += 1
-                        pos = chunk_end
-                else:
-                    # Add chunk
-                    chunks.append(AudioSegment(
-                        start=prev_end,
-                        end=silence_start,
-                        segment_id=chunk_id
-                    ))
-                    chunk_id += 1
-
-            prev_end = silence_end
-
-        # Add final chunk if needed
         info = processor.get_video_info(audio_path)
-        duration = info.get('duration', prev_end)
-        if prev_end < duration:
-            chunks.append(AudioSegment(
-                start=prev_end,
-                end=duration,
-                segment_id=chunk_id
-            ))
+        chunks = silence_based_chunks(silences, info.get('duration'), max_chunk_duration)
 
         logger.info(f"Created {len(chunks)} silence-based chunks")
         return chunks
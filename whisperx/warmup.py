@@ -0,0 +1,135 @@
+"""
+Startup Warmup for the WhisperX API Server
+Loads and exercises the models in the background so the first request
+runs at steady-state latency.
+
+The first request used to pay for model downloads, torch.hub.load of Silero
+VAD, CUDA context creation and kernel selection. Warmup runs these steps once
+per job worker (in-process thread or each worker process):
+0. Imports: the model stack (torch, whisperx), which the server itself no
+   longer imports at startup
+1. VAD: load Silero and run it on the warmup clip (WARMUP_VAD)
+2. Whisper: for each of WARMUP_MODELS, load the model, transcribe the clip
+   and release it
+3. Alignment: for each of WARMUP_ALIGN_LANGUAGES, load the model and align
+   the clip
+4. Diarization: load the pipeline and run it, only with WARMUP_DIARIZATION
+   (it needs HF_TOKEN for the real backend)
+
+Each phase is timed and logged as "Startup phase <name>: <seconds>s". GET
+/ready only returns 200 after warmup inference completes. /health stays a
+liveness check.
+
+WARMUP_CLIP should point at a short speech clip. Without it, a generated
+syllable-rate tone is used. WhisperX's own VAD may skip that as non-speech,
+so the decoder kernels are not always exercised.
+"""
+
+import logging
+import os
+import tempfile
+import time
+import wave
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+ENABLED = os.getenv("WARMUP", "true").lower() in ("1", "true", "yes")
+MODELS = [m for m in os.getenv("WARMUP_MODELS", "large-v3").split(",") if m]
+ALIGN_LANGUAGES = [lang for lang in os.getenv("WARMUP_ALIGN_LANGUAGES", "en").split(",") if lang]
+VAD = os.getenv("WARMUP_VAD", "true").lower() in ("1", "true", "yes")
+DIARIZATION = os.getenv("WARMUP_DIARIZATION", "false").lower() in ("1", "true", "yes")
+CLIP = os.getenv("WARMUP_CLIP")
+
+SAMPLE_RATE = 16000
+GENERATED_SECONDS = 10
+
+
+@contextmanager
+def startup_phase(name: str, timings: Dict[str, float]):
+    """Time one startup phase, record it in timings and log it"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[name] = round(time.perf_counter() - start, 4)
+        logger.info(f"Startup phase {name}: {timings[name]:.2f}s")
+
+
+def generated_clip(seconds: float = GENERATED_SECONDS) -> np.ndarray:
+    """Voiced-speech-like signal: harmonics of 150Hz, amplitude-modulated at 4Hz"""
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    voice = sum(np.sin(2 * np.pi * 150 * k * t) / k for k in range(1, 6))
+    envelope = 0.5 * (1 + np.sin(2 * np.pi * 4 * t)) ** 2 / 4
+    return (0.3 * voice * envelope / np.abs(voice).max()).astype(np.float32)
+
+
+def _write_wav(path: str, audio: np.ndarray):
+    with wave.open(path, "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(SAMPLE_RATE)
+        f.writeframes((np.clip(audio, -1, 1) * 32767).astype(np.int16).tobytes())
+
+
+def warm_up(backend, segmenter, models: Optional[List[str]] = None) -> Dict[str, float]:
+    """
+    Run the configured warmup phases with this process's backend and VAD.
+
+    Returns {phase: seconds}. VAD problems are logged, not raised, because
+    segmentation falls back to time-based chunks anyway. Model errors are
+    raised, because real jobs would fail the same way.
+    """
+    timings: Dict[str, float] = {}
+    models = MODELS if models is None else models
+
+    with startup_phase("warmup", timings):
+        with startup_phase("warmup.imports", timings):
+            backend.preload()
+        with startup_phase("warmup.clip", timings):
+            audio = backend.load_audio(CLIP) if CLIP else generated_clip()
+
+        if VAD:
+            with tempfile.NamedTemporaryFile(suffix=".wav") as tmp:
+                with startup_phase("warmup.vad", timings):
+                    if CLIP:
+                        path = CLIP
+                    else:
+                        _write_wav(tmp.name, audio)
+                        path = tmp.name
+                    segmenter.load_vad_model()
+                    if segmenter.vad_model is None:
+                        logger.warning("Warmup: VAD model unavailable, jobs will use time-based chunking")
+                    else:
+                        segmenter.detect_speech_segments(path)
+
+        segments = [{"start": 0.0, "end": len(audio) / SAMPLE_RATE, "text": " warm up"}]
+        for model_name in models:
+            with startup_phase(f"warmup.model_load[{model_name}]", timings):
+                model = backend.load_model(model_name)
+            with startup_phase(f"warmup.transcription[{model_name}]", timings):
+                result = backend.transcribe(model, audio, batch_size=1, language="en")
+            segments = result.get("segments") or segments
+            del model
+            backend.release()
+
+        for language in ALIGN_LANGUAGES:
+            with startup_phase(f"warmup.align_load[{language}]", timings):
+                align_model = backend.load_align_model(language)
+            with startup_phase(f"warmup.alignment[{language}]", timings):
+                backend.align(align_model, segments, audio)
+            del align_model
+            backend.release()
+
+        if DIARIZATION:
+            with startup_phase("warmup.diarize_load", timings):
+                diarize_model = backend.load_diarization_model(os.getenv("HF_TOKEN"))
+            with startup_phase("warmup.diarization", timings):
+                backend.diarize(diarize_model, audio, {"segments": segments})
+            del diarize_model
+            backend.release()
+
+    return timings
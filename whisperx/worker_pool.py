@@ -0,0 +1,217 @@
+"""
+Worker Pool for the WhisperX API Server
+Runs transcription jobs off the HTTP event loop.
+
+- WHISPERX_WORKERS=0 (default): jobs run one at a time on a background
+  thread of the server process. /health and /metrics stay responsive while
+  a job runs.
+- WHISPERX_WORKERS=N: jobs run in N spawned worker processes, and each
+  process loads its own models (N x the VRAM). The HTTP process only
+  receives uploads, queues jobs and dispatches them.
+
+Jobs wait in the HTTP process until the scheduler (scheduler.py) grants
+them a worker slot by priority class and per-client fair share, and memory
+from the admission budget (admission.py), which is shared by all workers.
+Inputs are passed by path. Results are written as JSON under
+/app/shared/results, so large payloads do not go through the process pipes.
+Counter and histogram observations made in a worker are shipped back with
+each result and merged into the server's /metrics. Models are only loaded in
+the workers, so whisperx_resident_models is left out of /metrics then.
+
+An optional warmup function (warmup.py) runs before the first job: on the
+job thread in-process, or as the initializer of every worker process
+(including ones restarted after a crash). wait_warm() waits for it.
+In-process, warmup has no scheduler ticket, so jobs wait for it to finish
+before they ask for a slot instead of loading a second copy of the models
+next to it.
+"""
+
+import asyncio
+import json
+import logging
+import multiprocessing
+import os
+import uuid
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple
+
+import metrics
+from admission import MemoryBudget
+from scheduler import PREEMPTION, Scheduler, Ticket, run_with_ticket
+
+logger = logging.getLogger(__name__)
+
+WORKERS = int(os.getenv("WHISPERX_WORKERS", "0"))
+RESULTS_DIR = Path(os.getenv("WORKER_RESULTS_DIR", "/app/shared/results"))
+
+
+def _init_worker(warmup: Callable, warmed, failed):
+    """Worker-process initializer: warm up before taking the first job"""
+    try:
+        warmup()
+        counter = warmed
+    except Exception as e:
+        # Raising here would break the pool; the job itself will surface the error
+        logger.error(f"Warmup failed in worker {os.getpid()}: {e}", exc_info=True)
+        counter = failed
+    with counter.get_lock():
+        counter.value += 1
+
+
+def _run_in_worker(fn: Callable, kwargs: Dict, result_path: str) -> Tuple[Dict, Optional[str]]:
+    """
+    Worker-process side of a job.
+
+    Returns (metric observations, error message). The result itself goes to
+    result_path so the pipe only carries small messages.
+    """
+    # Drop anything recorded outside a job (e.g. at import) so exports are per-job
+    metrics.export_values()
+    error = None
+    try:
+        result = fn(**kwargs)
+        with open(result_path, "w") as f:
+            json.dump(result, f)
+    except Exception as e:
+        logger.error(f"Job {fn.__name__} failed in worker {os.getpid()}: {e}", exc_info=True)
+        error = str(e)
+    return metrics.export_values(), error
+
+
+class WorkerPool:
+    """Dispatches job functions to a thread (in-process) or to worker processes"""
+
+    def __init__(
+        self,
+        workers: int = WORKERS,
+        budget: Optional[MemoryBudget] = None,
+        warmup: Optional[Callable[[], Dict]] = None
+    ):
+        self.workers = max(0, workers)
+        self.warmup = warmup
+        # A preempted job stays parked on its thread, so preemption is in-process only
+        self.scheduler = Scheduler(
+            slots=max(1, self.workers),
+            preemption=PREEMPTION and not self.workers,
+            budget=budget
+        )
+        self._executor = None
+        self._warmup_future = None
+        self._warmed = None
+        self._warm_failed = None
+
+    @property
+    def mode(self) -> str:
+        return f"{self.workers} processes" if self.workers else "in-process"
+
+    def _process_executor(self) -> ProcessPoolExecutor:
+        # spawn: CUDA cannot be re-initialized in a forked child
+        context = multiprocessing.get_context("spawn")
+        if self.warmup is None:
+            return ProcessPoolExecutor(max_workers=self.workers, mp_context=context)
+        if self._warmed is None:
+            self._warmed = context.Value("i", 0)
+            self._warm_failed = context.Value("i", 0)
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(self.warmup, self._warmed, self._warm_failed)
+        )
+
+    def start(self):
+        if self._executor is not None:
+            return
+        if self.workers:
+            RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+            # Would always read 0 here; gauges are not shipped back from workers
+            metrics.unregister(metrics.RESIDENT_MODELS)
+            self._executor = self._process_executor()
+            if self.warmup is not None:
+                # Workers are spawned on demand, one per submit while none is idle
+                for _ in range(self.workers):
+                    self._executor.submit(os.getpid)
+        else:
+            # One running job plus the suspended ones, each parked on its own thread
+            threads = 1 + (self.scheduler.max_suspended if self.scheduler.preemption else 0)
+            self._executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="whisperx-job")
+            if self.warmup is not None:
+                self._warmup_future = self._executor.submit(self.warmup)
+        logger.info(f"Worker pool started ({self.mode})")
+
+    async def wait_warm(self) -> Dict:
+        """
+        Wait until warmup finished in every worker.
+
+        Returns the warmup's phase timings in-process, or the number of warmed
+        worker processes (their timings are in their logs). Raises if warmup
+        failed anywhere.
+        """
+        self.start()
+        if self.warmup is None:
+            return {}
+        if not self.workers:
+            return await asyncio.wrap_future(self._warmup_future)
+        while self._warmed.value + self._warm_failed.value < self.workers:
+            await asyncio.sleep(0.5)
+        if self._warm_failed.value:
+            raise RuntimeError(f"Warmup failed in {self._warm_failed.value} of {self.workers} worker processes")
+        return {"workers_warmed": self._warmed.value}
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    async def run(self, fn: Callable, ticket: Optional[Ticket] = None, **kwargs) -> Dict:
+        """
+        Run fn(**kwargs) once the scheduler grants ticket a worker and return its result.
+
+        fn must be a module-level function returning a JSON-serializable
+        dict, so that it can be called by reference in a worker process. If
+        the ticket carries a memory demand, fn also gets the granted
+        batch_size. Errors raised in a worker come back as RuntimeError;
+        AdmissionRejected is raised if the job is not admitted.
+        """
+        self.start()
+        if self._warmup_future is not None and not self._warmup_future.done():
+            try:
+                await asyncio.wrap_future(self._warmup_future)
+            except Exception:
+                pass  # Reported by wait_warm(); the job loads the models itself
+        ticket = ticket or Ticket(label=fn.__name__)
+        await self.scheduler.acquire(ticket)
+        if ticket.batch_size is not None:
+            kwargs["batch_size"] = ticket.batch_size
+        try:
+            if not self.workers:
+                return await asyncio.wrap_future(self._executor.submit(run_with_ticket, ticket, fn, kwargs))
+            return await self._run_in_process(fn, kwargs)
+        finally:
+            self.scheduler.release(ticket)
+
+    async def _run_in_process(self, fn: Callable, kwargs: Dict) -> Dict:
+        result_path = RESULTS_DIR / f"{uuid.uuid4().hex}.json"
+        executor = self._executor
+        try:
+            observed, error = await asyncio.wrap_future(
+                executor.submit(_run_in_worker, fn, kwargs, str(result_path))
+            )
+        except BrokenProcessPool:
+            # A worker died (e.g. OOM-killed); the executor cannot be reused
+            if self._executor is executor:
+                logger.error("Worker process died, restarting the worker pool")
+                executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = self._process_executor()
+            raise RuntimeError("Worker process died while processing the job")
+
+        metrics.merge_values(observed)
+        if error:
+            raise RuntimeError(error)
+        try:
+            with open(result_path) as f:
+                return json.load(f)
+        finally:
+            result_path.unlink(missing_ok=True)
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Progress Callback Ingestion Benchmark
+Measures connection and handler overhead of one-request-per-update versus
+keep-alive and batched delivery against a local progress tracker instance.
+
+Usage:
+    python bench_progress_callbacks.py
+    python bench_progress_callbacks.py --updates 2000 --jobs 20 --batch-sizes 10 50
+    python bench_progress_callbacks.py --json results.json
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+
+import requests
+
+
+def start_tracker(db_path: str):
+    """Run the progress tracker on an ephemeral port; returns (server, base_url)"""
+    os.environ['PROGRESS_DB_PATH'] = db_path
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+    from werkzeug.serving import make_server
+    import progress_tracker
+
+    server = make_server('127.0.0.1', 0, progress_tracker.app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}"
+
+
+def make_updates(num_updates: int, num_jobs: int) -> list:
+    """Synthetic per-chunk updates spread round-robin over jobs"""
+    return [
+        {
+            'job_id': f"bench_{i % num_jobs}",
+            'status': 'processing',
+            'progress': 20 + (i * 60) // num_updates,
+            'stage': 'transcription',
+            'message': f"Transcribing segment {i + 1}/{num_updates}",
+            'segment_info': {'current': i + 1, 'total': num_updates}
+        }
+        for i in range(num_updates)
+    ]
+
+
+def run_single(base_url: str, updates: list, keep_alive: bool) -> int:
+    """POST each update individually; returns number of requests made"""
+    url = f"{base_url}/api/progress-callback"
+    if keep_alive:
+        with requests.Session() as session:
+            for update in updates:
+                session.post(url, json=update, timeout=5).raise_for_status()
+    else:
+        for update in updates:
+            requests.post(url, json=update, timeout=5).raise_for_status()
+    return len(updates)
+
+
+def run_batched(base_url: str, updates: list, batch_size: int) -> int:
+    """POST updates in arrays of batch_size over a keep-alive session"""
+    url = f"{base_url}/api/progress-callback/batch"
+    requests_made = 0
+    with requests.Session() as session:
+        for i in range(0, len(updates), batch_size):
+            session.post(url, json=updates[i:i + batch_size], timeout=5).raise_for_status()
+            requests_made += 1
+    return requests_made
+
+
+def measure(name: str, fn, num_updates: int) -> dict:
+    start = time.perf_counter()
+    requests_made = fn()
+    elapsed = time.perf_counter() - start
+    return {
+        'mode': name,
+        'updates': num_updates,
+        'requests': requests_made,
+        'seconds': elapsed,
+        'updates_per_second': num_updates / elapsed if elapsed > 0 else 0,
+        'us_per_update': elapsed / num_updates * 1e6
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Progress callback ingestion benchmark")
+    parser.add_argument("--updates", type=int, default=1000, help="Updates per mode")
+    parser.add_argument("--jobs", type=int, default=10, help="Concurrent job ids")
+    parser.add_argument("--batch-sizes", type=int, nargs='+', default=[10, 50, 200])
+    parser.add_argument("--json", help="Write results to this JSON file")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        server, base_url = start_tracker(os.path.join(tmp, 'progress.db'))
+        updates = make_updates(args.updates, args.jobs)
+
+        # Warm up the server (imports, SQLite page cache)
+        run_single(base_url, updates[:20], keep_alive=True)
+
+        results = [
+            measure('single (new connection)', lambda: run_single(base_url, updates, False), len(updates)),
+            measure('single (keep-alive)', lambda: run_single(base_url, updates, True), len(updates)),
+        ]
+        for batch_size in args.batch_sizes:
+            results.append(measure(
+                f"batch of {batch_size}",
+                lambda b=batch_size: run_batched(base_url, updates, b),
+                len(updates)
+            ))
+
+        server.shutdown()
+
+    baseline = results[0]['seconds']
+    print(f"\n{'Mode':<26} {'Requests':>9} {'Seconds':>9} {'Updates/s':>11} {'us/update':>10} {'Speedup':>8}")
+    print('-' * 78)
+    for r in results:
+        r['speedup'] = baseline / r['seconds'] if r['seconds'] > 0 else 0
+        print(f"{r['mode']:<26} {r['requests']:>9} {r['seconds']:>9.3f} "
+              f"{r['updates_per_second']:>11.0f} {r['us_per_update']:>10.0f} {r['speedup']:>7.1f}x")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults saved to: {args.json}")
+
+
+if __name__ == "__main__":
+    main()
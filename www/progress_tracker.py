@@ -2,41 +2,221 @@
 """
 Progress Tracker Service
 Receives webhook callbacks from n8n and makes progress available to the frontend.
+
+Every update is appended to a SQLite (WAL) database so progress survives a
+restart and each job keeps a full timeline for diagnosing slow stages.
 """
 
 from flask import Flask, request, jsonify
 from flask_cors import CORS
+from collections import OrderedDict
 from datetime import datetime, timedelta
+from itertools import islice
 import json
+import os
+import sqlite3
 import threading
 import time
 
 app = Flask(__name__)
 CORS(app)  # Enable CORS for frontend access
+app.json.sort_keys = False  # Keep job listings in most-recent-first order
 
-# In-memory storage for progress updates
-# Format: {job_id: {update_data, timestamp}}
-progress_store = {}
-lock = threading.Lock()
+# Persistent append-only event log (mount a volume at /data to keep it)
+DB_PATH = os.getenv('PROGRESS_DB_PATH', '/data/progress.db')
 
 # Cleanup old jobs after 24 hours
-CLEANUP_INTERVAL = 3600  # 1 hour
-JOB_EXPIRY = 86400  # 24 hours
+# Expiry only touches expired jobs, so it runs often in small batches
+CLEANUP_INTERVAL = int(os.getenv('PROGRESS_CLEANUP_INTERVAL', '60'))
+JOB_EXPIRY = int(os.getenv('PROGRESS_JOB_EXPIRY', '86400'))  # 24 hours
+
+
+class ProgressStore:
+    """
+    Append-only SQLite store for progress updates.
+
+    - progress_events: every update received, in arrival order
+    - jobs: latest update per job, indexed by update time for TTL compaction
+    """
+
+    def __init__(self, db_path: str):
+        db_dir = os.path.dirname(db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS progress_events (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                job_id TEXT NOT NULL,
+                received_at REAL NOT NULL,
+                update_json TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_events_job ON progress_events(job_id, id);
+
+            CREATE TABLE IF NOT EXISTS jobs (
+                job_id TEXT PRIMARY KEY,
+                updated_at REAL NOT NULL,
+                update_json TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_jobs_updated ON jobs(updated_at);
+        """)
+        self.conn.commit()
+
+    def append(self, job_id: str, update: dict, received_at: float):
+        """Record an update in the event log and as the job's latest state"""
+        self.append_many([(job_id, update)], received_at)
+
+    def append_many(self, updates: list, received_at: float):
+        """
+        Record [(job_id, update), ...] in a single transaction.
+        Every update goes to the event log; the last one per job wins in jobs.
+        """
+        rows = [(job_id, received_at, json.dumps(update)) for job_id, update in updates]
+        latest = {job_id: (job_id, ts, update_json) for job_id, ts, update_json in rows}
+        with self.conn:
+            self.conn.executemany(
+                'INSERT INTO progress_events (job_id, received_at, update_json) VALUES (?, ?, ?)',
+                rows
+            )
+            self.conn.executemany(
+                'INSERT OR REPLACE INTO jobs (job_id, updated_at, update_json) VALUES (?, ?, ?)',
+                latest.values()
+            )
+
+    def load_latest(self) -> dict:
+        """Return {job_id: (update, updated_at)} for every retained job"""
+        rows = self.conn.execute(
+            'SELECT job_id, update_json, updated_at FROM jobs ORDER BY updated_at'
+        ).fetchall()
+        return {job_id: (json.loads(update_json), updated_at) for job_id, update_json, updated_at in rows}
+
+    def history(self, job_id: str) -> list:
+        """Return [(received_at, update), ...] for a job in arrival order"""
+        rows = self.conn.execute(
+            'SELECT received_at, update_json FROM progress_events WHERE job_id = ? ORDER BY id',
+            (job_id,)
+        ).fetchall()
+        return [(received_at, json.loads(update_json)) for received_at, update_json in rows]
+
+    def compact(self, cutoff: float) -> list:
+        """
+        Drop jobs (and their events) whose last update is older than cutoff.
+
+        Expired jobs are found with a range scan on idx_jobs_updated and their
+        events deleted through idx_events_job, so the cost is proportional to
+        the amount of expired data, not the table size.
+        """
+        with self.conn:
+            expired = [
+                row[0] for row in self.conn.execute(
+                    'SELECT job_id FROM jobs WHERE updated_at < ?', (cutoff,)
+                )
+            ]
+            self.conn.executemany(
+                'DELETE FROM progress_events WHERE job_id = ?',
+                [(job_id,) for job_id in expired]
+            )
+            self.conn.execute('DELETE FROM jobs WHERE updated_at < ?', (cutoff,))
+        return expired
+
+
+def job_status(update: dict) -> str:
+    """Status bucket used for filtering and counters"""
+    return str(update.get('status') or 'unknown')
+
+
+class JobIndex:
+    """
+    Latest update per job, kept in last-update order.
+
+    entries is an OrderedDict that moves a job to the end on every update, so
+    its head is always the stalest job: expiry pops from the front and stops
+    at the first live entry. by_status keeps the same ordering per status so
+    filtered listing and status counts never touch jobs in other states.
+    """
+
+    def __init__(self):
+        self.entries = OrderedDict()  # {job_id: {'update': ..., 'timestamp': datetime}}
+        self.by_status = {}  # {status: OrderedDict(job_id -> None)}
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, job_id):
+        return job_id in self.entries
+
+    def __getitem__(self, job_id):
+        return self.entries[job_id]
+
+    def put(self, job_id: str, update: dict, timestamp: datetime):
+        """Insert or replace a job's latest update and move it to the tail"""
+        self._remove(job_id)
+        self.entries[job_id] = {'update': update, 'timestamp': timestamp}
+        self.by_status.setdefault(job_status(update), OrderedDict())[job_id] = None
+
+    def expire(self, cutoff: datetime) -> list:
+        """Remove and return jobs last updated before cutoff, oldest first"""
+        expired = []
+        while self.entries:
+            job_id, entry = next(iter(self.entries.items()))
+            if entry['timestamp'] >= cutoff:
+                break
+            self._remove(job_id)
+            expired.append(job_id)
+        return expired
+
+    def page(self, status: str = None, limit: int = 100, offset: int = 0) -> list:
+        """Return [(job_id, entry), ...] newest first, optionally for one status"""
+        source = self.entries if status is None else self.by_status.get(status, ())
+        return [
+            (job_id, self.entries[job_id])
+            for job_id in islice(reversed(source), offset, offset + limit)
+        ]
+
+    def total(self, status: str = None) -> int:
+        if status is None:
+            return len(self.entries)
+        return len(self.by_status.get(status, ()))
+
+    def counts(self) -> dict:
+        return {status: len(jobs) for status, jobs in self.by_status.items()}
+
+    def _remove(self, job_id: str):
+        entry = self.entries.pop(job_id, None)
+        if entry is None:
+            return
+        status = job_status(entry['update'])
+        bucket = self.by_status[status]
+        del bucket[job_id]
+        if not bucket:
+            del self.by_status[status]
+
+
+store = ProgressStore(DB_PATH)
+store.compact(time.time() - JOB_EXPIRY)
+
+# In-memory index of the latest update per job, rebuilt from the store on start
+progress_store = JobIndex()
+for _job_id, (_update, _updated_at) in store.load_latest().items():
+    progress_store.put(_job_id, _update, datetime.fromtimestamp(_updated_at))
+lock = threading.Lock()
+print(f"Loaded {len(progress_store)} jobs from {DB_PATH}")
 
 
 def cleanup_old_jobs():
-    """Remove jobs older than JOB_EXPIRY seconds"""
+    """Expire jobs whose last update is older than JOB_EXPIRY seconds"""
     while True:
         time.sleep(CLEANUP_INTERVAL)
+        cutoff = datetime.now() - timedelta(seconds=JOB_EXPIRY)
         with lock:
-            now = datetime.now()
-            expired_jobs = [
-                job_id for job_id, data in progress_store.items()
-                if (now - data['timestamp']).total_seconds() > JOB_EXPIRY
-            ]
-            for job_id in expired_jobs:
-                del progress_store[job_id]
-                print(f"Cleaned up expired job: {job_id}")
+            expired_jobs = progress_store.expire(cutoff)
+            if expired_jobs:
+                store.compact(cutoff.timestamp())
+        for job_id in expired_jobs:
+            print(f"Cleaned up expired job: {job_id}")
 
 
 # Start cleanup thread
@@ -72,11 +252,10 @@ def progress_callback():
         job_id = update['job_id']
 
         # Store update with timestamp
+        now = time.time()
         with lock:
-            progress_store[job_id] = {
-                'update': update,
-                'timestamp': datetime.now()
-            }
+            store.append(job_id, update, now)
+            progress_store.put(job_id, update, datetime.fromtimestamp(now))
 
         print(f"[{job_id}] Progress update: {update.get('progress', 0)}% - {update.get('message', '')}")
 
@@ -87,6 +266,53 @@ def progress_callback():
         return jsonify({'error': str(e)}), 500
 
 
+@app.route('/api/progress-callback/batch', methods=['POST', 'OPTIONS'])
+def progress_callback_batch():
+    """
+    Receive several progress updates in one request.
+
+    Body is a JSON array of updates (same shape as /api/progress-callback),
+    or {"updates": [...]}. Updates are applied in order, so for each job the
+    last one in the batch becomes its current state; all are kept in history.
+    """
+    if request.method == 'OPTIONS':
+        return '', 204
+
+    try:
+        body = request.get_json()
+        updates = body.get('updates') if isinstance(body, dict) else body
+
+        if not isinstance(updates, list) or not updates:
+            return jsonify({'error': 'Expected a non-empty array of updates'}), 400
+
+        invalid = [
+            i for i, update in enumerate(updates)
+            if not isinstance(update, dict) or 'job_id' not in update
+        ]
+        if invalid:
+            return jsonify({'error': 'Missing job_id', 'invalid_indexes': invalid}), 400
+
+        now = time.time()
+        timestamp = datetime.fromtimestamp(now)
+        latest = {}
+        for update in updates:
+            latest[update['job_id']] = update
+
+        with lock:
+            store.append_many([(update['job_id'], update) for update in updates], now)
+            for job_id, update in latest.items():
+                progress_store.put(job_id, update, timestamp)
+
+        for job_id, update in latest.items():
+            print(f"[{job_id}] Progress update: {update.get('progress', 0)}% - {update.get('message', '')}")
+
+        return jsonify({'received': len(updates), 'job_ids': list(latest)}), 200
+
+    except Exception as e:
+        print(f"Error handling batch progress callback: {e}")
+        return jsonify({'error': str(e)}), 500
+
+
 @app.route('/api/progress/<job_id>', methods=['GET'])
 def get_progress(job_id):
     """
@@ -108,27 +334,80 @@ def get_progress(job_id):
             }), 200
 
 
+@app.route('/api/progress/<job_id>/history', methods=['GET'])
+def get_progress_history(job_id):
+    """
+    Get every update recorded for a job, oldest first.
+    elapsed_seconds is measured from the job's first update.
+    """
+    with lock:
+        events = store.history(job_id)
+
+    if not events:
+        return jsonify({'error': 'Unknown job_id', 'job_id': job_id}), 404
+
+    first_seen = events[0][0]
+    history = [
+        {
+            'timestamp': datetime.fromtimestamp(received_at).isoformat(),
+            'elapsed_seconds': round(received_at - first_seen, 3),
+            'update': update
+        }
+        for received_at, update in events
+    ]
+    return jsonify({'job_id': job_id, 'events': history, 'count': len(history)}), 200
+
+
 @app.route('/api/progress', methods=['GET'])
 def list_jobs():
-    """List all active jobs"""
+    """
+    List active jobs, most recently updated first.
+
+    Query parameters:
+    - status: only return jobs with this status
+    - limit: page size (default 100, max 1000)
+    - offset: number of jobs to skip
+    """
+    status = request.args.get('status')
+    try:
+        limit = min(max(int(request.args.get('limit', 100)), 1), 1000)
+        offset = max(int(request.args.get('offset', 0)), 0)
+    except ValueError:
+        return jsonify({'error': 'limit and offset must be integers'}), 400
+
     with lock:
-        jobs = {
-            job_id: {
-                'status': data['update'].get('status'),
-                'progress': data['update'].get('progress', 0),
-                'last_update': data['timestamp'].isoformat()
-            }
-            for job_id, data in progress_store.items()
+        page = progress_store.page(status=status, limit=limit, offset=offset)
+        total = progress_store.total(status)
+        status_counts = progress_store.counts()
+
+    jobs = {
+        job_id: {
+            'status': data['update'].get('status'),
+            'progress': data['update'].get('progress', 0),
+            'last_update': data['timestamp'].isoformat()
         }
-    return jsonify({'jobs': jobs, 'count': len(jobs)}), 200
+        for job_id, data in page
+    }
+    return jsonify({
+        'jobs': jobs,
+        'count': len(jobs),
+        'total': total,
+        'status_counts': status_counts,
+        'limit': limit,
+        'offset': offset
+    }), 200
 
 
 @app.route('/health', methods=['GET'])
 def health():
     """Health check endpoint"""
+    with lock:
+        active_jobs = len(progress_store)
+        status_counts = progress_store.counts()
     return jsonify({
         'status': 'healthy',
-        'active_jobs': len(progress_store),
+        'active_jobs': active_jobs,
+        'status_counts': status_counts,
         'service': 'progress-tracker'
     }), 200
 
@@ -138,11 +417,13 @@ def index():
     """Service info"""
     return jsonify({
         'service': 'Progress Tracker Service',
-        'version': '1.0.0',
+        'version': '1.1.0',
         'endpoints': {
             'POST /api/progress-callback': 'Receive progress updates from n8n',
+            'POST /api/progress-callback/batch': 'Receive an array of progress updates',
             'GET /api/progress/<job_id>': 'Get progress for specific job',
-            'GET /api/progress': 'List all active jobs',
+            'GET /api/progress/<job_id>/history': 'Get all recorded updates for a job',
+            'GET /api/progress': 'List active jobs (?status=&limit=&offset=)',
             'GET /health': 'Health check'
         }
     }), 200